@@ -0,0 +1,101 @@
+"""
+@file bench_gutter.py
+@brief Frame-time benchmark of the line-number gutter under synthetic scrolling.
+
+Loads a large buffer into a text widget with the IDE's LineNumbers gutter,
+then scrolls it step by step and times each gutter update. Needs a display
+(use xvfb-run on a headless machine).
+
+Usage: python benchmarks/bench_gutter.py [--lines N] [--frames N] [--step N]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import tkinter as tk
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ide.components.editor_tab import LineNumbers
+from ide.config.settings import FONT_FAMILY, FONT_SIZE
+
+
+def summarize(label, samples):
+    """
+    @brief Prints the mean, 95th percentile and worst frame time of a series.
+
+    @param label The name of the series.
+    @param samples Frame times in seconds.
+    """
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<22} mean {statistics.mean(samples) * 1e3:7.3f} ms  "
+          f"p95 {p95 * 1e3:7.3f} ms  max {samples[-1] * 1e3:7.3f} ms")
+
+
+def run(lines, frames, step):
+    """
+    @brief Runs the benchmark.
+
+    @param lines Number of lines in the buffer.
+    @param frames Number of scroll steps to time.
+    @param step Number of lines scrolled per frame.
+    """
+    root = tk.Tk()
+    root.geometry("900x700")
+    gutter = LineNumbers(root, width=40)
+    gutter.pack(side=tk.LEFT, fill=tk.Y)
+    text = tk.Text(root, wrap=tk.NONE, font=(FONT_FAMILY, FONT_SIZE))
+    text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    text.insert("1.0", "".join(f"cursor c{i} = create_cursor({i}, {i});\n" for i in range(lines)))
+    gutter.attach(text)
+    root.update()
+
+    scrolled, unchanged, redrawn = [], [], []
+    for _ in range(frames):
+        text.yview_scroll(step, "units")
+        root.update_idletasks()
+
+        start = time.perf_counter()
+        gutter.update_line_numbers()
+        scrolled.append(time.perf_counter() - start)
+
+        # same view again: the update must be skipped
+        start = time.perf_counter()
+        gutter.update_line_numbers()
+        unchanged.append(time.perf_counter() - start)
+
+        # same view, forced redraw: cost of drawing without the skip
+        gutter.drawn_state = None
+        start = time.perf_counter()
+        gutter.update_line_numbers()
+        redrawn.append(time.perf_counter() - start)
+
+    print(f"{lines} lines, {frames} frames, {step} lines per frame, "
+          f"{len(gutter.items)} canvas items")
+    summarize("scroll", scrolled)
+    summarize("unchanged view", unchanged)
+    summarize("forced redraw", redrawn)
+    root.destroy()
+
+
+def main():
+    """
+    @brief Parses the command line and runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Line-number gutter frame-time benchmark")
+    parser.add_argument('--lines', type=int, default=100000, help='lines in the buffer')
+    parser.add_argument('--frames', type=int, default=500, help='scroll steps to time')
+    parser.add_argument('--step', type=int, default=3, help='lines scrolled per frame')
+    args = parser.parse_args()
+
+    try:
+        run(args.lines, args.frames, args.step)
+    except tk.TclError as e:
+        print(f"Cannot open a window ({e}); run under a display or xvfb-run.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+@file bench_highlight.py
+@brief Benchmark of the editor's syntax highlighting against file size.
+
+For each buffer size, loads the buffer into an EnhancedText widget, then times
+a highlighting pass after scrolling to the middle of the file and after a
+one-character edit in the viewport. The edit time should stay flat as the
+file grows; the first scroll also scans the lines above the viewport for
+comment delimiters.
+Needs a display (use xvfb-run on a headless machine).
+
+Usage: python benchmarks/bench_highlight.py [--sizes N,N,...] [--edits N]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import tkinter as tk
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ide.components.editor_tab import EnhancedText
+
+SAMPLE = (
+    "cursor c = create_cursor(400, 300); // start\n"
+    "c.color(RED);\n"
+    "/* a block\n"
+    "   comment */\n"
+    "for (var int i = 0; i < 10; i = i + 1) { c.draw_circle(2.5, true); c.move(3); };\n"
+)
+
+
+def run(lines, edits):
+    """
+    @brief Times the highlighting of one buffer.
+
+    @param lines Number of lines in the buffer.
+    @param edits Number of edits to time.
+    @return A tuple (scroll time, mean edit time) in seconds.
+    """
+    root = tk.Tk()
+    root.geometry("900x700")
+    text = EnhancedText(root, wrap=tk.NONE)
+    text.pack(fill=tk.BOTH, expand=True)
+    text.insert("1.0", SAMPLE * (lines // SAMPLE.count("\n")))
+    root.update()
+    highlighter = text.syntax_highlighter
+
+    text.yview_moveto(0.5)
+    start = time.perf_counter()
+    highlighter.update()
+    scroll = time.perf_counter() - start
+
+    middle = int(text.index("@0,0").split(".")[0]) + 5
+    samples = []
+    for _ in range(edits):
+        text.insert(f"{middle}.0", "x")
+        start = time.perf_counter()
+        highlighter.update()
+        samples.append(time.perf_counter() - start)
+        text.delete(f"{middle}.0")
+        highlighter.update()
+
+    text.analysis_worker.close()
+    root.destroy()
+    return scroll, statistics.mean(samples)
+
+
+def main():
+    """
+    @brief Parses the command line and runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Syntax highlighting benchmark")
+    parser.add_argument('--sizes', default="1000,10000,100000",
+                        help='comma-separated buffer sizes, in lines')
+    parser.add_argument('--edits', type=int, default=50, help='edits to time per size')
+    args = parser.parse_args()
+
+    try:
+        for lines in [int(size) for size in args.sizes.split(",")]:
+            scroll, edit = run(lines, args.edits)
+            print(f"{lines:>8} lines  scroll to middle {scroll * 1e3:8.3f} ms  "
+                  f"edit {edit * 1e3:7.3f} ms")
+    except tk.TclError as e:
+        print(f"Cannot open a window ({e}); run under a display or xvfb-run.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+@file bench_pipeline.py
+@brief Benchmark of every stage of the Draw++ pipeline on synthetic workloads.
+
+For each workload scale (see workload.py), times Lexer.tokenize, Parser.parse,
+analyze and CodeGenerator.generate in process, then the end-to-end render
+(Draw++ compilation, C compilation and headless execution) in subprocesses.
+Results are written as JSON. Comparing two result files flags every stage
+whose median time grew by more than a threshold, and exits with status 1 if
+there is any regression.
+
+Usage: python benchmarks/bench_pipeline.py [--scales small,medium] [--repeat N]
+       [--render-repeat N] [--no-render] [-o results.json]
+       python benchmarks/bench_pipeline.py --compare baseline.json [current.json]
+       [--threshold 0.10]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from compiler.lexer.lexer import Lexer
+from compiler.parser.parser import Parser
+from compiler.semantic.semantic_analyzer import analyze
+from compiler.codegen.codegen import CodeGenerator
+from workload import SCALES, generate_program
+
+# stages timed in process, in pipeline order
+COMPILER_STAGES = ("lex", "parse", "semantic", "codegen")
+
+# names given to the stages of ide.utils.run_pipeline.build_stages
+RENDER_STAGES = ("render_compile", "render_gcc", "render_execute")
+
+# maximum duration of one render stage, in seconds
+RENDER_TIMEOUT_S = 120
+
+
+def summarize(samples):
+    """
+    @brief Reduces the timings of one stage.
+
+    @param samples Durations in seconds.
+    @return A dictionary with the median, mean, min and max, and the number of runs.
+    """
+    return {
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.mean(samples),
+        "min_s": min(samples),
+        "max_s": max(samples),
+        "runs": len(samples),
+    }
+
+
+def time_compiler(source, repeat):
+    """
+    @brief Times the in-process compiler stages.
+
+    @param source The Draw++ program.
+    @param repeat Number of runs of each stage.
+    @return A dictionary of timings by stage, and the sizes of the program.
+    """
+    samples = {stage: [] for stage in COMPILER_STAGES}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = Lexer(source).tokenize()
+        samples["lex"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        ast = Parser(tokens).parse()
+        samples["parse"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        success, error = analyze(ast)
+        samples["semantic"].append(time.perf_counter() - start)
+        if not success:
+            raise RuntimeError(f"generated program failed semantic analysis: {error}")
+
+        start = time.perf_counter()
+        code = CodeGenerator().generate(ast)
+        samples["codegen"].append(time.perf_counter() - start)
+
+    sizes = {"tokens": len(tokens), "statements": len(ast.statements),
+             "output_lines": code.count("\n")}
+    return {stage: summarize(values) for stage, values in samples.items()}, sizes
+
+
+def time_render(source, repeat):
+    """
+    @brief Times the end-to-end render, stage by stage, with SDL's dummy video driver.
+
+    @param source The Draw++ program.
+    @param repeat Number of renders.
+    @return A dictionary of timings by stage, or None if gcc is missing or a stage failed.
+    """
+    from ide.utils.run_pipeline import build_stages
+
+    if shutil.which("gcc") is None:
+        print("  render: skipped (gcc not found)")
+        return None
+
+    samples = {stage: [] for stage in RENDER_STAGES + ("render_total",)}
+    build_dir = tempfile.mkdtemp(prefix="drawpp-bench-")
+    try:
+        source_file = os.path.join(build_dir, "temp.dpp")
+        with open(source_file, "w") as f:
+            f.write(source)
+        for _ in range(repeat):
+            total = 0.0
+            stages = build_stages(source_file, build_dir, headless=True)
+            for name, (label, command, cwd, env) in zip(RENDER_STAGES, stages):
+                start = time.perf_counter()
+                result = subprocess.run(command, cwd=cwd, env=env, stdin=subprocess.DEVNULL,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                        timeout=RENDER_TIMEOUT_S)
+                elapsed = time.perf_counter() - start
+                if result.returncode != 0:
+                    print(f"  render: skipped ({label} failed: "
+                          f"{result.stderr.decode(errors='replace').strip()[:200]})")
+                    return None
+                samples[name].append(elapsed)
+                total += elapsed
+            samples["render_total"].append(total)
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+    return {stage: summarize(values) for stage, values in samples.items()}
+
+
+def run(scales, repeat, render_repeat, seed):
+    """
+    @brief Runs the benchmark on each scale.
+
+    @param scales The names of the workload scales.
+    @param repeat Number of runs of each compiler stage.
+    @param render_repeat Number of end-to-end renders, 0 to skip them.
+    @param seed Seed of the workload generator.
+    @return The results, ready to be written as JSON.
+    """
+    results = {}
+    for scale in scales:
+        params = SCALES[scale]
+        source = generate_program(seed=seed, **params)
+        print(f"{scale}: {source.count(chr(10))} lines")
+
+        stages, sizes = time_compiler(source, repeat)
+        if render_repeat > 0:
+            stages.update(time_render(source, render_repeat) or {})
+        for stage, entry in stages.items():
+            print(f"  {stage:<16} median {entry['median_s'] * 1e3:10.3f} ms  "
+                  f"min {entry['min_s'] * 1e3:10.3f} ms")
+        results[scale] = {"params": params, "sizes": sizes, "stages": stages}
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeat": repeat,
+            "render_repeat": render_repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold):
+    """
+    @brief Compares two result sets stage by stage.
+
+    @param baseline The reference results.
+    @param current The new results.
+    @param threshold The relative slowdown of the median above which a stage regressed.
+    @return The list of (scale, stage, baseline median, current median) regressions.
+    """
+    regressions = []
+    print(f"{'scale':<8}{'stage':<18}{'baseline (ms)':>14}{'current (ms)':>14}{'change':>9}")
+    for scale, entry in current["results"].items():
+        reference = baseline["results"].get(scale)
+        if reference is None:
+            continue
+        for stage, timing in entry["stages"].items():
+            if stage not in reference["stages"]:
+                continue
+            before = reference["stages"][stage]["median_s"]
+            after = timing["median_s"]
+            change = (after - before) / before if before > 0 else 0.0
+            flag = ""
+            if change > threshold:
+                regressions.append((scale, stage, before, after))
+                flag = "  REGRESSION"
+            print(f"{scale:<8}{stage:<18}{before * 1e3:>14.3f}{after * 1e3:>14.3f}"
+                  f"{change * 100:>+8.1f}%{flag}")
+    return regressions
+
+
+def main():
+    """
+    @brief Parses the command line, then runs or compares benchmarks.
+    """
+    parser = argparse.ArgumentParser(description="Draw++ pipeline benchmark")
+    parser.add_argument('--scales', default="small,medium",
+                        help=f'comma-separated workload scales ({", ".join(SCALES)})')
+    parser.add_argument('--repeat', type=int, default=5, help='runs of each compiler stage')
+    parser.add_argument('--render-repeat', type=int, default=1, help='end-to-end renders per scale')
+    parser.add_argument('--no-render', action='store_true', help='skip the end-to-end render')
+    parser.add_argument('--seed', type=int, default=0, help='workload generator seed')
+    parser.add_argument('-o', '--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', nargs='+', metavar='FILE',
+                        help='compare against a baseline: BASELINE [CURRENT]; '
+                             'without CURRENT, the benchmark is run first')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='relative slowdown flagged as a regression (default 0.10)')
+    args = parser.parse_args()
+
+    scales = [scale for scale in args.scales.split(",") if scale]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        parser.error(f"unknown scale(s): {', '.join(unknown)}")
+
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare takes a baseline and at most one current result file")
+
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+    else:
+        current = run(scales, args.repeat, 0 if args.no_render else args.render_repeat, args.seed)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(current, f, indent=2)
+                f.write("\n")
+            print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        print()
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold * 100:.0f}%")
+            sys.exit(1)
+        print(f"\nNo regression above {args.threshold * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+@file bench_startup.py
+@brief Benchmark of the start-up time of the Draw++ command line tools.
+
+Each command is run in a fresh interpreter. The wall time is the median of
+several runs; the import time is the sum of the self times that
+`python -X importtime` reports, the lowest of IMPORT_RUNS runs, minus that
+of a bare interpreter, so it
+counts what the command imports on top of Python itself. A command whose
+import time exceeds its budget is reported, and the script then exits with
+status 1.
+
+Usage: python benchmarks/bench_startup.py [--repeat N] [--budget-scale X] [-o results.json]
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from workload import generate_program
+
+# import time budget (ms) of each command, on top of a bare interpreter;
+# two to three times the fastest times measured, which leaves room for slower
+# machines and for the noise of short runs (see also --budget-scale)
+BUDGETS_MS = {
+    "compiler --help": 70.0,
+    "compiler small.dpp": 100.0,
+    "cli --help": 90.0,
+    "cli compile small.dpp": 110.0,
+}
+
+# runs under -X importtime of each command, keeping the fastest
+IMPORT_RUNS = 5
+
+# top-level imports listed for each command
+TOP_IMPORTS = 5
+
+
+def commands(source_file, output_file):
+    """
+    @brief Builds the command lines to measure.
+
+    @param source_file A small Draw++ program.
+    @param output_file Where the compiled C goes.
+    @return A dictionary name -> arguments of the interpreter.
+    """
+    # no server may answer, so the cli compiles in process
+    no_server = os.path.join(tempfile.gettempdir(), "drawpp-bench-no-server.sock")
+    return {
+        "compiler --help": ["-m", "compiler.compiler", "--help"],
+        "compiler small.dpp": ["-m", "compiler.compiler", source_file, "-o", output_file],
+        "cli --help": ["-m", "compiler.cli", "--help"],
+        "cli compile small.dpp": ["-m", "compiler.cli", "--socket", no_server, "compile",
+                                  source_file, "-o", output_file],
+    }
+
+
+def import_times(args):
+    """
+    @brief Runs a command IMPORT_RUNS times under -X importtime.
+
+    @param args The arguments of the interpreter.
+    @return A tuple (total self time in ms, [(cumulative ms, module)] of the
+            top-level imports), of the fastest run.
+    """
+    return min(import_run(args) for _ in range(IMPORT_RUNS))
+
+
+def import_run(args):
+    """
+    @brief Runs a command once under -X importtime.
+
+    @param args The arguments of the interpreter.
+    @return A tuple (total self time in ms, [(cumulative ms, module)] of the top-level imports).
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime"] + args, cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    total = 0.0
+    top_level = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        total += int(self_us) / 1000
+        if not module[1:].startswith(" "):
+            top_level.append((int(cumulative_us) / 1000, module.strip()))
+    return total, sorted(top_level, reverse=True)
+
+
+def wall_time(args, repeat):
+    """
+    @brief Times a command.
+
+    @param args The arguments of the interpreter.
+    @param repeat Number of runs.
+    @return The median wall time, in ms.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1e3)
+    return statistics.median(samples)
+
+
+def main():
+    """
+    @brief Parses the command line, measures every command and checks the budgets.
+    """
+    parser = argparse.ArgumentParser(description="Draw++ start-up benchmark")
+    parser.add_argument('--repeat', type=int, default=10, help='runs of each command for the wall time')
+    parser.add_argument('--budget-scale', type=float, default=1.0,
+                        help='multiplier of the import time budgets, for slower machines')
+    parser.add_argument('-o', '--output', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="drawpp-startup-") as directory:
+        source_file = os.path.join(directory, "small.dpp")
+        with open(source_file, "w") as f:
+            f.write(generate_program(statements=20, nesting=1))
+        output_file = os.path.join(directory, "small.c")
+
+        bare_imports, _ = import_times(["-c", "pass"])
+        bare_wall = wall_time(["-c", "pass"], args.repeat)
+        print(f"{'bare interpreter':<24}{'wall':>8} {bare_wall:7.1f} ms  imports {bare_imports:6.1f} ms")
+
+        results = {}
+        over_budget = []
+        for name, command in commands(source_file, output_file).items():
+            imports, top_level = import_times(command)
+            imports -= bare_imports
+            wall = wall_time(command, args.repeat)
+            budget = BUDGETS_MS[name] * args.budget_scale
+            flag = ""
+            if imports > budget:
+                over_budget.append(name)
+                flag = "  OVER BUDGET"
+            print(f"{name:<24}{'wall':>8} {wall:7.1f} ms  imports {imports:6.1f} ms "
+                  f"(budget {budget:.0f} ms){flag}")
+            for cumulative, module in top_level[:TOP_IMPORTS]:
+                print(f"{'':<28}{cumulative:7.1f} ms  {module}")
+            results[name] = {"wall_ms": wall, "imports_ms": imports, "budget_ms": budget,
+                             "top_imports": [{"module": module, "ms": cumulative}
+                                             for cumulative, module in top_level[:TOP_IMPORTS]]}
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"bare": {"wall_ms": bare_wall, "imports_ms": bare_imports},
+                       "commands": results}, f, indent=2)
+            f.write("\n")
+        print(f"Results written to {args.output}")
+
+    if over_budget:
+        print(f"\n{len(over_budget)} command(s) over their import time budget: {', '.join(over_budget)}")
+        sys.exit(1)
+    print("\nAll commands within their import time budget")
+
+
+if __name__ == "__main__":
+    main()
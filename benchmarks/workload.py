@@ -0,0 +1,255 @@
+"""
+@file workload.py
+@brief Generator of synthetic Draw++ programs for the benchmarks.
+
+Programs are valid (they pass the whole compiler) and reproducible: the same
+parameters and seed always give the same program. Expressions only read
+small constants and loop counters and only divide by non-zero literals, and
+drawing arguments stay small, so generated programs run safely.
+
+Usage: python benchmarks/workload.py [--scale NAME] [--statements N] [--expr-depth N]
+       [--nesting N] [--trip-count N] [--cursors N] [--seed N] [-o FILE]
+"""
+import sys
+import random
+import argparse
+
+# named workload sizes used by bench_pipeline.py
+SCALES = {
+    "small": dict(statements=50, expr_depth=2, nesting=1, trip_count=5, cursors=2),
+    "medium": dict(statements=500, expr_depth=3, nesting=2, trip_count=5, cursors=4),
+    "large": dict(statements=5000, expr_depth=4, nesting=2, trip_count=5, cursors=8),
+}
+
+# statements in the body of each generated loop or conditional
+BODY_STATEMENTS = 4
+
+# share of top-level statements that open a loop or conditional
+BLOCK_RATIO = 0.2
+
+COLORS = ["RED", "GREEN", "BLUE", "ORANGE", "PURPLE", "TEAL", "NAVY", "GOLD", "CORAL", "INDIGO"]
+
+
+class ProgramGenerator:
+    """
+    @brief Writes one random program, statement by statement.
+    """
+
+    def __init__(self, statements, expr_depth, nesting, trip_count, cursors, seed):
+        """
+        @brief Initializes the generator.
+
+        @param statements Number of top-level statements.
+        @param expr_depth Maximum depth of arithmetic expressions.
+        @param nesting Maximum depth of nested loops and conditionals.
+        @param trip_count Number of iterations of each loop.
+        @param cursors Number of cursors created.
+        @param seed Seed of the random generator.
+        """
+        self.statements = statements
+        self.expr_depth = expr_depth
+        self.nesting = nesting
+        self.trip_count = trip_count
+        self.cursors = [f"c{i}" for i in range(max(cursors, 1))]
+        self.random = random.Random(seed)
+        self.constants = []  # int variables assigned once, readable anywhere
+        self.scratch = []  # int variables that are only written
+        self.loop_counter = 0
+        self.lines = []
+
+    def generate(self):
+        """
+        @brief Generates the program.
+
+        @return The source code.
+        """
+        self.emit(0, "var int windowWidth = 800;")
+        self.emit(0, "var int windowHeight = 600;")
+        for i in range(4):
+            self.emit(0, f"var int k{i} = {self.random.randint(1, 9)};")
+            self.constants.append(f"k{i}")
+        for i in range(2):
+            self.emit(0, f"var int s{i} = 0;")
+            self.scratch.append(f"s{i}")
+        for i, cursor in enumerate(self.cursors):
+            x = 100 + (i * 97) % 600
+            y = 100 + (i * 61) % 400
+            self.emit(0, f"cursor {cursor} = create_cursor({x}, {y});")
+
+        for _ in range(self.statements):
+            self.statement(0, [])
+        return "\n".join(self.lines) + "\n"
+
+    def emit(self, depth, line):
+        """
+        @brief Appends an indented line.
+
+        @param depth The nesting depth of the line.
+        @param line The line of code.
+        """
+        self.lines.append("    " * depth + line)
+
+    def expression(self, depth, counters=()):
+        """
+        @brief Builds an arithmetic expression.
+
+        @param depth The maximum depth of the expression.
+        @param counters The loop counters in scope.
+        @return The expression, as source code.
+        """
+        if depth <= 1 or self.random.random() < 0.3:
+            leaves = [str(self.random.randint(1, 9))] + self.constants + list(counters)
+            return self.random.choice(leaves)
+        left = self.expression(depth - 1, counters)
+        operator = self.random.choice(["+", "-", "*", "/"])
+        if operator == "/":
+            return f"({left} / {self.random.randint(1, 9)})"
+        return f"({left} {operator} {self.expression(depth - 1, counters)})"
+
+    def small_value(self, counters):
+        """
+        @brief Builds a small positive argument for a drawing method.
+
+        @param counters The loop counters in scope.
+        @return The argument, as source code.
+        """
+        value = str(self.random.randint(2, 40))
+        if counters and self.random.random() < 0.5:
+            return f"{value} + {self.random.choice(counters)}"
+        return value
+
+    def statement(self, depth, counters):
+        """
+        @brief Emits one statement, possibly a block.
+
+        @param depth The current nesting depth.
+        @param counters The loop counters in scope.
+        """
+        if depth < self.nesting and self.random.random() < BLOCK_RATIO:
+            self.random.choice([self.for_loop, self.while_loop, self.conditional])(depth, counters)
+            return
+
+        cursor = self.random.choice(self.cursors)
+        kind = self.random.randrange(6)
+        if kind == 0:
+            target = self.random.choice(self.scratch)
+            self.emit(depth, f"{target} = {self.expression(self.expr_depth, counters)};")
+        elif kind == 1:
+            self.emit(depth, f"{cursor}.color({self.random.choice(COLORS)});")
+        elif kind == 2:
+            self.emit(depth, f"{cursor}.move({self.small_value(counters)});")
+            self.emit(depth, f"{cursor}.rotate({self.random.randint(5, 90)});")
+        elif kind == 3:
+            self.emit(depth, f"{cursor}.draw_line({self.small_value(counters)});")
+        elif kind == 4:
+            filled = self.random.choice(["true", "false"])
+            self.emit(depth, f"{cursor}.draw_circle({self.small_value(counters)}, {filled});")
+        else:
+            shape = self.random.choice(["draw_rectangle", "draw_ellipse", "draw_triangle"])
+            filled = self.random.choice(["true", "false"])
+            self.emit(depth, f"{cursor}.{shape}({self.small_value(counters)}, "
+                             f"{self.small_value(counters)}, {filled});")
+
+    def body(self, depth, counters):
+        """
+        @brief Emits the statements of a block body.
+
+        @param depth The nesting depth of the body.
+        @param counters The loop counters in scope.
+        """
+        for _ in range(BODY_STATEMENTS):
+            self.statement(depth, counters)
+
+    def for_loop(self, depth, counters):
+        """
+        @brief Emits a for loop.
+
+        @param depth The current nesting depth.
+        @param counters The loop counters in scope.
+        """
+        counter = f"i{self.loop_counter}"
+        self.loop_counter += 1
+        self.emit(depth, f"for (var int {counter} = 0; {counter} < {self.trip_count}; "
+                         f"{counter} = {counter} + 1) {{")
+        self.body(depth + 1, counters + [counter])
+        self.emit(depth, "};")
+
+    def while_loop(self, depth, counters):
+        """
+        @brief Emits a while loop driven by a local counter.
+
+        @param depth The current nesting depth.
+        @param counters The loop counters in scope.
+        """
+        counter = f"w{self.loop_counter}"
+        self.loop_counter += 1
+        self.emit(depth, f"var int {counter} = 0;")
+        self.emit(depth, f"while ({counter} < {self.trip_count}) {{")
+        self.body(depth + 1, counters + [counter])
+        self.emit(depth + 1, f"{counter} = {counter} + 1;")
+        self.emit(depth, "};")
+
+    def conditional(self, depth, counters):
+        """
+        @brief Emits an if/elif/else chain.
+
+        @param depth The current nesting depth.
+        @param counters The loop counters in scope.
+        """
+        left = self.random.choice(self.constants + counters)
+        self.emit(depth, f"if ({left} < {self.random.randint(1, 50)}) {{")
+        self.body(depth + 1, counters)
+        self.emit(depth, "}")
+        self.emit(depth, f"elif ({left} == {self.random.randint(1, 50)}) {{")
+        self.body(depth + 1, counters)
+        self.emit(depth, "}")
+        self.emit(depth, "else {")
+        self.body(depth + 1, counters)
+        self.emit(depth, "};")
+
+
+def generate_program(statements=100, expr_depth=3, nesting=1, trip_count=10, cursors=2, seed=0):
+    """
+    @brief Generates a valid Draw++ program.
+
+    @param statements Number of top-level statements.
+    @param expr_depth Maximum depth of arithmetic expressions.
+    @param nesting Maximum depth of nested loops and conditionals.
+    @param trip_count Number of iterations of each loop.
+    @param cursors Number of cursors created.
+    @param seed Seed of the random generator.
+    @return The source code.
+    """
+    return ProgramGenerator(statements, expr_depth, nesting, trip_count, cursors, seed).generate()
+
+
+def main():
+    """
+    @brief Parses the command line and writes a program.
+    """
+    parser = argparse.ArgumentParser(description="Synthetic Draw++ program generator")
+    parser.add_argument('--scale', choices=SCALES, help='start from a named workload size')
+    parser.add_argument('--statements', type=int, help='top-level statements')
+    parser.add_argument('--expr-depth', type=int, help='maximum expression depth')
+    parser.add_argument('--nesting', type=int, help='maximum block nesting depth')
+    parser.add_argument('--trip-count', type=int, help='iterations of each loop')
+    parser.add_argument('--cursors', type=int, help='number of cursors')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('-o', '--output', help='output .dpp file (default: stdout)')
+    args = parser.parse_args()
+
+    params = dict(SCALES[args.scale]) if args.scale else {}
+    for name in ("statements", "expr_depth", "nesting", "trip_count", "cursors"):
+        if getattr(args, name) is not None:
+            params[name] = getattr(args, name)
+    source = generate_program(seed=args.seed, **params)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(source)
+    else:
+        sys.stdout.write(source)
+
+
+if __name__ == "__main__":
+    main()
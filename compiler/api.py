@@ -0,0 +1,386 @@
+import os
+import re
+import sys
+import time
+from compiler.lexer.lexer import Lexer
+from compiler.parser.parser import Parser
+from compiler.semantic.semantic_analyzer import SemanticAnalyzer, SemanticError
+from compiler.codegen.codegen import CodeGenerator
+from compiler.frame_channel import CHANNEL_ENV, HEADER, MAGIC, VERSION
+
+# libdrawpp, used to build rendered programs
+LIB_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'lib'))
+
+# gcc options and libraries of a Draw++ program; -I lib lets the generated
+# '#include "../lib/DPP/include/drawpp.h"' resolve from any directory
+GCC_FLAGS = [f"-I{LIB_DIR}", f"-I{os.path.join(LIB_DIR, 'DPP', 'include')}",
+             f"-I{os.path.join(LIB_DIR, 'SDL2', 'include')}", f"-L{LIB_DIR}"]
+GCC_LIBS = ["-ldrawpp", "-lSDL2", "-lm"]
+if sys.platform.startswith("linux"):
+    GCC_LIBS.append("-lrt")  # shm_open, used by the frame channel, on glibc before 2.34
+
+# maximum duration (s) of the gcc and execution stages of a render
+RENDER_TIMEOUT_S = 30.0
+
+# "line 12" / "line=12" and an optional column, as in lexer and parser errors
+ERROR_POSITION = re.compile(r"line[= ](\d+)(?:, column[= ](\d+))?")
+
+# size of the pixel area of the frame channel: the largest window, in RGBA
+FRAME_CAPACITY = 1000 * 1000 * 4
+
+# variables removed from the environment of a rendered program, so it writes no file
+PROFILE_ENVS = ("DRAWPP_PROFILE", "DRAWPP_PROFILE_OUTPUT")
+
+# operations of the compile server protocol (see handle_request)
+OPERATIONS = ("ping", "analyze", "compile", "render", "shutdown")
+
+# attempts to start a program whose executable another thread's fork still holds open
+EXEC_ATTEMPTS = 5
+
+
+class Diagnostic:
+    """
+    @brief An error reported by a compiler phase or a build stage.
+    """
+
+    def __init__(self, phase, message, line=None, column=None):
+        """
+        @brief Initializes a diagnostic.
+
+        @param phase The failing phase: Lexical, Syntax, Semantic, Codegen, C compilation or Execution.
+        @param message The error message.
+        @param line Optional. The 1-based source line.
+        @param column Optional. The 1-based source column.
+        """
+        self.phase = phase
+        self.message = message
+        self.line = line
+        self.column = column
+
+    def to_dict(self):
+        """
+        @brief Returns the diagnostic as a JSON-serializable dictionary.
+        """
+        return {"phase": self.phase, "message": self.message, "line": self.line, "column": self.column}
+
+    def __repr__(self):
+        return f"Diagnostic({self.phase!r}, {self.message!r}, line={self.line}, column={self.column})"
+
+
+class CompileResult:
+    """
+    @brief Outcome of compile_source().
+
+    ok tells whether every phase succeeded; code holds the generated C when
+    the code generation ran, diagnostics the errors, and timings the
+    duration of each phase in seconds, in the order they ran.
+    """
+
+    def __init__(self):
+        self.ok = False
+        self.code = None
+        self.diagnostics = []
+        self.timings = {}
+
+    def fail(self, phase, message, line=None, column=None):
+        """
+        @brief Records an error, locating it from its message when no line is given.
+
+        @param phase The failing phase.
+        @param message The error message.
+        @param line Optional. The 1-based source line.
+        @param column Optional. The 1-based source column.
+        @return The result, failed.
+        """
+        match = ERROR_POSITION.search(message)
+        if match and line is None:
+            line = int(match.group(1))
+            column = int(match.group(2)) if match.group(2) else None
+        self.ok = False
+        self.diagnostics.append(Diagnostic(phase, message, line, column))
+        return self
+
+    def to_dict(self):
+        """
+        @brief Returns the result as a response of the compile server protocol.
+        """
+        response = {"ok": self.ok, "timings": self.timings}
+        if self.code is not None:
+            response["code"] = self.code
+        if self.diagnostics:
+            first = self.diagnostics[0]
+            response.update(phase=first.phase, error=first.message, line=first.line, column=first.column)
+        return response
+
+
+class RenderResult(CompileResult):
+    """
+    @brief Outcome of render_source().
+
+    On success, pixels holds the final frame as RGBA bytes, height rows of
+    stride bytes each.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.width = 0
+        self.height = 0
+        self.stride = 0
+        self.pixels = None
+
+
+def compile_source(source, analyze_only=False, line_profile=False, save_image=True):
+    """
+    @brief Compiles Draw++ code held in memory.
+
+    Prints nothing and touches no file. Each call uses its own lexer,
+    parser, analyzer and generator, so calls may run on several threads at once.
+    @param source The Draw++ code.
+    @param analyze_only If True, stops after the semantic analysis.
+    @param line_profile Whether the generated program counts and times each statement.
+    @param save_image Whether the generated program saves its image as output.bmp.
+    @return A CompileResult.
+    """
+    return _compile(CompileResult(), source, analyze_only, line_profile, save_image)
+
+
+def _compile(result, source, analyze_only, line_profile, save_image):
+    """
+    @brief Does the work of compile_source(), filling the given result.
+    """
+    phase = "Lexical"
+    try:
+        start = time.perf_counter()
+        tokens = Lexer(source).tokenize()
+        result.timings["lex"] = time.perf_counter() - start
+
+        phase = "Syntax"
+        start = time.perf_counter()
+        ast = Parser(tokens).parse()
+        result.timings["parse"] = time.perf_counter() - start
+
+        phase = "Semantic"
+        start = time.perf_counter()
+        analyzer = SemanticAnalyzer()
+        try:
+            analyzer.visit(ast)
+            analyzer.check_window_dimensions()
+        except SemanticError as e:
+            return result.fail(phase, str(e), analyzer.line)
+        finally:
+            result.timings["semantic"] = time.perf_counter() - start
+        if analyze_only:
+            result.ok = True
+            return result
+
+        phase = "Codegen"
+        start = time.perf_counter()
+        result.code = CodeGenerator(line_profile=line_profile, save_image=save_image).generate(ast)
+        result.timings["codegen"] = time.perf_counter() - start
+        result.ok = True
+        return result
+    except Exception as e:
+        return result.fail(phase, str(e))
+
+
+def gcc_command(inputs, output):
+    """
+    @brief Builds the gcc command line that links a Draw++ program against libdrawpp.
+
+    @param inputs The input arguments of gcc, e.g. the generated C file.
+    @param output The path of the executable.
+    @return The command, as a list of arguments.
+    """
+    return ["gcc", *GCC_FLAGS, *inputs, "-o", output, *GCC_LIBS]
+
+
+def render_source(source, timeout=RENDER_TIMEOUT_S):
+    """
+    @brief Compiles Draw++ code held in memory, then builds and runs it offscreen.
+
+    Nothing is written to disk: gcc reads the C code from a pipe and links
+    the program into an anonymous memory file, which is executed from there,
+    and the program publishes its final frame to a shared memory frame
+    channel instead of saving output.bmp. Linux only. Thread-safe, like
+    compile_source().
+    @param source The Draw++ code.
+    @param timeout The maximum duration of the gcc and execution stages, in seconds.
+    @return A RenderResult.
+    """
+    # imported here: compile_source(), and the in-process fallback of the clients, do not need them
+    import errno
+    import subprocess
+    from multiprocessing import shared_memory
+
+    result = _compile(RenderResult(), source, False, False, False)
+    if not result.ok:
+        return result
+    if not hasattr(os, "memfd_create"):
+        return result.fail("C compilation", "Rendering in memory needs memfd_create (Linux)")
+
+    program = os.memfd_create("drawpp-program")
+    try:
+        start = time.perf_counter()
+        try:
+            gcc = subprocess.run(gcc_command(["-x", "c", "-", "-x", "none"], f"/dev/fd/{program}"),
+                                 input=result.code.encode(), pass_fds=(program,),
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=timeout)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            return result.fail("C compilation", str(e))
+        result.timings["gcc"] = time.perf_counter() - start
+        if gcc.returncode != 0:
+            return result.fail("C compilation", gcc.stderr.decode(errors="replace").strip())
+
+        # the kernel refuses to execute a file open for writing: keep a read-only descriptor only
+        executable = os.open(f"/proc/self/fd/{program}", os.O_RDONLY | os.O_CLOEXEC)
+    finally:
+        os.close(program)
+
+    channel = shared_memory.SharedMemory(create=True, size=HEADER.size + FRAME_CAPACITY)
+    try:
+        HEADER.pack_into(channel.buf, 0, MAGIC, VERSION, FRAME_CAPACITY, 0, 0, 0, 0, 0)
+        env = {name: value for name, value in os.environ.items() if name not in PROFILE_ENVS}
+        env.update(SDL_VIDEODRIVER="dummy", SDL_RENDER_DRIVER="software")
+        env[CHANNEL_ENV] = channel.name
+
+        start = time.perf_counter()
+        for attempt in range(EXEC_ATTEMPTS):
+            try:
+                run = subprocess.run([f"/proc/self/fd/{executable}"], pass_fds=(executable,), env=env,
+                                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                     stderr=subprocess.PIPE, timeout=timeout)
+                break
+            except OSError as e:
+                # a fork made by another thread while gcc wrote the program may still hold it
+                if e.errno != errno.ETXTBSY or attempt == EXEC_ATTEMPTS - 1:
+                    return result.fail("Execution", str(e))
+                time.sleep(0.001 * 2 ** attempt)
+            except subprocess.TimeoutExpired as e:
+                return result.fail("Execution", str(e))
+        result.timings["execute"] = time.perf_counter() - start
+        if run.returncode != 0:
+            return result.fail("Execution", run.stderr.decode(errors="replace").strip()
+                               or f"The program exited with status {run.returncode}")
+
+        _, _, _, width, height, stride, sequence, frames = HEADER.unpack_from(channel.buf, 0)
+        if frames == 0 or sequence % 2 or width == 0 or height == 0:
+            return result.fail("Execution", "The program published no frame")
+        result.width, result.height, result.stride = width, height, stride
+        result.pixels = bytes(channel.buf[HEADER.size:HEADER.size + stride * height])
+        return result
+    finally:
+        os.close(executable)
+        channel.close()
+        channel.unlink()
+
+
+def compile_text(source, analyze_only=False, line_profile=False):
+    """
+    @brief Runs the compiler phases on Draw++ code, without printing anything.
+
+    @param source The Draw++ code.
+    @param analyze_only If True, stops after the semantic analysis.
+    @param line_profile Whether the generated program counts and times each statement.
+    @return A response dictionary: ok, the generated C code if compiled, the
+            failing phase, error message and position otherwise, and the time
+            of each phase in seconds.
+    """
+    return compile_source(source, analyze_only, line_profile).to_dict()
+
+
+def render_text(source, build_dir=None, line_profile=False, timeout=RENDER_TIMEOUT_S):
+    """
+    @brief Compiles Draw++ code, then builds and runs it offscreen.
+
+    @param source The Draw++ code.
+    @param build_dir Optional. The directory receiving the C file, the executable
+           and the image, which are kept. Without it, a temporary directory is used
+           and the image is returned in the response, base64-encoded.
+    @param line_profile Whether the program writes a line profile next to the image.
+    @param timeout The maximum duration of the gcc and execution stages, in seconds.
+    @return A response dictionary, as compile_text, with image_path or image.
+    """
+    # imported here: the in-process fallback of the clients mostly compiles
+    import base64
+    import shutil
+    import tempfile
+    import subprocess
+
+    response = compile_text(source, line_profile=line_profile)
+    if not response["ok"]:
+        return response
+    code = response.pop("code")
+
+    keep = build_dir is not None
+    build_dir = os.path.abspath(build_dir) if keep else tempfile.mkdtemp(prefix="drawpp-serve-")
+    try:
+        os.makedirs(build_dir, exist_ok=True)
+        c_file = os.path.join(build_dir, "temp.c")
+        executable = os.path.join(build_dir, "temp_program")
+        image_path = os.path.join(build_dir, "output.bmp")
+        with open(c_file, "w") as f:
+            f.write(code)
+        if os.path.exists(image_path):
+            os.remove(image_path)
+
+        gcc_cmd = gcc_command([c_file], executable)
+        run_env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_RENDER_DRIVER="software")
+        for phase, name, command, env in (("C compilation", "gcc", gcc_cmd, os.environ),
+                                          ("Execution", "execute", [executable], run_env)):
+            start = time.perf_counter()
+            try:
+                result = subprocess.run(command, cwd=build_dir, env=env, stdin=subprocess.DEVNULL,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                        timeout=timeout)
+            except (OSError, subprocess.TimeoutExpired) as e:
+                response.update(ok=False, phase=phase, error=str(e))
+                return response
+            response["timings"][name] = time.perf_counter() - start
+            if result.returncode != 0:
+                response.update(ok=False, phase=phase,
+                                error=result.stderr.decode(errors="replace").strip())
+                return response
+
+        if keep:
+            response["image_path"] = image_path
+        else:
+            with open(image_path, "rb") as f:
+                response["image"] = base64.b64encode(f.read()).decode("ascii")
+        return response
+    finally:
+        if not keep:
+            shutil.rmtree(build_dir, ignore_errors=True)
+
+
+def handle_request(request, server=None):
+    """
+    @brief Carries out one request of the protocol.
+
+    @param request The decoded request: {"op": ..., "source": ..., ...}.
+    @param server Optional. The CompileServer (compiler/server.py), needed by the shutdown operation.
+    @return The response dictionary.
+    """
+    if not isinstance(request, dict):
+        return {"ok": False, "phase": "Protocol", "error": "A request must be a JSON object"}
+    op = request.get("op")
+    if op not in OPERATIONS:
+        return {"ok": False, "phase": "Protocol",
+                "error": f"Unknown operation '{op}', expected one of {', '.join(OPERATIONS)}"}
+
+    if op == "ping":
+        return {"ok": True, "pid": os.getpid()}
+    if op == "shutdown":
+        if server is None:
+            return {"ok": False, "phase": "Protocol", "error": "No server to shut down"}
+        server.request_shutdown()
+        return {"ok": True}
+
+    source = request.get("source")
+    if not isinstance(source, str):
+        return {"ok": False, "phase": "Protocol", "error": "Missing 'source' string"}
+    line_profile = bool(request.get("line_profile", False))
+    if op == "analyze":
+        return compile_text(source, analyze_only=True)
+    if op == "compile":
+        return compile_text(source, line_profile=line_profile)
+    return render_text(source, request.get("build_dir"), line_profile)
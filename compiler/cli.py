@@ -0,0 +1,208 @@
+import os
+import sys
+import argparse
+from compiler.client import default_socket_path, report_lines, request_or_local, send_request
+
+# The server, watch and language server modules, like the compiler phases,
+# are only imported by the commands that need them, so that a client
+# answered by the server starts quickly.
+
+
+def read_source(path):
+    """
+    @brief Reads a Draw++ source file.
+
+    @param path The path of the .dpp file.
+    @return The source code, or None after printing an error.
+    """
+    if not path.endswith('.dpp'):
+        print("❌ Error: The source file must have a .dpp extension")
+        return None
+    try:
+        with open(path, 'r') as f:
+            return f.read()
+    except OSError as e:
+        print(f"❌ Error: Cannot read {path}: {e.strerror}")
+        return None
+
+
+def report(response, served):
+    """
+    @brief Prints the outcome of a request and its phase timings.
+
+    @param response The response dictionary.
+    @param served Whether the server answered, rather than the in-process fallback.
+    @return True if the request succeeded.
+    """
+    for line in report_lines(response, served):
+        print(line)
+    return bool(response.get("ok"))
+
+
+def cmd_serve(args):
+    """
+    @brief Runs the compile server until it is stopped.
+    """
+    from compiler.server import CompileServer, DEFAULT_WORKERS
+    workers = args.workers or DEFAULT_WORKERS
+    try:
+        server = CompileServer(args.socket, workers)
+    except OSError as e:
+        print(f"❌ Error: {e}")
+        return 1
+    print(f"Draw++ server listening on {server.socket_path} ({workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    print("Draw++ server stopped")
+    return 0
+
+
+def cmd_stop(args):
+    """
+    @brief Asks the running server to stop.
+    """
+    try:
+        send_request({"op": "shutdown"}, args.socket, timeout=5.0)
+    except OSError:
+        print(f"No Draw++ server running on {args.socket or default_socket_path()}")
+        return 1
+    print("Draw++ server stopping")
+    return 0
+
+
+def cmd_analyze(args):
+    """
+    @brief Checks a file up to the semantic analysis.
+    """
+    source = read_source(args.input)
+    if source is None:
+        return 1
+    response, served = request_or_local({"op": "analyze", "source": source}, args.socket)
+    if report(response, served):
+        print(f"✓ {args.input}: no error")
+        return 0
+    return 1
+
+
+def cmd_compile(args):
+    """
+    @brief Compiles a file to C.
+    """
+    source = read_source(args.input)
+    if source is None:
+        return 1
+    request = {"op": "compile", "source": source, "line_profile": args.line_profile}
+    response, served = request_or_local(request, args.socket)
+    if not report(response, served):
+        return 1
+
+    output_file = args.output or os.path.splitext(args.input)[0] + '.c'
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    with open(output_file, 'w') as f:
+        f.write(response["code"])
+    print(f"✓ C code generated successfully: {output_file}")
+    return 0
+
+
+def cmd_render(args):
+    """
+    @brief Compiles, builds and runs a file offscreen.
+    """
+    source = read_source(args.input)
+    if source is None:
+        return 1
+    build_dir = os.path.abspath(args.build_dir or os.path.dirname(os.path.abspath(args.input)))
+    request = {"op": "render", "source": source, "build_dir": build_dir,
+               "line_profile": args.line_profile}
+    response, served = request_or_local(request, args.socket)
+    if not report(response, served):
+        return 1
+    print(f"✓ Image saved as {response['image_path']}")
+    return 0
+
+
+def cmd_watch(args):
+    """
+    @brief Rebuilds files as they change, until interrupted.
+    """
+    from compiler.watch import WatchSession, DEFAULT_JOBS
+    try:
+        session = WatchSession(args.paths, args.jobs or DEFAULT_JOBS, not args.no_render,
+                               args.socket, args.poll)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return 1
+    session.run()
+    return 0
+
+
+def cmd_lsp(args):
+    """
+    @brief Runs the language server until the client exits.
+    """
+    from compiler.lsp import LanguageServer
+    return LanguageServer().serve()
+
+
+def main(argv=None):
+    """
+    @brief Entry point of the drawpp command.
+
+    analyze, compile and render go through the compile server when one is
+    running on the socket, and run in process otherwise.
+    @param argv Optional. The arguments, without the program name.
+    """
+    parser = argparse.ArgumentParser(prog="drawpp", description="Draw++ command line")
+    parser.add_argument('--socket', help=f'server socket (default: $DRAWPP_SOCKET or {default_socket_path()})')
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser('serve', help='run the compile server')
+    serve.add_argument('--workers', type=int,
+                       help='requests handled at the same time (default 4)')
+    serve.set_defaults(handler=cmd_serve)
+
+    stop = commands.add_parser('stop', help='stop the compile server')
+    stop.set_defaults(handler=cmd_stop)
+
+    check = commands.add_parser('analyze', help='check a file without generating code')
+    check.add_argument('input', help='Draw++ source file (.dpp)')
+    check.set_defaults(handler=cmd_analyze)
+
+    build = commands.add_parser('compile', help='compile a file to C')
+    build.add_argument('input', help='Draw++ source file (.dpp)')
+    build.add_argument('-o', '--output', help='output C file (default: next to the input)')
+    build.add_argument('--line-profile', action='store_true',
+                       help='count and time each statement by source line')
+    build.set_defaults(handler=cmd_compile)
+
+    render = commands.add_parser('render', help='compile, build and run a file offscreen')
+    render.add_argument('input', help='Draw++ source file (.dpp)')
+    render.add_argument('--build-dir', help='directory receiving the program and output.bmp '
+                                            '(default: next to the input)')
+    render.add_argument('--line-profile', action='store_true',
+                        help='also write drawpp_profile.json with per-line figures')
+    render.set_defaults(handler=cmd_render)
+
+    watch = commands.add_parser('watch', help='rebuild files as they change')
+    watch.add_argument('paths', nargs='+', help='.dpp files or directories')
+    watch.add_argument('-j', '--jobs', type=int,
+                       help='files rebuilt at the same time (default 2)')
+    watch.add_argument('--no-render', action='store_true',
+                       help='only compile to C, next to each file, instead of rendering <name>.bmp')
+    watch.add_argument('--poll', action='store_true',
+                       help='poll modification times instead of using inotify')
+    watch.set_defaults(handler=cmd_watch)
+
+    lsp = commands.add_parser('lsp', help='run the language server on stdin and stdout')
+    lsp.set_defaults(handler=cmd_lsp)
+
+    args = parser.parse_args(argv)
+    sys.exit(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
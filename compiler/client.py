@@ -0,0 +1,159 @@
+import os
+import json
+import stat
+import socket
+import struct
+
+# environment variable overriding the path of the server socket
+SOCKET_ENV = "DRAWPP_SOCKET"
+
+# maximum time (s) to connect to the server
+CONNECT_TIMEOUT_S = 1.0
+
+# maximum time (s) to wait for the answer of the server before compiling in process;
+# a render runs gcc and the program, each limited to RENDER_TIMEOUT_S (compiler/api.py)
+RESPONSE_TIMEOUT_S = 10.0
+RENDER_RESPONSE_TIMEOUT_S = 75.0
+
+
+def socket_directory():
+    """
+    @brief Returns the private directory of the default server socket.
+
+    @return $XDG_RUNTIME_DIR if set, otherwise drawpp-<uid> in the temporary directory,
+            which make_socket_directory creates with mode 0700.
+    """
+    directory = os.environ.get("XDG_RUNTIME_DIR")
+    if directory:
+        return directory
+    # same lookup as tempfile.gettempdir(), without importing tempfile and random
+    for name in ("TMPDIR", "TEMP", "TMP"):
+        directory = os.environ.get(name)
+        if directory:
+            break
+    else:
+        directory = "/tmp"
+    return os.path.join(directory, f"drawpp-{os.getuid()}")
+
+
+def default_socket_path():
+    """
+    @brief Returns the path of the server socket.
+
+    @return DRAWPP_SOCKET if set, otherwise drawpp.sock in socket_directory().
+    """
+    return os.environ.get(SOCKET_ENV) or os.path.join(socket_directory(), "drawpp.sock")
+
+
+def make_socket_directory(socket_path):
+    """
+    @brief Creates the directory of the default socket, private to the current user.
+
+    Other socket paths are left to the caller.
+    @param socket_path The path of the socket.
+    @throws OSError if the directory belongs to another user or is accessible to others.
+    """
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    if directory != os.path.abspath(socket_directory()):
+        return
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{directory} must be a directory of yours with mode 0700")
+
+
+def check_server_owner(client, socket_path):
+    """
+    @brief Makes sure the server socket belongs to the current user.
+
+    Otherwise another user could answer compile requests with code of their choice.
+    @param client The socket, connected when SO_PEERCRED is available to check the server process.
+    @param socket_path The path of the socket.
+    @throws PermissionError if the socket or the server belongs to another user.
+    """
+    info = os.lstat(socket_path)
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        raise PermissionError(f"{socket_path} is not a socket of yours")
+    if hasattr(socket, "SO_PEERCRED"):
+        credentials = client.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        _, uid, _ = struct.unpack("3i", credentials)
+        if uid != os.getuid():
+            raise PermissionError(f"The server on {socket_path} runs as another user")
+
+
+def send_request(request, socket_path=None, timeout=None, connect_timeout=CONNECT_TIMEOUT_S):
+    """
+    @brief Sends one request to a running server.
+
+    @param request The request dictionary.
+    @param socket_path Optional. The path of the socket (see default_socket_path).
+    @param timeout Optional. The maximum time to wait for the response, in seconds.
+    @param connect_timeout The maximum time to connect, in seconds.
+    @return The response dictionary.
+    @throws OSError if no server of the current user is listening, or it did not answer in time.
+    """
+    socket_path = socket_path or default_socket_path()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(connect_timeout)
+        client.connect(socket_path)
+        check_server_owner(client, socket_path)
+        client.settimeout(timeout)
+        with client.makefile("rwb") as stream:
+            stream.write(json.dumps(request).encode() + b"\n")
+            stream.flush()
+            line = stream.readline()
+    if not line:
+        raise ConnectionError("The server closed the connection")
+    return json.loads(line)
+
+
+def ping(socket_path=None):
+    """
+    @brief Checks whether a server is listening.
+
+    @param socket_path Optional. The path of the socket (see default_socket_path).
+    @return True if a server answered.
+    """
+    try:
+        return send_request({"op": "ping"}, socket_path, timeout=1.0).get("ok", False)
+    except (OSError, ValueError):
+        return False
+
+
+def request_or_local(request, socket_path=None, timeout=None):
+    """
+    @brief Sends a request to the server, or carries it out in process if none answers.
+
+    The server may be busy with other clients: past its response timeout,
+    the request runs in process instead.
+    @param request The request dictionary.
+    @param socket_path Optional. The path of the socket (see default_socket_path).
+    @param timeout Optional. The response timeout, in seconds; by default
+           RENDER_RESPONSE_TIMEOUT_S for a render, RESPONSE_TIMEOUT_S otherwise.
+    @return A tuple (response, served), served being True if the server answered.
+    """
+    if timeout is None:
+        timeout = RENDER_RESPONSE_TIMEOUT_S if request.get("op") == "render" else RESPONSE_TIMEOUT_S
+    try:
+        return send_request(request, socket_path, timeout), True
+    except (OSError, ValueError):
+        from compiler.api import handle_request
+        return handle_request(request), False
+
+
+def report_lines(response, served):
+    """
+    @brief Describes the outcome of a compile request and its phase timings.
+
+    @param response The response dictionary.
+    @param served Whether the server answered, rather than the in-process fallback.
+    @return The lines to show: the error if the request failed, then the timings.
+    """
+    timings = ", ".join(f"{name} {seconds * 1e3:.1f} ms"
+                        for name, seconds in response.get("timings", {}).items())
+    where = "server" if served else "in process"
+    lines = []
+    if not response.get("ok"):
+        lines.append(f"❌ Compilation error ({response.get('phase')}): {response.get('error')}")
+    lines.append(f"   [{where}] {timings}")
+    return lines
@@ -10,40 +10,74 @@ class CodeGenError(Exception):
     pass
 
 
+# default configuration, next to this module
+DEFAULT_CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "codegen_config.json")
+
+# configurations already loaded in this process, by absolute path
+_config_cache = {}
+
+
+def load_config(config_file=None):
+    """
+    @brief Loads a code generation configuration, once per process.
+
+    The file is read and its type and operator keys are converted on the
+    first call only; later calls, from any CodeGenerator, share the result,
+    which must not be modified.
+
+    @param config_file Optional path to a configuration file, `codegen_config.json` by default.
+    @return A tuple (config, type_mappings, operator_map).
+    """
+    path = os.path.abspath(config_file or DEFAULT_CONFIG_FILE)
+    cached = _config_cache.get(path)
+    if cached is not None:
+        return cached
+
+    with open(path, 'r') as f:
+        config = json.load(f)
+
+    # Convert keys "TokenType.X" to str(TokenType.X) if needed
+    type_mappings = {}
+    for k, v in config["type_mappings"].items():
+        enum_name = getattr(TokenType, k.split('.')[-1], None)
+        if enum_name:
+            type_mappings[str(enum_name)] = v
+
+    operator_map = {}
+    for k, v in config["operators"].items():
+        enum_name = getattr(TokenType, k.split('.')[-1], None)
+        if enum_name:
+            operator_map[str(enum_name)] = v
+
+    cached = (config, type_mappings, operator_map)
+    _config_cache[path] = cached
+    return cached
+
+
 class CodeGenerator:
     """
     @brief A class responsible for generating C code from an abstract syntax tree (AST).
     """
 
-    def __init__(self, config_file=None):
+    def __init__(self, config_file=None, line_profile=False, save_image=True):
         """
         @brief Initializes the CodeGenerator with configuration settings.
 
         @param config_file Optional path to a configuration file. If not provided, a default file named `codegen_config.json` is used.
+        @param line_profile Whether each statement is wrapped in counters and timers
+               tagged with its source line (see line_profile_init in libdrawpp).
+        @param save_image Whether the program saves its image as output.bmp; without
+               it, the frame is only published to a frame channel, if one is attached.
         """
         self.indent_level = 0
         self.output = []
+        self.line_profile = line_profile
+        self.save_image = save_image
+        self.profiled_lines = []  # source line of each statement counter
+        self.profiled_parents = []  # counter of the statement enclosing each counter, or -1
+        self.open_counters = []  # counters of the statements being generated, innermost last
 
-        if config_file is None:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            config_file = os.path.join(current_dir, "codegen_config.json")
-
-        with open(config_file, 'r') as f:
-            self.config = json.load(f)
-
-        # Convert keys "TokenType.X" to str(TokenType.X) if needed
-        self.type_mappings = {}
-        for k, v in self.config["type_mappings"].items():
-            enum_name = getattr(TokenType, k.split('.')[-1], None)
-            if enum_name:
-                self.type_mappings[str(enum_name)] = v
-
-        self.operator_map = {}
-        for k, v in self.config["operators"].items():
-            enum_name = getattr(TokenType, k.split('.')[-1], None)
-            if enum_name:
-                self.operator_map[str(enum_name)] = v
-
+        self.config, self.type_mappings, self.operator_map = load_config(config_file)
         self.color_map = self.config["colors"]
 
     def indent(self):
@@ -89,11 +123,13 @@ class CodeGenerator:
         Generates the C code with a single final render pass, captures the image, then quits.
         """
         self.visible_cursors = []  # visible cursors to be drawn after shapes
+        self.block_cursors = []  # cursors created in each open block, released when it ends
 
         # 1) inclusions
         for header in self.config["headers"]:
             self.write_line(header)
         self.write_line()
+        profile_table_index = len(self.output)
 
         # 2) main
         self.write_line("int main(int argc, char* argv[]) {")
@@ -106,11 +142,13 @@ class CodeGenerator:
         self.write_line("return 1;")
         self.indent_level -= 1
         self.write_line("}")
+        if self.line_profile:
+            self.write_line("line_profile_init(profiled_lines, profiled_parents, PROFILED_LINE_COUNT);")
         self.write_line()
 
         # 3) nodes visit
         for stmt in ast.statements:
-            self.visit(stmt)
+            self.visit_statement(stmt)
 
         # 4) draw visible cursors
         if self.visible_cursors:
@@ -118,13 +156,43 @@ class CodeGenerator:
             for cursor_name in self.visible_cursors:
                 self.write_line(f"set_cursor_visibility({cursor_name}, true);")
 
-        # 5) render SDL image
+        # 5) cull and rasterize the recorded draw commands, then render SDL image
+        self.write_line("flush_draw_commands();")
         self.write_line('SDL_Delay(130);')  # required to fix some render bugs
         self.write_line('printf("Presenting renderer...\\n");')
         self.write_line("SDL_RenderPresent(renderer);")
         self.write_line()
 
         # 6) capture image and save it
+        if self.save_image:
+            self.write_image_capture()
+
+        self.write_line('printf("Cleaning up...\\n");')
+        self.write_line("cleanup_SDL();")
+        self.write_line()
+
+        self.write_line('printf("Done!\\n");')
+        self.write_line("return 0;")
+        self.indent_level -= 1
+        self.write_line("}")
+
+        # 7) tables mapping each statement counter to its source line and enclosing statement
+        if self.line_profile:
+            lines = ", ".join(str(line) for line in self.profiled_lines) or "0"
+            parents = ", ".join(str(parent) for parent in self.profiled_parents) or "-1"
+            self.output[profile_table_index:profile_table_index] = [
+                f"#define PROFILED_LINE_COUNT {len(self.profiled_lines)}",
+                f"static const int profiled_lines[] = {{{lines}}};",
+                f"static const int profiled_parents[] = {{{parents}}};",
+                "",
+            ]
+
+        return "\n".join(self.output)
+
+    def write_image_capture(self):
+        """
+        @brief Writes the code reading the rendered frame and saving it as output.bmp.
+        """
         self.write_line('printf("Saving output image...\\n");')
         self.write_line("SDL_Surface* surface = SDL_CreateRGBSurfaceWithFormat(")
         self.indent_level += 1
@@ -160,16 +228,26 @@ class CodeGenerator:
         self.write_line("SDL_FreeSurface(surface);")
         self.write_line()
 
-        self.write_line('printf("Cleaning up...\\n");')
-        self.write_line("cleanup_SDL();")
-        self.write_line()
+    def visit_statement(self, node):
+        """
+        @brief Generates code for a statement, between line profiler calls if enabled.
 
-        self.write_line('printf("Done!\\n");')
-        self.write_line("return 0;")
-        self.indent_level -= 1
-        self.write_line("}")
+        The calls are not wrapped in braces, so a declaration stays in scope
+        for the statements that follow it.
 
-        return "\n".join(self.output)
+        @param node The statement node.
+        """
+        if not self.line_profile or node.line is None:
+            self.visit(node)
+            return
+        counter = len(self.profiled_lines)
+        self.profiled_lines.append(node.line)
+        self.profiled_parents.append(self.open_counters[-1] if self.open_counters else -1)
+        self.write_line(f"line_profile_enter({counter});")
+        self.open_counters.append(counter)
+        self.visit(node)
+        self.open_counters.pop()
+        self.write_line(f"line_profile_exit({counter});")
 
     def visit_Program(self, node):
         """
@@ -207,6 +285,8 @@ class CodeGenerator:
         x = self.visit(node.x)
         y = self.visit(node.y)
         self.write_line(f"Cursor* {node.name} = create_cursor({x}, {y});")
+        if self.block_cursors:
+            self.block_cursors[-1].append(node.name)
 
     def visit_CursorMethod(self, node):
         """
@@ -234,7 +314,8 @@ class CodeGenerator:
         elif method == "visible":
             visibility = "true"
             self.write_line(f"set_cursor_visibility({node.cursor_name}, {visibility});")
-            if visibility:
+            # block-local cursors are released before the final redraw
+            if visibility and not self.is_block_cursor(node.cursor_name):
                 self.visible_cursors.append(node.cursor_name)
 
     def visit_DrawCommand(self, node):
@@ -266,6 +347,30 @@ class CodeGenerator:
             self.write_line(f"cursor_draw_ellipse({node.cursor_name}, {
                             params[0]}, {params[1]}, {params[2]});")
 
+    def visit_block(self, statements):
+        """
+        @brief Generates code for the statements of a block.
+
+        Cursors created inside the block are released at its end, so a cursor
+        created in a loop body returns to the cursor pool on every iteration.
+
+        @param statements The statements of the block.
+        """
+        self.block_cursors.append([])
+        for stmt in statements:
+            self.visit_statement(stmt)
+        for cursor_name in self.block_cursors.pop():
+            self.write_line(f"destroy_cursor({cursor_name});")
+
+    def is_block_cursor(self, name):
+        """
+        @brief Checks whether a cursor was created inside a currently open block.
+
+        @param name The cursor name.
+        @return True if the cursor is local to an open block.
+        """
+        return any(name in cursors for cursors in self.block_cursors)
+
     def visit_If(self, node):
         """
         @brief Generates code for an if statement.
@@ -275,22 +380,19 @@ class CodeGenerator:
         condition = self.visit(node.condition)
         self.write_line(f"if ({condition}) {{")
         self.indent_level += 1
-        for stmt in node.true_body:
-            self.visit(stmt)
+        self.visit_block(node.true_body)
         self.indent_level -= 1
         if node.elif_bodies:
             for elif_condition, elif_body in node.elif_bodies:
                 cond = self.visit(elif_condition)
                 self.write_line(f"}} else if ({cond}) {{")
                 self.indent_level += 1
-                for stmt in elif_body:
-                    self.visit(stmt)
+                self.visit_block(elif_body)
                 self.indent_level -= 1
         if node.false_body:
             self.write_line("} else {")
             self.indent_level += 1
-            for stmt in node.false_body:
-                self.visit(stmt)
+            self.visit_block(node.false_body)
             self.indent_level -= 1
         self.write_line("}")
 
@@ -322,8 +424,7 @@ class CodeGenerator:
 
         self.write_line(f"for ({init_code} {cond_code}; {update_code}) {{")
         self.indent_level += 1
-        for stmt in node.body:
-            self.visit(stmt)
+        self.visit_block(node.body)
         self.indent_level -= 1
         self.write_line("}")
 
@@ -336,8 +437,7 @@ class CodeGenerator:
         condition = self.visit(node.condition)
         self.write_line(f"while ({condition}) {{")
         self.indent_level += 1
-        for stmt in node.body:
-            self.visit(stmt)
+        self.visit_block(node.body)
         self.indent_level -= 1
         self.write_line("}")
 
@@ -1,9 +1,12 @@
 import os
 import argparse
-from compiler.lexer.lexer import Lexer
-from compiler.parser.parser import Parser
-from compiler.semantic.semantic_analyzer import SemanticAnalyzer, SemanticError, analyze
-from compiler.codegen.codegen import CodeGenerator
+import importlib
+from compiler.profiler import PhaseProfiler, PHASES
+
+# The phase modules are imported by compile(), so that the command line
+# (--help, argument errors) answers without loading them.
+PHASE_MODULES = ("compiler.lexer.lexer", "compiler.parser.parser", "compiler.parser.syntax_tree",
+                 "compiler.semantic.semantic_analyzer", "compiler.codegen.codegen")
 
 
 class CompilationError(Exception):
@@ -28,12 +31,18 @@ class Compiler:
     and code generation for Draw++ source files.
     """
 
-    def __init__(self):
+    def __init__(self, profiler=None, line_profile=False):
         """
         @brief Initializes the Compiler instance with placeholders for tokens and AST.
+
+        @param profiler Optional PhaseProfiler measuring each phase.
+        @param line_profile Whether the generated program counts and times each
+               statement by source line.
         """
         self.tokens = None
         self.ast = None
+        self.profiler = profiler if profiler is not None else PhaseProfiler()
+        self.line_profile = line_profile
 
     def compile(self, input_file, output_file=None):
         """
@@ -49,26 +58,42 @@ class Compiler:
                 raise CompilationError(
                     "Input", "The source file must have a .dpp extension")
 
+            # Load the phases before the first is measured, so that no phase
+            # is charged with the time and memory of importing the others
+            for module in PHASE_MODULES:
+                importlib.import_module(module)
+
             # Read the source file
             print(f"\n[1/5] Reading source file: {input_file}")
-            with open(input_file, 'r') as f:
-                source_code = f.read()
+            with self.profiler.phase("read"):
+                with open(input_file, 'r') as f:
+                    source_code = f.read()
+            self.profiler.record("read", bytes=len(source_code.encode()),
+                                 lines=source_code.count("\n") + 1)
 
             # tokenization
             print("\n[2/5] Tokenizing...")
-            self.tokens = self._lexical_analysis(source_code)
+            with self.profiler.phase("lex"):
+                self.tokens = self._lexical_analysis(source_code)
+            self.profiler.record("lex", tokens=len(self.tokens))
             print("✓ Your code has been tokenized successfully")
             print(f"Number of tokens: {len(self.tokens)}")
 
             # Syntax analysis
             print("\n[3/5] Performing syntax analysis...")
-            self.ast = self._syntax_analysis(self.tokens)
+            with self.profiler.phase("parse"):
+                self.ast = self._syntax_analysis(self.tokens)
+            if self.profiler.enabled:
+                from compiler.parser.syntax_tree import count_nodes
+                self.profiler.record("parse", statements=len(self.ast.statements),
+                                     ast_nodes=count_nodes(self.ast))
             print("✓ Syntax analysis completed successfully")
             print(f"Number of statements: {len(self.ast.statements)}")
 
             # Semantic analysis
             print("\n[4/5] Performing semantic analysis...")
-            success, error = self._semantic_analysis(self.ast)
+            with self.profiler.phase("semantic"):
+                success, error = self._semantic_analysis(self.ast)
             if not success:
                 raise CompilationError("Semantic", error)
             print("✓ Semantic analysis completed successfully")
@@ -78,7 +103,12 @@ class Compiler:
             if output_file is None:
                 output_file = os.path.splitext(input_file)[0] + '.c'
 
-            self._generate_code(self.ast, output_file)
+            with self.profiler.phase("codegen"):
+                code = self._generate_code(self.ast)
+            self.profiler.record("codegen", output_lines=code.count("\n"))
+            with self.profiler.phase("write"):
+                self._write_code(code, output_file)
+            self.profiler.record("write", bytes=len(code.encode()))
             print(f"✓ C code generated successfully: {output_file}")
 
             print("\n✨ Compilation completed successfully!")
@@ -103,6 +133,7 @@ class Compiler:
         @param source_code The source code to tokenize.
         @return A list of tokens generated from the source code.
         """
+        from compiler.lexer.lexer import Lexer
         lexer = Lexer(source_code)
         return lexer.tokenize()
 
@@ -113,6 +144,7 @@ class Compiler:
         @param tokens The tokens generated from lexical analysis.
         @return An Abstract Syntax Tree (AST) representing the program.
         """
+        from compiler.parser.parser import Parser
         parser = Parser(tokens)
         return parser.parse()
 
@@ -124,17 +156,27 @@ class Compiler:
         @return A tuple (success, error), where success is a boolean indicating
         whether the analysis succeeded, and error is the error message (if any).
         """
+        from compiler.semantic.semantic_analyzer import analyze
         return analyze(ast)
 
-    def _generate_code(self, ast, output_file):
+    def _generate_code(self, ast):
         """
-        @brief Generates C code from the Abstract Syntax Tree and writes it to a file.
+        @brief Generates C code from the Abstract Syntax Tree.
 
         @param ast The Abstract Syntax Tree representing the program.
+        @return The generated C code as a string.
+        """
+        from compiler.codegen.codegen import CodeGenerator
+        generator = CodeGenerator(line_profile=self.line_profile)
+        return generator.generate(ast)
+
+    def _write_code(self, code, output_file):
+        """
+        @brief Writes the generated C code to a file.
+
+        @param code The generated C code.
         @param output_file The path to the output C file.
         """
-        generator = CodeGenerator()
-        code = generator.generate(ast)  # Generate C code as a string
         os.makedirs(os.path.dirname(
             os.path.abspath(output_file)), exist_ok=True)
         with open(output_file, 'w') as f:
@@ -151,15 +193,42 @@ def main():
     parser.add_argument('input', help='Draw++ source file (.dpp)')
     parser.add_argument('-o', '--output', help='Output C file (.c)')
     parser.add_argument('--run', action='store_true', help='Run the generated program after compilation')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print wall/CPU time and counts for each phase')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='Also trace the peak memory of each phase, which slows it down (implies --profile)')
+    parser.add_argument('--metrics-json', metavar='FILE',
+                        help='Write the per-phase figures to a JSON file (implies --profile)')
+    parser.add_argument('--cprofile', metavar='PHASE', choices=PHASES,
+                        help=f'Run one phase under cProfile and print its statistics ({", ".join(PHASES)})')
+    parser.add_argument('--cprofile-out', metavar='FILE',
+                        help='Also dump the cProfile statistics to FILE, for pstats or snakeviz')
+    parser.add_argument('--line-profile', action='store_true',
+                        help='Make the program count and time each statement by source line '
+                             '(written to drawpp_profile.json when it runs)')
     args = parser.parse_args()
 
     print(f"Working directory: {os.getcwd()}")
     input_file = os.path.abspath(args.input)
     print(f"Input file: {input_file}")
 
-    compiler = Compiler()
+    profiler = PhaseProfiler(enabled=args.profile or args.profile_memory or bool(args.metrics_json),
+                             cprofile_phase=args.cprofile,
+                             cprofile_output=args.cprofile_out,
+                             trace_memory=args.profile_memory)
+    compiler = Compiler(profiler, line_profile=args.line_profile)
     success = compiler.compile(input_file, args.output)
 
+    if profiler.cprofile_stats:
+        print(f"\ncProfile of phase '{args.cprofile}':")
+        print(profiler.cprofile_stats)
+    if profiler.enabled:
+        print("\nProfile:")
+        print(profiler.report())
+    if args.metrics_json:
+        profiler.write_json(args.metrics_json)
+        print(f"Metrics written to {args.metrics_json}")
+
     if success and args.run:
         output_file = args.output if args.output else os.path.splitext(input_file)[0] + '.c'
         executable = os.path.splitext(output_file)[0]
@@ -0,0 +1,11 @@
+import struct
+
+# layout of the header shared with lib/DPP/include/frame_channel.h, used by
+# compiler.api and ide.utils.frame_channel to read the frames of a program
+HEADER = struct.Struct("<4sIIIII8xQQ16x")
+MAGIC = b"DPPF"
+VERSION = 1
+SEQUENCE_OFFSET = 32
+
+# environment variable naming the shared memory segment of the program
+CHANNEL_ENV = "DRAWPP_FRAME_CHANNEL"
@@ -0,0 +1,523 @@
+import re
+import sys
+import json
+import threading
+from compiler.api import ERROR_POSITION
+from compiler.lexer.lexer import Lexer
+from compiler.parser.parser import Parser
+from compiler.parser.syntax_tree import ASTNode, VarDecl, CursorCreation
+from compiler.semantic.semantic_analyzer import SemanticAnalyzer, SemanticError, CURSOR_METHODS
+
+# delay (s) between the last change of a document and its analysis
+ANALYSIS_DELAY_S = 0.3
+
+# LSP constants used by the server
+SYNC_INCREMENTAL = 2
+SEVERITY_ERROR = 1
+COMPLETION_METHOD = 2
+ERROR_METHOD_NOT_FOUND = -32601
+ERROR_INVALID_REQUEST = -32600
+
+WORD = re.compile(r"\w+")
+MEMBER_PREFIX = re.compile(r"(\w+)\.(\w*)$")
+
+
+def type_name(token_type):
+    """
+    @brief Formats a type token for display.
+
+    @param token_type A TokenType, e.g. TokenType.INT.
+    @return The name used in Draw++ source ("int"), or "bool" for boolean values.
+    """
+    name = token_type.name.lower()
+    return "bool" if name == "bool_value" else name
+
+
+def collect_declarations(node, line=None, found=None):
+    """
+    @brief Lists the variables and cursors declared in an AST, block-local ones included.
+
+    @param node The AST, or any node or list of nodes.
+    @param line The line of the enclosing statement, for declarations without one.
+    @param found Optional. The dictionary to fill.
+    @return A dictionary name -> list of (line, description) in source order.
+    """
+    if found is None:
+        found = {}
+    if isinstance(node, list):
+        for item in node:
+            collect_declarations(item, line, found)
+        return found
+    if not isinstance(node, ASTNode):
+        return found
+
+    line = node.line if node.line is not None else line
+    if isinstance(node, VarDecl):
+        found.setdefault(node.name, []).append((line, f"var {type_name(node.var_type)} {node.name}"))
+    elif isinstance(node, CursorCreation):
+        found.setdefault(node.name, []).append((line, f"cursor {node.name}"))
+    for value in vars(node).values():
+        collect_declarations(value, line, found)
+    return found
+
+
+def error_position(message, default_line):
+    """
+    @brief Locates an error from its message.
+
+    @param message The error message.
+    @param default_line The 1-based line used when the message has no position.
+    @return A (0-based line, 0-based column or None) tuple.
+    """
+    match = ERROR_POSITION.search(message)
+    if not match:
+        return max(default_line - 1, 0), None
+    column = int(match.group(2)) - 1 if match.group(2) else None
+    return int(match.group(1)) - 1, column
+
+
+class Document:
+    """
+    @brief An open document: its lines, and the results of its last analysis.
+
+    Only the analysis thread writes the cached results; it replaces them all
+    at once, so request handlers always see a consistent set.
+    """
+
+    def __init__(self, uri, text, version):
+        """
+        @brief Initializes the document.
+
+        @param uri The document URI.
+        @param text The full text.
+        @param version The version sent by the client.
+        """
+        self.uri = uri
+        self.lines = text.replace("\r\n", "\n").split("\n")
+        self.version = version
+        self.tokens = None  # tokens of the last analysis that got past the lexer
+        self.ast = None  # AST of the last analysis that got past the parser
+        self.symbols = None  # SymbolTable of the last semantic analysis
+        self.declarations = {}  # name -> [(line, description)], see collect_declarations
+        self.analyzed_version = None
+
+    def apply_change(self, change):
+        """
+        @brief Applies one entry of a didChange notification.
+
+        Positions are taken as character offsets in the line, which matches
+        the client's UTF-16 offsets for text in the Basic Multilingual Plane.
+        @param change A {"range", "text"} edit, or {"text"} for the full text.
+        """
+        text = change["text"].replace("\r\n", "\n")
+        if "range" not in change:
+            self.lines = text.split("\n")
+            return
+        start, end = change["range"]["start"], change["range"]["end"]
+        last = len(self.lines) - 1
+        start_line, end_line = min(start["line"], last), min(end["line"], last)
+        prefix = self.lines[start_line][:start["character"]]
+        suffix = self.lines[end_line][end["character"]:]
+        self.lines[start_line:end_line + 1] = (prefix + text + suffix).split("\n")
+
+    def text(self):
+        """
+        @brief Returns the full text.
+        """
+        return "\n".join(self.lines)
+
+
+class LanguageServer:
+    """
+    @brief Language Server Protocol endpoint for Draw++, over stdio.
+
+    Documents are kept in sync incrementally. Each change restarts a short
+    timer; when it expires, the document is analyzed on a background thread,
+    so requests are still answered while a large document is being analyzed.
+    An analysis is abandoned between two phases as soon as the document
+    changes again. Diagnostics are published when an analysis completes;
+    hover and completion use the results of the last one.
+    """
+
+    def __init__(self, reader=None, writer=None):
+        """
+        @brief Initializes the server.
+
+        @param reader Optional. Binary stream of client messages (default stdin).
+        @param writer Optional. Binary stream for server messages (default stdout).
+        """
+        self.reader = reader or sys.stdin.buffer
+        self.writer = writer or sys.stdout.buffer
+        self.write_lock = threading.Lock()
+        self.documents = {}
+        self.lock = threading.Lock()  # guards documents and pending
+        self.pending = {}  # uri -> version waiting for analysis
+        self.wakeup = threading.Condition(self.lock)
+        self.timers = {}
+        self.running = True
+        self.shutdown_requested = False
+        self.worker = threading.Thread(target=self._analysis_loop, name="drawpp-lsp", daemon=True)
+
+    def serve(self):
+        """
+        @brief Handles messages until the client exits.
+
+        @return The exit status: 0 if shutdown was requested before exit.
+        """
+        self.worker.start()
+        try:
+            while True:
+                message = self.read_message()
+                if message is None:
+                    break
+                self.handle(message)
+                if message.get("method") == "exit":
+                    break
+        finally:
+            with self.lock:
+                self.running = False
+                self.wakeup.notify_all()
+            for timer in self.timers.values():
+                timer.cancel()
+        return 0 if self.shutdown_requested else 1
+
+    def read_message(self):
+        """
+        @brief Reads one message.
+
+        @return The decoded message, or None at the end of the stream.
+        """
+        length = None
+        while True:
+            header = self.reader.readline()
+            if not header:
+                return None
+            header = header.strip()
+            if not header:
+                break
+            name, _, value = header.decode("ascii", errors="replace").partition(":")
+            if name.lower() == "content-length":
+                length = int(value.strip())
+        if length is None:
+            return {}
+        return json.loads(self.reader.read(length))
+
+    def send(self, message):
+        """
+        @brief Writes one message; safe to call from any thread.
+
+        @param message The message, without the jsonrpc field.
+        """
+        body = json.dumps(dict(message, jsonrpc="2.0")).encode()
+        with self.write_lock:
+            self.writer.write(f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            self.writer.flush()
+
+    def handle(self, message):
+        """
+        @brief Dispatches a request or notification to its handler.
+
+        @param message The decoded message.
+        """
+        method = message.get("method")
+        request_id = message.get("id")
+        handler = getattr(self, "on_" + (method or "").replace("/", "_").replace("$", "_"), None)
+        if handler is None:
+            if request_id is not None:
+                self.send({"id": request_id,
+                           "error": {"code": ERROR_METHOD_NOT_FOUND, "message": f"Unknown method {method}"}})
+            return
+        try:
+            result = handler(message.get("params") or {})
+        except (KeyError, TypeError, ValueError) as e:
+            if request_id is not None:
+                self.send({"id": request_id, "error": {"code": ERROR_INVALID_REQUEST, "message": str(e)}})
+            return
+        if request_id is not None:
+            self.send({"id": request_id, "result": result})
+
+    def on_initialize(self, params):
+        """
+        @brief Announces the capabilities of the server.
+        """
+        return {
+            "capabilities": {
+                "textDocumentSync": {"openClose": True, "change": SYNC_INCREMENTAL},
+                "hoverProvider": True,
+                "completionProvider": {"triggerCharacters": ["."]},
+            },
+            "serverInfo": {"name": "drawpp-lsp"},
+        }
+
+    def on_initialized(self, params):
+        """
+        @brief Acknowledges the end of the handshake.
+        """
+        pass
+
+    def on_shutdown(self, params):
+        """
+        @brief Prepares to exit; the process stops on the exit notification.
+        """
+        self.shutdown_requested = True
+        return None
+
+    def on_exit(self, params):
+        """
+        @brief Stops the server; serve() returns after this message.
+        """
+        pass
+
+    def on__cancelRequest(self, params):
+        """
+        @brief Ignores cancellations: requests are answered as soon as they arrive.
+        """
+        pass
+
+    def on_textDocument_didOpen(self, params):
+        """
+        @brief Starts tracking a document, and analyzes it.
+        """
+        item = params["textDocument"]
+        with self.lock:
+            self.documents[item["uri"]] = Document(item["uri"], item["text"], item.get("version"))
+        self.schedule(item["uri"], delay=0)
+
+    def on_textDocument_didChange(self, params):
+        """
+        @brief Applies the edits of a document, and schedules its analysis.
+        """
+        uri = params["textDocument"]["uri"]
+        with self.lock:
+            document = self.documents.get(uri)
+            if document is None:
+                return
+            for change in params["contentChanges"]:
+                document.apply_change(change)
+            document.version = params["textDocument"].get("version")
+            self.pending.pop(uri, None)  # an analysis in flight stops at its next phase
+        self.schedule(uri)
+
+    def on_textDocument_didClose(self, params):
+        """
+        @brief Forgets a document, and clears its diagnostics.
+        """
+        uri = params["textDocument"]["uri"]
+        with self.lock:
+            self.documents.pop(uri, None)
+            self.pending.pop(uri, None)
+        timer = self.timers.pop(uri, None)
+        if timer:
+            timer.cancel()
+        self.publish(uri, None, [])
+
+    def on_textDocument_hover(self, params):
+        """
+        @brief Shows the declaration of the identifier under the cursor.
+        """
+        document, line, character = self.locate(params)
+        if document is None:
+            return None
+        text = document.lines[line] if line < len(document.lines) else ""
+        for match in WORD.finditer(text):
+            if match.start() <= character <= match.end():
+                word = match.group()
+                break
+        else:
+            return None
+
+        if text[:match.start()].endswith(".") and word in CURSOR_METHODS:
+            contents = self.method_signature(word)
+        else:
+            contents = self.describe(document, word, line + 1)
+        if contents is None:
+            return None
+        return {"contents": {"kind": "markdown", "value": f"```drawpp\n{contents}\n```"}}
+
+    def on_textDocument_completion(self, params):
+        """
+        @brief Completes cursor methods after "name.".
+        """
+        document, line, character = self.locate(params)
+        if document is None or line >= len(document.lines):
+            return []
+        match = MEMBER_PREFIX.search(document.lines[line][:character])
+        if match is None:
+            return []
+        cursor = match.group(1)
+        declared = document.declarations.get(cursor)
+        if declared and not any(description.startswith("cursor ") for _, description in declared):
+            return []  # a variable, not a cursor
+        return [{"label": name, "kind": COMPLETION_METHOD, "detail": self.method_signature(name)}
+                for name in CURSOR_METHODS if name.startswith(match.group(2))]
+
+    def locate(self, params):
+        """
+        @brief Resolves the document and position of a request.
+
+        @return A (document, 0-based line, character) tuple; document is None if unknown.
+        """
+        with self.lock:
+            document = self.documents.get(params["textDocument"]["uri"])
+        position = params["position"]
+        return document, position["line"], position["character"]
+
+    def method_signature(self, name):
+        """
+        @brief Formats the signature of a cursor method.
+        """
+        params = ", ".join(type_name(token_type) for token_type in CURSOR_METHODS[name])
+        return f"cursor.{name}({params})"
+
+    def describe(self, document, name, line):
+        """
+        @brief Describes a variable or cursor from the last analysis.
+
+        Global names come from the symbol table; block-local ones, which the
+        symbol table forgets at the end of their block, from the AST.
+        @param document The document.
+        @param name The identifier.
+        @param line The 1-based line of the identifier.
+        @return The description, or None if the name is not declared.
+        """
+        declared = document.declarations.get(name)
+        if declared:
+            before = [description for declared_line, description in declared
+                      if declared_line is not None and declared_line <= line]
+            return before[-1] if before else declared[0][1]
+        symbols = document.symbols
+        if symbols is not None:
+            if symbols.is_cursor(name):
+                return f"cursor {name}"
+            if symbols.lookup(name) is not None:
+                return f"var {type_name(symbols.lookup(name))} {name}"
+        return None
+
+    def schedule(self, uri, delay=ANALYSIS_DELAY_S):
+        """
+        @brief Queues the analysis of a document once it stops changing for delay seconds.
+
+        @param uri The document URI.
+        @param delay The debounce delay, in seconds.
+        """
+        timer = self.timers.pop(uri, None)
+        if timer:
+            timer.cancel()
+
+        def queue():
+            with self.lock:
+                document = self.documents.get(uri)
+                if document is not None:
+                    self.pending[uri] = document.version
+                    self.wakeup.notify()
+
+        if delay <= 0:
+            queue()
+            return
+        timer = threading.Timer(delay, queue)
+        timer.daemon = True
+        self.timers[uri] = timer
+        timer.start()
+
+    def _analysis_loop(self):
+        """
+        @brief Analyzes the queued documents one at a time, until the server stops.
+        """
+        while True:
+            with self.lock:
+                while self.running and not self.pending:
+                    self.wakeup.wait()
+                if not self.running:
+                    return
+                uri, version = self.pending.popitem()
+                document = self.documents.get(uri)
+                if document is None:
+                    continue
+                text = document.text()
+            self.analyze(document, uri, version, text)
+
+    def is_current(self, uri, version):
+        """
+        @brief Checks whether an analysis still matches the document.
+        """
+        with self.lock:
+            document = self.documents.get(uri)
+            return document is not None and document.version == version and uri not in self.pending
+
+    def analyze(self, document, uri, version, text):
+        """
+        @brief Runs the compiler phases on a snapshot and publishes its diagnostics.
+
+        Stops between two phases if the document changed in the meantime.
+        @param document The document.
+        @param uri The document URI.
+        @param version The version of the snapshot.
+        @param text The text of the snapshot.
+        """
+        tokens = ast = symbols = None
+        declarations = document.declarations
+        diagnostics = []
+        try:
+            tokens = Lexer(text).tokenize()
+            if not self.is_current(uri, version):
+                return
+            ast = Parser(tokens).parse()
+            declarations = collect_declarations(ast.statements)
+            if not self.is_current(uri, version):
+                return
+            analyzer = SemanticAnalyzer()
+            symbols = analyzer.symbol_table
+            try:
+                analyzer.visit(ast)
+                analyzer.check_window_dimensions()
+            except SemanticError as e:
+                diagnostics.append(self.diagnostic(str(e), analyzer.line or 1, "semantic"))
+        except Exception as e:
+            diagnostics.append(self.diagnostic(str(e), 1, "parser" if tokens is not None else "lexer"))
+
+        with self.lock:
+            if document.version != version or uri not in self.documents:
+                return
+            document.tokens = tokens if tokens is not None else document.tokens
+            document.ast = ast if ast is not None else document.ast
+            document.symbols = symbols if symbols is not None else document.symbols
+            document.declarations = declarations
+            document.analyzed_version = version
+        self.publish(uri, version, diagnostics)
+
+    def diagnostic(self, message, default_line, source):
+        """
+        @brief Builds a diagnostic covering the line of an error, or the rest of it from its column.
+
+        @param message The error message.
+        @param default_line The 1-based line used when the message has no position.
+        @param source The compiler phase that reported the error.
+        """
+        line, column = error_position(message, default_line)
+        return {
+            "range": {"start": {"line": line, "character": column or 0},
+                      "end": {"line": line + 1, "character": 0}},
+            "severity": SEVERITY_ERROR,
+            "source": f"drawpp {source}",
+            "message": message,
+        }
+
+    def publish(self, uri, version, diagnostics):
+        """
+        @brief Sends the diagnostics of a document.
+        """
+        params = {"uri": uri, "diagnostics": diagnostics}
+        if version is not None:
+            params["version"] = version
+        self.send({"method": "textDocument/publishDiagnostics", "params": params})
+
+
+def main():
+    """
+    @brief Runs the language server on stdin and stdout.
+    """
+    sys.exit(LanguageServer().serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -92,26 +92,29 @@ class Parser:
         token = self.current_token
 
         if token.type == TokenType.VAR:
-            return self.var_declaration()
+            node = self.var_declaration()
 
         elif token.type == TokenType.CURSOR:
-            return self.cursor_statement()
+            node = self.cursor_statement()
 
         elif token.type == TokenType.IF:
-            return self.if_statement()
+            node = self.if_statement()
 
         elif token.type == TokenType.FOR:
-            return self.for_statement()
+            node = self.for_statement()
 
         elif token.type == TokenType.WHILE:
-            return self.while_statement()
+            node = self.while_statement()
 
         elif token.type == TokenType.IDENTIFIER:
-            return self.identifier_statement()
+            node = self.identifier_statement()
 
         else:
             self.error(f"Unexpected token {token.type} in statement")
 
+        node.line = token.line  # source line, for the line profiler
+        return node
+
     def identifier_statement(self):
         """
         @brief Parses a statement starting with an identifier.
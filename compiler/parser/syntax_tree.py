@@ -1,7 +1,16 @@
+import hashlib
+from enum import Enum
+
+
 class ASTNode:
     """
     @brief Base class for all nodes in the abstract syntax tree (AST).
+
+    Statements parsed by Parser.statement also carry the source line they
+    start on, in their line attribute.
     """
+    line = None
+
     def __init__(self):
         pass
 
@@ -239,3 +248,60 @@ class Var(ASTNode):
 
     def __str__(self):
         return f"Var({self.name})"
+
+
+def ast_fingerprint(node):
+    """
+    @brief Computes a hash of the structure of an AST.
+
+    Source lines are left out, so two programs that only differ in
+    whitespace or comments have the same fingerprint.
+    @param node The root of the tree (usually a Program).
+    @return The hexadecimal SHA-1 digest of the tree.
+    """
+    digest = hashlib.sha1()
+    _hash_value(node, digest)
+    return digest.hexdigest()
+
+
+def _hash_value(value, digest):
+    """
+    @brief Feeds a node, a list of nodes or a leaf value into a digest.
+
+    @param value The value to hash.
+    @param digest The hashlib object to update.
+    """
+    if isinstance(value, ASTNode):
+        digest.update(f"{type(value).__name__}(".encode())
+        for key in sorted(vars(value)):
+            if key == "line":
+                continue  # positions do not change the drawing
+            digest.update(f"{key}=".encode())
+            _hash_value(getattr(value, key), digest)
+            digest.update(b",")
+        digest.update(b")")
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"[")
+        for item in value:
+            _hash_value(item, digest)
+            digest.update(b",")
+        digest.update(b"]")
+    elif isinstance(value, Enum):
+        digest.update(str(value).encode())
+    else:
+        # the type keeps 1, 1.0 and "1" apart
+        digest.update(f"{type(value).__name__}:{value!r}".encode())
+
+
+def count_nodes(value):
+    """
+    @brief Counts the AST nodes in a tree.
+
+    @param value A node, a list of nodes or a leaf value.
+    @return The number of ASTNode instances reachable from value.
+    """
+    if isinstance(value, ASTNode):
+        return 1 + sum(count_nodes(child) for child in vars(value).values())
+    if isinstance(value, (list, tuple)):
+        return sum(count_nodes(item) for item in value)
+    return 0
@@ -0,0 +1,158 @@
+import time
+from contextlib import contextmanager
+
+# phases of Compiler.compile, in order
+PHASES = ("read", "lex", "parse", "semantic", "codegen", "write")
+
+# number of functions listed when a cProfile dump is printed
+PSTATS_LIMIT = 20
+
+
+class PhaseProfiler:
+    """
+    @brief Records time, memory and size figures for each phase of a compilation.
+
+    For each phase, the profiler measures wall and CPU time and, when memory
+    tracing is on, the peak of memory allocated by Python during the phase
+    (tracemalloc). Tracing slows allocations several times over, so it is off
+    by default and the times it reports then include its cost. Counts such as
+    tokens, AST nodes or output lines are attached with record(). One phase
+    can also be run under cProfile, and its statistics dumped for pstats.
+    A disabled profiler measures nothing and costs nothing.
+    """
+
+    def __init__(self, enabled=False, cprofile_phase=None, cprofile_output=None, trace_memory=False):
+        """
+        @brief Initializes the profiler.
+
+        @param enabled Whether phases are measured.
+        @param cprofile_phase The phase to run under cProfile, or None.
+        @param cprofile_output Where to write the cProfile statistics, or None to
+               only print them.
+        @param trace_memory Whether the peak memory of each phase is measured too.
+        """
+        if cprofile_phase is not None and cprofile_phase not in PHASES:
+            raise ValueError(f"Unknown phase '{cprofile_phase}', expected one of {', '.join(PHASES)}")
+        self.enabled = enabled
+        self.cprofile_phase = cprofile_phase
+        self.cprofile_output = cprofile_output
+        self.trace_memory = enabled and trace_memory
+        self.cprofile_stats = None
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        """
+        @brief Measures the code run inside the with block as one phase.
+
+        @param name The name of the phase (one of PHASES).
+        """
+        if not self.enabled and name != self.cprofile_phase:
+            yield
+            return
+
+        # imported here: they take longer to load than a short compilation
+        import cProfile
+        import tracemalloc
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            base_memory = tracemalloc.get_traced_memory()[0]
+
+        profile = cProfile.Profile() if name == self.cprofile_phase else None
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+
+            if self.enabled:
+                entry = self.phases.setdefault(name, {})
+                entry["wall_s"] = wall
+                entry["cpu_s"] = cpu
+            if self.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1] - base_memory
+                if started_tracing:
+                    tracemalloc.stop()
+                entry["peak_bytes"] = max(peak, 0)
+            if profile is not None:
+                self._save_profile(profile)
+
+    def record(self, name, **counts):
+        """
+        @brief Attaches counts to a phase.
+
+        @param name The name of the phase.
+        @param counts The counts, e.g. tokens=120.
+        """
+        if self.enabled:
+            self.phases.setdefault(name, {}).update(counts)
+
+    def metrics(self):
+        """
+        @brief Returns the recorded figures.
+
+        @return A dictionary with one entry per phase, in compilation order,
+                and the totals.
+        """
+        phases = {name: self.phases[name] for name in PHASES if name in self.phases}
+        total = {
+            "wall_s": sum(entry.get("wall_s", 0.0) for entry in phases.values()),
+            "cpu_s": sum(entry.get("cpu_s", 0.0) for entry in phases.values()),
+        }
+        if self.trace_memory:
+            total["peak_bytes"] = max((entry.get("peak_bytes", 0) for entry in phases.values()), default=0)
+        return {"phases": phases, "total": total, "memory_traced": self.trace_memory}
+
+    def report(self):
+        """
+        @brief Formats the recorded figures as a table.
+
+        @return The table, as a string.
+        """
+        metrics = self.metrics()
+        peak_header = f"{'peak (KiB)':>12}" if self.trace_memory else ""
+        lines = [f"{'phase':<10}{'wall (ms)':>12}{'cpu (ms)':>12}{peak_header}  counts"]
+        rows = list(metrics["phases"].items()) + [("total", metrics["total"])]
+        for name, entry in rows:
+            counts = ", ".join(f"{key}={value}" for key, value in entry.items()
+                               if key not in ("wall_s", "cpu_s", "peak_bytes"))
+            peak = f"{entry.get('peak_bytes', 0) / 1024:>12.1f}" if self.trace_memory else ""
+            lines.append(f"{name:<10}{entry.get('wall_s', 0.0) * 1e3:>12.3f}"
+                         f"{entry.get('cpu_s', 0.0) * 1e3:>12.3f}{peak}  {counts}")
+        if self.trace_memory:
+            lines.append("(times include the cost of memory tracing)")
+        return "\n".join(lines)
+
+    def write_json(self, path):
+        """
+        @brief Writes the recorded figures to a JSON file.
+
+        @param path The path of the JSON file.
+        """
+        import json
+        with open(path, 'w') as f:
+            json.dump(self.metrics(), f, indent=2)
+            f.write("\n")
+
+    def _save_profile(self, profile):
+        """
+        @brief Keeps the cProfile statistics of the profiled phase and dumps them.
+
+        @param profile The cProfile.Profile that ran the phase.
+        """
+        import io
+        import pstats
+        if self.cprofile_output:
+            profile.dump_stats(self.cprofile_output)
+        stream = io.StringIO()
+        pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(PSTATS_LIMIT)
+        self.cprofile_stats = stream.getvalue()
@@ -1,6 +1,21 @@
 from compiler.lexer.tokens import TokenType
 
 
+# parameter types of each cursor method
+CURSOR_METHODS = {
+    'move': [TokenType.NUMBER],
+    'rotate': [TokenType.NUMBER],
+    'color': [TokenType.COLOR],
+    'thickness': [TokenType.NUMBER],
+    'visible': [],
+    'draw_line': [TokenType.NUMBER],
+    'draw_rectangle': [TokenType.NUMBER, TokenType.NUMBER, TokenType.BOOL_VALUE],
+    'draw_circle': [TokenType.NUMBER, TokenType.BOOL_VALUE],
+    'draw_triangle': [TokenType.NUMBER, TokenType.NUMBER, TokenType.BOOL_VALUE],
+    'draw_ellipse': [TokenType.NUMBER, TokenType.NUMBER, TokenType.BOOL_VALUE]
+}
+
+
 class SemanticError(Exception):
     """
     @brief Custom exception for semantic errors during analysis.
@@ -19,6 +34,33 @@ class SymbolTable:
         """
         self.symbols = {}
         self.cursors = {}
+        self.scopes = []
+
+    def enter_scope(self):
+        """
+        @brief Opens a block scope (loop or conditional body).
+
+        Names declared until the matching exit_scope() are local to the block,
+        mirroring the C blocks the code generator emits.
+        """
+        self.scopes.append([])
+
+    def exit_scope(self):
+        """
+        @brief Closes the innermost block scope and forgets the names declared in it.
+        """
+        for name in self.scopes.pop():
+            self.symbols.pop(name, None)
+            self.cursors.pop(name, None)
+
+    def _declare(self, name):
+        """
+        @brief Records a name in the innermost block scope, if any.
+
+        @param name Name being declared.
+        """
+        if self.scopes:
+            self.scopes[-1].append(name)
 
     def define(self, name, type_):
         """
@@ -31,6 +73,7 @@ class SymbolTable:
         if name in self.symbols or name in self.cursors:
             raise SemanticError(f"Identifier {name} already declared")
         self.symbols[name] = type_
+        self._declare(name)
 
     def define_cursor(self, name):
         """
@@ -42,6 +85,7 @@ class SymbolTable:
         if name in self.symbols or name in self.cursors:
             raise SemanticError(f"Identifier {name} already declared")
         self.cursors[name] = True
+        self._declare(name)
 
     def lookup(self, name):
         """
@@ -72,6 +116,7 @@ class SemanticAnalyzer:
         @brief Initializes the semantic analyzer with an empty symbol table.
         """
         self.symbol_table = SymbolTable()
+        self.line = None  # source line of the last statement visited, to locate errors
 
     def visit(self, node):
         """
@@ -80,6 +125,9 @@ class SemanticAnalyzer:
         @param node The AST node to visit.
         @return The result of the visit method for the node.
         """
+        line = getattr(node, "line", None)
+        if line is not None:
+            self.line = line
         method_name = f'visit_{node.__class__.__name__}'
         visitor = getattr(self, method_name, self.generic_visit)
         return visitor(node)
@@ -127,23 +175,10 @@ class SemanticAnalyzer:
         if not self.symbol_table.is_cursor(cursor_name):
             raise SemanticError(f"Identifier {cursor_name} is not a cursor")
 
-        valid_methods = {
-            'move': [TokenType.NUMBER],
-            'rotate': [TokenType.NUMBER],
-            'color': [TokenType.COLOR],
-            'thickness': [TokenType.NUMBER],
-            'visible': [],
-            'draw_line': [TokenType.NUMBER],
-            'draw_rectangle': [TokenType.NUMBER, TokenType.NUMBER, TokenType.BOOL_VALUE],
-            'draw_circle': [TokenType.NUMBER, TokenType.BOOL_VALUE],
-            'draw_triangle': [TokenType.NUMBER, TokenType.NUMBER, TokenType.BOOL_VALUE],
-            'draw_ellipse': [TokenType.NUMBER, TokenType.NUMBER, TokenType.BOOL_VALUE]
-        }
-
-        if method_name not in valid_methods:
+        if method_name not in CURSOR_METHODS:
             raise SemanticError(f"Invalid cursor method: {method_name}")
 
-        return valid_methods[method_name]
+        return CURSOR_METHODS[method_name]
 
     def visit_Program(self, node):
         """
@@ -269,6 +304,22 @@ class SemanticAnalyzer:
 
         raise SemanticError(f"Unknown binary operator {node.op}")
 
+    def visit_block(self, statements):
+        """
+        @brief Analyzes the statements of a block in their own scope.
+
+        Cursors and variables created in a block (for instance one cursor per
+        loop iteration) are only visible inside that block.
+
+        @param statements The statements of the block.
+        """
+        self.symbol_table.enter_scope()
+        try:
+            for stmt in statements:
+                self.visit(stmt)
+        finally:
+            self.symbol_table.exit_scope()
+
     def visit_If(self, node):
         """
         @brief Visits an if-statement node.
@@ -280,20 +331,17 @@ class SemanticAnalyzer:
         if condition_type != TokenType.BOOL_VALUE:
             raise SemanticError("If condition must be boolean")
 
-        for stmt in node.true_body:
-            self.visit(stmt)
+        self.visit_block(node.true_body)
 
         if node.elif_bodies:
             for elif_condition, elif_body in node.elif_bodies:
                 elif_condition_type = self.visit(elif_condition)
                 if elif_condition_type != TokenType.BOOL_VALUE:
                     raise SemanticError("Elif condition must be boolean")
-                for stmt in elif_body:
-                    self.visit(stmt)
+                self.visit_block(elif_body)
 
         if node.false_body:
-            for stmt in node.false_body:
-                self.visit(stmt)
+            self.visit_block(node.false_body)
 
     def visit_While(self, node):
         """
@@ -306,8 +354,7 @@ class SemanticAnalyzer:
         if condition_type != TokenType.BOOL_VALUE:
             raise SemanticError("While condition must be boolean")
 
-        for stmt in node.body:
-            self.visit(stmt)
+        self.visit_block(node.body)
 
     def visit_For(self, node):
         """
@@ -316,16 +363,20 @@ class SemanticAnalyzer:
         @param node The for-loop node.
         @throws SemanticError if the condition is not boolean.
         """
-        self.visit(node.init)
+        # The loop variable is local to the loop, as in the generated C code
+        self.symbol_table.enter_scope()
+        try:
+            self.visit(node.init)
 
-        condition_type = self.visit(node.condition)
-        if condition_type != TokenType.BOOL_VALUE:
-            raise SemanticError("For condition must be boolean")
+            condition_type = self.visit(node.condition)
+            if condition_type != TokenType.BOOL_VALUE:
+                raise SemanticError("For condition must be boolean")
 
-        self.visit(node.update)
+            self.visit(node.update)
 
-        for stmt in node.body:
-            self.visit(stmt)
+            self.visit_block(node.body)
+        finally:
+            self.symbol_table.exit_scope()
 
     def visit_Num(self, node):
         """
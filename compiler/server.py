@@ -0,0 +1,127 @@
+import os
+import json
+import socketserver
+from compiler.client import default_socket_path, make_socket_directory, ping
+from compiler.api import handle_request
+
+# requests handled at the same time by default
+DEFAULT_WORKERS = 4
+
+# maximum size (bytes) of one request line
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+# time (s) a connection may stay silent before it is closed, freeing its worker
+IDLE_TIMEOUT_S = 5.0
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """
+    @brief Serves one connection: one JSON request per line, each answered by one JSON line.
+
+    A connection that sends nothing for IDLE_TIMEOUT_S is closed, so an idle
+    client cannot hold a worker, nor delay the shutdown of the server.
+    """
+
+    timeout = IDLE_TIMEOUT_S
+
+    def handle(self):
+        """
+        @brief Answers the requests of the connection until the client closes it or stays idle.
+        """
+        while True:
+            try:
+                line = self.rfile.readline(MAX_REQUEST_BYTES + 1)
+            except OSError:
+                return  # idle for IDLE_TIMEOUT_S, or reset by the client
+            if not line:
+                return
+            if len(line) > MAX_REQUEST_BYTES:
+                self.send({"ok": False, "phase": "Protocol", "error": "Request too large"})
+                return
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response = {"ok": False, "phase": "Protocol", "error": f"Invalid JSON: {e}"}
+            else:
+                response = handle_request(request, self.server)
+                if isinstance(request, dict) and "id" in request:
+                    response["id"] = request["id"]
+            try:
+                self.send(response)
+            except OSError:
+                return
+
+    def send(self, response):
+        """
+        @brief Writes one response line.
+
+        @param response The response dictionary.
+        """
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+        self.wfile.flush()
+
+
+class CompileServer(socketserver.UnixStreamServer):
+    """
+    @brief Compile server keeping the compiler loaded, on a Unix domain socket.
+
+    Connections are served by a pool of max_workers threads, so at most that
+    many requests run at the same time; further connections wait for a free
+    worker. The socket is only accessible to the user running the server.
+    """
+
+    def __init__(self, socket_path=None, max_workers=DEFAULT_WORKERS):
+        """
+        @brief Binds the server socket.
+
+        @param socket_path Optional. The path of the socket (see default_socket_path).
+        @param max_workers The number of requests handled at the same time.
+        @throws OSError if another server is already listening on the socket, or the
+                default socket directory is not private.
+        """
+        self.socket_path = socket_path or default_socket_path()
+        make_socket_directory(self.socket_path)
+        if os.path.exists(self.socket_path):
+            if ping(self.socket_path):
+                raise OSError(f"A Draw++ server is already running on {self.socket_path}")
+            os.remove(self.socket_path)  # left behind by a server that died
+
+        from concurrent.futures import ThreadPoolExecutor
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers),
+                                           thread_name_prefix="drawpp-serve")
+        super().__init__(self.socket_path, RequestHandler)
+        os.chmod(self.socket_path, 0o600)
+
+    def process_request(self, request, client_address):
+        """
+        @brief Hands a new connection over to the worker pool.
+        """
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        """
+        @brief Serves a connection on a pool worker, then closes it.
+        """
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def request_shutdown(self):
+        """
+        @brief Stops serve_forever; safe to call from a request handler.
+        """
+        self.executor.submit(self.shutdown)
+
+    def server_close(self):
+        """
+        @brief Closes the socket, waits for the running requests and removes the socket file.
+        """
+        super().server_close()
+        self.executor.shutdown(wait=True)
+        try:
+            os.remove(self.socket_path)
+        except OSError:
+            pass
@@ -0,0 +1,350 @@
+import os
+import sys
+import time
+import errno
+import select
+import shutil
+import struct
+import ctypes
+import ctypes.util
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from compiler.client import request_or_local
+
+# quiet period (s) after the last change of a file before it is rebuilt
+SETTLE_S = 0.15
+
+# delay (s) between two scans when polling modification times
+POLL_INTERVAL_S = 0.5
+
+# files rebuilt at the same time by default
+DEFAULT_JOBS = 2
+
+# directory, next to each watched file, receiving its C file and executable
+BUILD_DIR_NAME = ".drawpp"
+
+# inotify flags (see inotify(7))
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """
+    @brief Reports changed files with Linux inotify.
+
+    Directories are watched rather than files, so that editors that save by
+    writing a new file and renaming it over the old one are followed too.
+    """
+
+    def __init__(self, directories):
+        """
+        @brief Starts watching directories.
+
+        @param directories The directories to watch.
+        @throws OSError if inotify is unavailable.
+        """
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or libc_name is None:
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories = {}  # watch descriptor -> directory
+        for directory in directories:
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                self.close()
+                raise OSError(ctypes.get_errno(), f"Cannot watch {directory}")
+            self.directories[wd] = directory
+
+    def wait(self, timeout):
+        """
+        @brief Waits for changes.
+
+        @param timeout The maximum time to wait, in seconds.
+        @return The set of paths that changed, possibly empty.
+        """
+        changed = set()
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return changed
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if wd in self.directories and name:
+                changed.add(os.path.join(self.directories[wd], os.fsdecode(name)))
+        return changed
+
+    def close(self):
+        """
+        @brief Stops watching.
+        """
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """
+    @brief Reports changed files by comparing their modification time and size.
+    """
+
+    def __init__(self, directories, interval=POLL_INTERVAL_S):
+        """
+        @brief Records the current state of the directories.
+
+        @param directories The directories to watch.
+        @param interval The delay between two scans, in seconds.
+        """
+        self.directories = list(directories)
+        self.interval = interval
+        self.state = self.scan()
+
+    def scan(self):
+        """
+        @brief Reads the modification time and size of every file in the directories.
+
+        @return A dictionary path -> (mtime in ns, size).
+        """
+        state = {}
+        for directory in self.directories:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        info = entry.stat()
+                        state[entry.path] = (info.st_mtime_ns, info.st_size)
+                except OSError:
+                    pass
+        return state
+
+    def wait(self, timeout):
+        """
+        @brief Waits for changes, scanning at most every interval.
+
+        @param timeout The maximum time to wait, in seconds.
+        @return The set of paths that changed, possibly empty.
+        """
+        time.sleep(min(timeout, self.interval))
+        state = self.scan()
+        changed = {path for path, info in state.items() if self.state.get(path) != info}
+        self.state = state
+        return changed
+
+    def close(self):
+        """
+        @brief Stops watching.
+        """
+        pass
+
+
+class WatchSession:
+    """
+    @brief Rebuilds Draw++ files as they change, in this already-warm process.
+
+    Changes are collected until a file has been quiet for SETTLE_S, so a
+    burst of writes leads to one build. Only the files that changed are
+    rebuilt, on a pool of jobs workers; a file that changes while it is being
+    built is rebuilt once more afterwards. Each build goes through the compile
+    server when one is running, and runs in process otherwise. A render
+    copies the image next to the source, as <name>.bmp.
+    """
+
+    def __init__(self, paths, jobs=DEFAULT_JOBS, render=True, socket_path=None, polling=False):
+        """
+        @brief Resolves the watched files and starts the watcher.
+
+        @param paths .dpp files, or directories whose .dpp files are watched.
+        @param jobs The number of files rebuilt at the same time.
+        @param render Whether to build and run the programs, or only compile them to C.
+        @param socket_path Optional. The socket of the compile server.
+        @param polling Whether to poll modification times even if inotify is available.
+        @throws ValueError if a path does not exist.
+        """
+        self.files = set()  # files given by name
+        self.whole_directories = set()  # directories given by name: all their .dpp files
+        self.directories = set()  # directories watched, including those of the files
+        for path in paths:
+            path = os.path.abspath(path)
+            if os.path.isdir(path):
+                self.directories.add(path)
+                self.whole_directories.add(path)
+            elif os.path.isfile(path) and path.endswith(".dpp"):
+                self.files.add(path)
+                self.directories.add(os.path.dirname(path))
+            else:
+                raise ValueError(f"Not a .dpp file or a directory: {path}")
+
+        self.render = render
+        self.socket_path = socket_path
+        self.executor = ThreadPoolExecutor(max_workers=max(1, jobs), thread_name_prefix="drawpp-watch")
+        self.print_lock = threading.Lock()
+        self.state_lock = threading.Lock()
+        self.building = set()
+        self.rebuild = set()
+        self.sources = {}  # path -> source of its last build, to skip saves without changes
+        self.watcher = None
+        if not polling:
+            try:
+                self.watcher = InotifyWatcher(sorted(self.directories))
+                self.backend = "inotify"
+            except OSError:
+                self.watcher = None
+        if self.watcher is None:
+            self.watcher = PollingWatcher(sorted(self.directories))
+            self.backend = "polling"
+
+    def is_watched(self, path):
+        """
+        @brief Checks whether a changed path is one of the watched programs.
+        """
+        if not path.endswith(".dpp") or os.path.basename(path).startswith("."):
+            return False
+        return path in self.files or os.path.dirname(path) in self.whole_directories
+
+    def watched_files(self):
+        """
+        @brief Lists the watched programs that exist now.
+        """
+        found = set(path for path in self.files if os.path.isfile(path))
+        for directory in self.whole_directories:
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                if self.is_watched(path) and os.path.isfile(path):
+                    found.add(path)
+        return sorted(found)
+
+    def run(self):
+        """
+        @brief Builds every watched file once, then rebuilds them as they change until interrupted.
+        """
+        self.log(f"Watching {len(self.watched_files())} file(s) in {len(self.directories)} "
+                 f"director{'y' if len(self.directories) == 1 else 'ies'} ({self.backend}); Ctrl+C to stop")
+        for path in self.watched_files():
+            self.submit(path, time.perf_counter())
+
+        pending = {}  # path -> (time of the first change, time of the last change)
+        try:
+            while True:
+                changed = self.watcher.wait(SETTLE_S if pending else 1.0)
+                now = time.perf_counter()
+                for path in changed:
+                    if self.is_watched(path):
+                        first, _ = pending.get(path, (now, now))
+                        pending[path] = (first, now)
+                for path, (first, last) in list(pending.items()):
+                    if now - last >= SETTLE_S:
+                        del pending[path]
+                        self.submit(path, first)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.watcher.close()
+            self.executor.shutdown(wait=True)
+
+    def submit(self, path, changed_at):
+        """
+        @brief Queues the build of a file, or marks it for a rebuild if it is being built.
+
+        @param path The .dpp file.
+        @param changed_at When the change was first seen (time.perf_counter()).
+        """
+        with self.state_lock:
+            if path in self.building:
+                self.rebuild.add(path)
+                return
+            self.building.add(path)
+        self.executor.submit(self.build, path, changed_at)
+
+    def build(self, path, changed_at):
+        """
+        @brief Compiles, and renders if enabled, one file, then prints its stage timings.
+
+        @param path The .dpp file.
+        @param changed_at When the change was first seen (time.perf_counter()).
+        """
+        try:
+            self._build(path, changed_at)
+        except Exception as e:
+            self.log(f"❌ {self.name(path)}: {e}")
+        finally:
+            with self.state_lock:
+                self.building.discard(path)
+                again = path in self.rebuild
+                self.rebuild.discard(path)
+            if again:
+                self.submit(path, time.perf_counter())
+
+    def _build(self, path, changed_at):
+        """
+        @brief Does the work of build().
+        """
+        queued = time.perf_counter() - changed_at
+        try:
+            with open(path, "r") as f:
+                source = f.read()
+        except OSError:
+            return  # deleted or renamed away in the meantime
+        if self.sources.get(path) == source:
+            return
+        self.sources[path] = source
+
+        directory, name = os.path.split(path)
+        stem = os.path.splitext(name)[0]
+        if self.render:
+            build_dir = os.path.join(directory, BUILD_DIR_NAME, stem)
+            request = {"op": "render", "source": source, "build_dir": build_dir}
+        else:
+            request = {"op": "compile", "source": source}
+        response, served = request_or_local(request, self.socket_path)
+
+        timings = response.get("timings", {})
+        stages = ", ".join(f"{stage} {seconds * 1e3:.1f} ms" for stage, seconds in timings.items())
+        total = (queued + sum(timings.values())) * 1e3
+        where = "server" if served else "in process"
+        if not response.get("ok"):
+            self.sources.pop(path, None)  # retry on the next save even if unchanged
+            self.log(f"❌ {self.name(path)} ({response.get('phase')}): {response.get('error')}\n"
+                     f"   [{where}] {stages}")
+            return
+
+        if self.render:
+            output = os.path.join(directory, stem + ".bmp")
+            shutil.copyfile(response["image_path"], output)
+        else:
+            output = os.path.join(directory, stem + ".c")
+            with open(output, "w") as f:
+                f.write(response["code"])
+        self.log(f"✓ {self.name(path)} -> {os.path.basename(output)} in {total:.1f} ms\n"
+                 f"   [{where}] wait {queued * 1e3:.1f} ms, {stages}")
+
+    def name(self, path):
+        """
+        @brief Shortens a path for display.
+        """
+        return os.path.relpath(path)
+
+    def log(self, message):
+        """
+        @brief Prints a message; safe to call from the workers.
+        """
+        with self.print_lock:
+            print(message, flush=True)
+
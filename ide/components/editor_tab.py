@@ -1,14 +1,23 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
-from PIL import Image, ImageTk  # Pour afficher l'image générée
-from ide.config.settings import THEME_COLORS, FONT_FAMILY, FONT_SIZE
+from ide.config.settings import THEME_COLORS, FONT_FAMILY, FONT_SIZE, LINE_HEAT_WIDTH, LINE_HEAT_COLORS
 from ide.utils.error_analyzer import ErrorAnalyzer
+from ide.utils.analysis_worker import AnalysisWorker
+from ide.utils.live_preview import LivePreview
 from ide.utils.file_manager import save_file, file_paths
 from ide.terminal.terminal import DrawTerminal
+from ide.components.preview import PreviewCanvas
+from ide.components.syntax_highlighter import SyntaxHighlighter
 
 # when you open a new tab, this is the default code
 initial_content = ''
 
+# delay (ms) between two checks for a finished background analysis
+ANALYSIS_POLL_MS = 30
+
+# width (px) of the gutter without the line profile heatmap
+LINE_NUMBERS_WIDTH = 40
+
 class ErrorHighlighter:
     """
     @brief Manages error highlighting and suggestions in the text editor.
@@ -78,6 +87,16 @@ class ErrorHighlighter:
 class LineNumbers(tk.Canvas):
     """
     @brief Widget for displaying line numbers.
+
+    Only the lines visible in the text widget are drawn. The canvas text items
+    are kept and reused from one redraw to the next, and a redraw is skipped
+    when the first visible line, its position, the line count and the height
+    of the editor are all unchanged.
+
+    After a line-profiled run, the gutter widens into a heatmap: each line
+    that ran is shaded by its self time, relative to the hottest line, and
+    labelled with its execution count and time. The heatmap is cleared by
+    the first edit, since the figures no longer match the code.
     """
 
     def __init__(self, master, *args, **kwargs):
@@ -90,6 +109,12 @@ class LineNumbers(tk.Canvas):
         super().__init__(master, *args, **kwargs)
         self.text_widget = None
         self.configure(bg=THEME_COLORS["bg"], highlightthickness=0)
+        self.items = []  # canvas text items, reused across redraws
+        self.heat_items = []  # (rectangle, label) canvas items of the heatmap, reused likewise
+        self.heat = {}  # line -> (count, total ms, self ms) of the last line-profiled run
+        self.heat_max = 0.0  # self time of the hottest line, in ms
+        self.drawn_state = None  # view state of the last redraw
+        self.update_id = None
 
     def attach(self, text_widget):
         """
@@ -97,37 +122,150 @@ class LineNumbers(tk.Canvas):
         @param text_widget The text widget to associate.
         """
         self.text_widget = text_widget
-        self.text_widget.bind('<<Modified>>', self.update_line_numbers)
-        self.text_widget.bind('<Configure>', self.update_line_numbers)
-        self.text_widget.bind('<FocusIn>', self.update_line_numbers)
-        self.text_widget.bind('<MouseWheel>', self.update_line_numbers)
+        # add="+" keeps the editor's own handlers for these events
+        for sequence in ('<<Modified>>', '<Configure>', '<FocusIn>', '<MouseWheel>',
+                         '<Button-4>', '<Button-5>', '<KeyRelease>', '<B1-Motion>'):
+            self.text_widget.bind(sequence, self.schedule_update, add="+")
+        self.text_widget.bind('<<Modified>>', self._on_modified, add="+")
+
+    def set_heatmap(self, entries):
+        """
+        @brief Shows the figures of a line-profiled run next to the line numbers.
+
+        Statements sharing a line are merged: their self times add up, and the
+        line keeps the highest count and total time.
+        @param entries A list of {"line", "count", "total_ms", "self_ms"} dictionaries.
+        """
+        heat = {}
+        for entry in entries:
+            count, total, self_ms = heat.get(entry["line"], (0, 0.0, 0.0))
+            heat[entry["line"]] = (max(count, entry["count"]), max(total, entry["total_ms"]),
+                                   self_ms + entry["self_ms"])
+        self.heat = heat
+        self.heat_max = max((figures[2] for figures in heat.values()), default=0.0)
+        if self.text_widget:
+            self.text_widget.edit_modified(False)  # the next edit clears the heatmap
+        self.configure(width=LINE_HEAT_WIDTH)
+        self.drawn_state = None
+        self.schedule_update()
+
+    def clear_heatmap(self):
+        """
+        @brief Hides the heatmap and restores the plain line numbers.
+        """
+        if not self.heat:
+            return
+        self.heat = {}
+        self.heat_max = 0.0
+        self.configure(width=LINE_NUMBERS_WIDTH)
+        for rectangle, label in self.heat_items:
+            self.itemconfigure(rectangle, state="hidden")
+            self.itemconfigure(label, state="hidden")
+        self.drawn_state = None
+        self.schedule_update()
+
+    def _on_modified(self, event=None):
+        """
+        @brief Clears the heatmap once the code is edited.
+        @param event Optional event that triggered the check.
+        """
+        if self.heat and self.text_widget.edit_modified():
+            self.clear_heatmap()
+
+    def heat_color(self, self_ms):
+        """
+        @brief Blends the heatmap colours according to a line's share of the hottest self time.
+        @param self_ms The self time of the line, in ms.
+        @return The colour, as a #rrggbb string.
+        """
+        ratio = self_ms / self.heat_max if self.heat_max > 0 else 0.0
+        cold = [int(LINE_HEAT_COLORS[0][i:i + 2], 16) for i in (1, 3, 5)]
+        hot = [int(LINE_HEAT_COLORS[1][i:i + 2], 16) for i in (1, 3, 5)]
+        return "#" + "".join(f"{round(c + (h - c) * ratio):02x}" for c, h in zip(cold, hot))
+
+    def schedule_update(self, event=None):
+        """
+        @brief Coalesces bursts of events into one update, run once Tk has applied them.
+        @param event Optional event that triggered the update.
+        """
+        if self.update_id is None:
+            self.update_id = self.after_idle(self.update_line_numbers)
 
     def update_line_numbers(self, event=None):
         """
         @brief Updates the displayed line numbers.
         @param event Optional event that triggered the update.
         """
-        self.delete("all")
-
+        self.update_id = None
         if not self.text_widget:
             return
 
-        temp = self.text_widget.index("@0,0")
-        while True:
-            dline = self.text_widget.dlineinfo(temp)
-            if dline is None:
-                break
-
-            y = dline[1]
-            line_num = str(temp).split('.')[0]
-            self.create_text(
-                35, y,
-                anchor="ne",
-                text=line_num,
-                font=(FONT_FAMILY, FONT_SIZE),
-                fill=THEME_COLORS["fg"]
-            )
-            temp = self.text_widget.index(f"{temp}+1line")
+        first = self.text_widget.index("@0,0")
+        first_info = self.text_widget.dlineinfo(first)
+        last_line = int(self.text_widget.index("end-1c").split('.')[0])
+        state = (
+            first,
+            first_info[1] if first_info else None,
+            last_line,
+            self.text_widget.winfo_height()
+        )
+        if state == self.drawn_state:
+            return
+        self.drawn_state = state
+
+        # (y, height, number) of each line visible in the editor
+        visible = []
+        line = int(first.split('.')[0])
+        dline = first_info
+        while dline is not None and line <= last_line:
+            visible.append((dline[1], dline[3], line))
+            line += 1
+            dline = self.text_widget.dlineinfo(f"{line}.0")
+
+        if self.heat:
+            self.update_heatmap(visible)
+
+        for i, (y, _, number) in enumerate(visible):
+            if i < len(self.items):
+                item = self.items[i]
+                self.coords(item, 35, y)
+                self.itemconfigure(item, text=str(number), state="normal")
+            else:
+                self.items.append(self.create_text(
+                    35, y,
+                    anchor="ne",
+                    text=str(number),
+                    font=(FONT_FAMILY, FONT_SIZE),
+                    fill=THEME_COLORS["fg"]
+                ))
+        for item in self.items[len(visible):]:
+            self.itemconfigure(item, state="hidden")
+
+    def update_heatmap(self, visible):
+        """
+        @brief Draws the heatmap rows of the visible lines, below the line numbers.
+        @param visible The (y, height, number) of each visible line.
+        """
+        rows = [(y, height, self.heat[number]) for y, height, number in visible if number in self.heat]
+        width = LINE_HEAT_WIDTH
+        for i, (y, height, (count, _, self_ms)) in enumerate(rows):
+            text = f"{count}x {self_ms:.2f}ms"
+            color = self.heat_color(self_ms)
+            if i < len(self.heat_items):
+                rectangle, label = self.heat_items[i]
+                self.coords(rectangle, 0, y, width, y + height)
+                self.itemconfigure(rectangle, fill=color, state="normal")
+                self.coords(label, width - 4, y)
+                self.itemconfigure(label, text=text, state="normal")
+            else:
+                rectangle = self.create_rectangle(0, y, width, y + height, fill=color, width=0)
+                label = self.create_text(width - 4, y, anchor="ne", text=text,
+                                         font=(FONT_FAMILY, FONT_SIZE - 3), fill=THEME_COLORS["fg"])
+                self.tag_lower(rectangle)
+                self.heat_items.append((rectangle, label))
+        for rectangle, label in self.heat_items[len(rows):]:
+            self.itemconfigure(rectangle, state="hidden")
+            self.itemconfigure(label, state="hidden")
 
 class EnhancedText(tk.Text):
     """
@@ -143,12 +281,20 @@ class EnhancedText(tk.Text):
         super().__init__(*args, **kwargs)
         self.highlighter = ErrorHighlighter(self)
         self.error_analyzer = ErrorAnalyzer()
+        self.analysis_worker = AnalysisWorker()
+        self.edit_version = 0
+        self.loading = False  # True while a file is streamed in (see ChunkedLoader)
+        self.analysis_code = None  # snapshot sent to the analysis worker
+        self.live_preview = None  # set by add_tab
 
         self.bind('<KeyRelease>', self._on_text_change)
         self.bind('<Button-3>', self._show_suggestion_menu)
         self.bind('<Motion>', self._show_error_tooltip)
+        self.bind('<Destroy>', lambda e: self.analysis_worker.close() if e.widget is self else None)
+        self.syntax_highlighter = SyntaxHighlighter(self)
 
         self.after_id = None
+        self.poll_id = None
         self.tooltip = None
 
     def attach_terminal(self, terminal_output, terminal_input):
@@ -180,26 +326,71 @@ class EnhancedText(tk.Text):
     def _on_text_change(self, event=None):
         """
         @brief Handles text change events and schedules code analysis.
+
+        Every change starts a new edit version and cancels the analysis of the
+        previous one, if it is still running.
         @param event Optional event that triggered the change.
         """
+        if self.loading:
+            return
+        self.edit_version += 1
+        self.analysis_worker.cancel()
         if self.after_id:
             self.after_cancel(self.after_id)
         self.after_id = self.after(1000, self._check_code)
 
     def _check_code(self):
         """
-        @brief Performs code analysis and applies highlights or suggestions.
+        @brief Sends a snapshot of the code to the analysis worker.
+
+        The analysis runs in a separate process; its result is picked up by
+        _poll_analysis on the Tk main thread.
         """
-        self.highlighter.clear_highlights()
+        self.after_id = None
         code = self.get("1.0", "end-1c")
 
         if not code.strip():
+            self.analysis_worker.cancel()
+            self.highlighter.clear_highlights()
+            return
+
+        self.analysis_code = code
+        self.analysis_worker.submit(self.edit_version, code)
+        if self.poll_id is None:
+            self.poll_id = self.after(ANALYSIS_POLL_MS, self._poll_analysis)
+
+    def _poll_analysis(self):
+        """
+        @brief Applies a finished analysis, unless the code changed since its snapshot.
+        """
+        self.poll_id = None
+        result = self.analysis_worker.poll()
+
+        if result is None:
+            if self.analysis_worker.is_busy():
+                self.poll_id = self.after(ANALYSIS_POLL_MS, self._poll_analysis)
             return
 
-        success, error_msg, suggestions = self.error_analyzer.analyze_code(code)
+        version, success, error_msg, line_num, suggestions, fingerprint = result
+        if version != self.edit_version:
+            return  # stale result for a superseded snapshot
+
+        self._apply_analysis(success, error_msg, line_num, suggestions)
+        if success and self.live_preview:
+            self.live_preview.request(fingerprint, self.analysis_code)
+
+    def _apply_analysis(self, success, error_msg, line_num, suggestions):
+        """
+        @brief Applies highlights and suggestions from an analysis result.
+
+        @param success Whether the code is free of errors.
+        @param error_msg The error message, if any.
+        @param line_num The line of the error, if any.
+        @param suggestions Suggestions indexed by line number.
+        """
+        self.highlighter.clear_highlights()
 
         if not success:
-            line_num = self.error_analyzer._extract_line_number(error_msg, code)
             self.highlighter.highlight_error(
                 f"{line_num}.0", f"{line_num}.end", error_msg
             )
@@ -275,6 +466,7 @@ class EnhancedText(tk.Text):
         """
         self.delete(f"{line_num}.0", f"{line_num}.end")
         self.insert(f"{line_num}.0", suggestion)
+        self.edit_version += 1
         self._check_code()
 
     def _show_error_tooltip(self, event):
@@ -356,7 +548,7 @@ def add_tab(notebook, title="Untitled"):
     editor_frame = tk.Frame(main_paned_window, bg=THEME_COLORS["bg"])
 
     # Line numbers widget
-    line_numbers = LineNumbers(editor_frame, width=40)
+    line_numbers = LineNumbers(editor_frame, width=LINE_NUMBERS_WIDTH)
     line_numbers.pack(side=tk.LEFT, fill=tk.Y)
 
     # Enhanced text editor
@@ -394,13 +586,8 @@ def add_tab(notebook, title="Untitled"):
 
     # Preview Frame
     preview_frame = tk.Frame(right_paned_window, bg=THEME_COLORS["button"])
-    preview_label = tk.Label(
-        preview_frame,
-        text="Preview Area",
-        bg=THEME_COLORS["button"],
-        fg=THEME_COLORS["fg"]
-    )
-    preview_label.pack(fill=tk.BOTH, expand=True)
+    preview = PreviewCanvas(preview_frame)
+    preview.pack(fill=tk.BOTH, expand=True)
     right_paned_window.add(preview_frame)
 
     # Terminal Frame
@@ -423,8 +610,13 @@ def add_tab(notebook, title="Untitled"):
     )
     terminal_widget.pack(fill=tk.BOTH, expand=True)
 
-    # Create an instance of DrawTerminal and connect it to the terminal widget
-    draw_terminal = DrawTerminal(terminal_widget=terminal_widget)
+    # Create an instance of DrawTerminal and connect it to the terminal widget;
+    # the preview follows the frames of the running program, then its final image
+    draw_terminal = DrawTerminal(
+        terminal_widget=terminal_widget,
+        on_run_finished=lambda success, image_path: finish_run(frame, success, image_path),
+        on_frame=lambda image: frame.preview.show_image(image)
+    )
 
     # Configure terminal input
     terminal_widget.bind(
@@ -434,6 +626,13 @@ def add_tab(notebook, title="Untitled"):
 
     right_paned_window.add(terminal_frame)
 
+    # Re-render the preview in the background after edits that pass analysis
+    editor.live_preview = LivePreview(
+        editor,
+        draw_terminal.get_build_dir,
+        lambda image: update_preview(frame, image)
+    )
+
     # Add the right pane (preview + terminal) to the main PanedWindow
     main_paned_window.add(right_paned_window)
 
@@ -445,8 +644,9 @@ def add_tab(notebook, title="Untitled"):
     # Pack the frame into the notebook
     frame.paned_window = main_paned_window
     frame.editor = editor
+    frame.line_numbers = line_numbers
     frame.preview_frame = preview_frame
-    frame.preview_label = preview_label
+    frame.preview = preview
     frame.terminal = draw_terminal
 
     notebook.add(frame, text=title)
@@ -464,13 +664,9 @@ def execute_terminal_command(draw_terminal, terminal_widget):
     """
     input_line = terminal_widget.get("insert linestart", "insert lineend").strip()
 
-    terminal_widget.insert(tk.END, "\n")
-    terminal_widget.see(tk.END)
-
+    draw_terminal.write_output("\n")
     draw_terminal.onecmd(input_line)
-
-    terminal_widget.insert(tk.END, "\n")
-    terminal_widget.see(tk.END)
+    draw_terminal.write_output("\n")
 
 
 def close_tab(notebook):
@@ -490,6 +686,11 @@ def close_tab(notebook):
         elif result:  # Yes:
             save_file(notebook)
 
+    if editor:
+        editor.analysis_worker.close()
+    terminal = getattr(current_frame, "terminal", None)
+    if terminal:
+        terminal.close()
     notebook.forget(current_tab)
     file_paths.pop(current_frame, None)
 
@@ -499,34 +700,26 @@ def update_preview(frame, image_path="output.bmp"):
     @brief Updates the preview area with the generated image.
 
     @param frame The frame containing the preview area.
-    @param image_path The path to the generated image.
+    @param image_path The path to the generated image, or its content as bytes.
     """
     try:
-        image = Image.open(image_path)
-        orig_width, orig_height = image.size
-        aspect_ratio = orig_width / orig_height
-
-        MAX_WIDTH = 500
-        MAX_HEIGHT = 500
-
-        # Respects aspect ratio
-        if orig_width > MAX_WIDTH or orig_height > MAX_HEIGHT:
-            if aspect_ratio > 1:  # Wider than tall
-                new_width = MAX_WIDTH
-                new_height = int(MAX_WIDTH / aspect_ratio)
-            else:  # Taller than wide
-                new_height = MAX_HEIGHT
-                new_width = int(MAX_HEIGHT * aspect_ratio)
-        else:
-            new_width = orig_width
-            new_height = orig_height
-
-        image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        photo = ImageTk.PhotoImage(image)
-
-        frame.preview_label.configure(image=photo, text="")
-        frame.preview_label.image = photo
-
+        frame.preview.show(image_path)
     except Exception as e:
         print(f"Error updating preview: {e}")
 
+
+def finish_run(frame, success, image_path):
+    """
+    @brief Shows the result of a run: the image, and the heatmap of a line-profiled run.
+
+    The heatmap is skipped if the code was edited while the program ran.
+    @param frame The frame of the tab that ran.
+    @param success Whether every stage succeeded.
+    @param image_path The path of the image written by the program.
+    """
+    if not success:
+        return
+    update_preview(frame, image_path)
+    lines = frame.terminal.line_profile
+    if lines is not None and not frame.editor.edit_modified():
+        frame.line_numbers.set_heatmap(lines)
@@ -1,14 +1,11 @@
 import tkinter as tk
 from tkinter import messagebox, filedialog
 from PIL import Image
-from ide.components.editor_tab import update_preview
 from ide.utils.file_manager import new_file, open_file, save_file
 from ide.components.editor_tab import close_tab
+from ide.utils import live_preview
 import os
 
-# Variable globale pour stocker le chemin de l'image générée
-generated_image_path = None
-
 
 def create_menu_bar(root, notebook, add_tab_callback):
     """
@@ -26,7 +23,7 @@ def create_menu_bar(root, notebook, add_tab_callback):
     file_menu.add_command(label="New", command=lambda: new_file(notebook, add_tab_callback))
     file_menu.add_command(label="Open", command=lambda: open_file(notebook, add_tab_callback))
     file_menu.add_command(label="Save", command=lambda: save_file(notebook))
-    file_menu.add_command(label="Download Image", command=download_image)  # New option
+    file_menu.add_command(label="Download Image", command=lambda: download_image(notebook))  # New option
     file_menu.add_command(label="Close Tab", command=lambda: close_tab(notebook))
     file_menu.add_separator()
     file_menu.add_command(label="Exit", command=root.quit)
@@ -35,6 +32,16 @@ def create_menu_bar(root, notebook, add_tab_callback):
     # "Run" menu
     run_menu = tk.Menu(menubar, tearoff=0)
     run_menu.add_command(label="Run", command=lambda: run_code(notebook))
+    run_menu.add_command(label="Run with Line Profile", command=lambda: run_code(notebook, line_profile=True))
+    run_menu.add_command(label="Clear Line Profile", command=lambda: clear_line_profile(notebook))
+    run_menu.add_command(label="Stop", command=lambda: stop_code(notebook))
+    run_menu.add_separator()
+    live_preview_var = tk.BooleanVar(root, value=live_preview.live_preview_enabled)
+    run_menu.add_checkbutton(
+        label="Live Preview",
+        variable=live_preview_var,
+        command=lambda: live_preview.set_live_preview_enabled(live_preview_var.get())
+    )
     menubar.add_cascade(label="Run", menu=run_menu)
 
     # "Help" menu
@@ -46,63 +53,68 @@ def create_menu_bar(root, notebook, add_tab_callback):
     root.config(menu=menubar)
 
 
-def run_code(notebook):
+def run_code(notebook, line_profile=False):
     """
-    @brief Compiles and executes the code in the editor, then updates the preview with the generated image.
+    @brief Compiles and executes the code in the editor in the background.
 
+    Progress and output are streamed into the tab's terminal, and the preview
+    is updated with the generated image when the run finishes.
     @param notebook The ttk.Notebook widget containing the editor and preview.
+    @param line_profile Whether each line's execution count and time are shown
+    in the gutter once the run finishes.
     """
-    global generated_image_path
     current_tab = notebook.select()
     current_frame = notebook.nametowidget(current_tab)
     editor = getattr(current_frame, "editor", None)
+    terminal = getattr(current_frame, "terminal", None)
 
-    if editor:
+    if editor and terminal:
         try:
-            # Extract the code from the editor
             code = editor.get("1.0", "end-1c")
+            if line_profile:
+                editor.edit_modified(False)  # an edit during the run discards the figures
+            terminal.run_code(source_code=code, line_profile=line_profile)
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred during execution: {e}")
 
-            # Save the code to a temporary Draw++ source file
-            source_file = "temp.dpp"
-            with open(source_file, "w") as file:
-                file.write(code)
 
-            # Temporary output C file and executable name
-            output_file = "temp.c"
-            executable = "temp_program"
+def clear_line_profile(notebook):
+    """
+    @brief Hides the line profile heatmap of the current tab.
 
-            # Commands to compile Draw++ and C code
-            compile_drawpp_command = f"python -m compiler.compiler {source_file} -o {output_file}"
-            compile_c_command = f"gcc -I../lib/DPP/include -I../lib/SDL2/include -L../lib -o {executable} {output_file} -ldrawpp -lSDL2 -lm"
-            run_command = f"./{executable}"
+    @param notebook The ttk.Notebook widget containing the editor and preview.
+    """
+    current_tab = notebook.select()
+    current_frame = notebook.nametowidget(current_tab)
+    line_numbers = getattr(current_frame, "line_numbers", None)
 
-            # Compile Draw++ to C
-            if os.system(compile_drawpp_command) != 0:
-                messagebox.showerror("Error", "Compilation of Draw++ to C failed.")
-                return
+    if line_numbers:
+        line_numbers.clear_heatmap()
 
-            # Compile the C code to an executable
-            if os.system(compile_c_command) == 0:
-                # Set the DISPLAY environment variable and execute the program
-                os.environ["DISPLAY"] = ":0"
-                os.system(run_command)
 
-                # Update the preview with the generated image
-                image_path = "output.bmp"
-                update_preview(current_frame, image_path)
+def stop_code(notebook):
+    """
+    @brief Stops the program running in the current tab.
 
-                # Store the path of the generated image
-                generated_image_path = image_path
+    @param notebook The ttk.Notebook widget containing the editor and preview.
+    """
+    current_tab = notebook.select()
+    current_frame = notebook.nametowidget(current_tab)
+    terminal = getattr(current_frame, "terminal", None)
 
-        except Exception as e:
-            messagebox.showerror("Error", f"An error occurred during execution: {e}")
+    if terminal:
+        terminal.do_cancel("")
 
 
-def download_image():
+def download_image(notebook):
     """
-    @brief Downloads the generated output image as a PNG file.
+    @brief Downloads the image generated by the current tab as a PNG file.
+
+    @param notebook The ttk.Notebook widget containing the tabs.
     """
-    global generated_image_path
+    current_frame = notebook.nametowidget(notebook.select())
+    terminal = getattr(current_frame, "terminal", None)
+    generated_image_path = terminal.last_image_path if terminal else None
 
     # Vérifie si l'image a été générée
     if not generated_image_path or not os.path.exists(generated_image_path):
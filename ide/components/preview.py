@@ -0,0 +1,375 @@
+import io
+import mmap
+import struct
+import tkinter as tk
+from collections import OrderedDict
+from PIL import Image, ImageChops, ImageTk
+from ide.config.settings import THEME_COLORS
+
+# zoom factor applied by one mouse wheel step
+ZOOM_STEP = 1.25
+MIN_ZOOM = 1.0
+MAX_ZOOM = 16.0
+
+# delay (ms) after the last zoom or pan event before the high-quality redraw
+SETTLE_MS = 150
+
+# scaled views kept in memory, keyed by the zoom and pan state that produced them
+SCALED_CACHE_SIZE = 8
+
+# a redraw touching less than this fraction of the view only updates that region
+PARTIAL_UPDATE_RATIO = 0.25
+
+# BMP compression modes read without PIL's file parser
+BI_RGB = 0
+BI_BITFIELDS = 3
+
+
+def decode_image(source):
+    """
+    @brief Decodes an image file or buffer into an RGB PIL image.
+
+    BMP files written by SDL (24 or 32 bits per pixel, uncompressed) are
+    unpacked in a single pass straight from a memory map of the file; other
+    formats fall back to PIL's decoders.
+    @param source A file path, a bytes-like object or a BytesIO holding the image.
+    @return An RGB PIL image.
+    """
+    if isinstance(source, io.BytesIO):
+        source = source.getbuffer()
+
+    if not isinstance(source, str):
+        return _decode_buffer(memoryview(source))
+
+    with open(source, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return _decode_buffer(view)
+            finally:
+                view.release()
+
+
+def _decode_buffer(view):
+    """
+    @brief Decodes an image held in memory.
+
+    @param view A memoryview of the whole file.
+    @return An RGB PIL image, independent of the buffer.
+    """
+    image = _decode_bmp(view)
+    if image is None:
+        image = Image.open(io.BytesIO(view)).convert("RGB")
+    return image
+
+
+def _decode_bmp(view):
+    """
+    @brief Unpacks an uncompressed 24 or 32 bits BMP without copying the file first.
+
+    @param view A memoryview of the whole file.
+    @return An RGB PIL image, or None if the file is not a BMP this function handles.
+    """
+    if len(view) < 54 or view[0:2] != b"BM":
+        return None
+
+    offset = struct.unpack_from("<I", view, 10)[0]
+    header_size, width, height, _, bpp, compression = struct.unpack_from("<IiiHHI", view, 14)
+    if width <= 0 or height == 0 or bpp not in (24, 32):
+        return None
+
+    if compression == BI_BITFIELDS and header_size >= 52:
+        masks = struct.unpack_from("<III", view, 54)
+        if bpp != 32 or masks != (0x00ff0000, 0x0000ff00, 0x000000ff):
+            return None
+    elif compression != BI_RGB:
+        return None
+
+    raw_mode = "BGRX" if bpp == 32 else "BGR"
+    stride = (width * bpp // 8 + 3) & ~3
+    rows = abs(height)
+    if offset + stride * rows > len(view):
+        return None
+
+    # positive heights are stored bottom-up
+    orientation = -1 if height > 0 else 1
+    pixels = view[offset:offset + stride * rows]
+    return Image.frombytes("RGB", (width, rows), pixels, "raw", raw_mode, stride, orientation)
+
+
+class ImagePyramid:
+    """
+    @brief Successive half-size copies of an image, for cheap downscaling.
+
+    A scaled view is resized from the smallest level that is still at least
+    as large as the target, so each resize reads at most four source pixels
+    per output pixel.
+    """
+
+    def __init__(self, image, min_side=64):
+        """
+        @brief Builds the pyramid with box-filtered halvings.
+
+        @param image The full-size image (level 0).
+        @param min_side Halving stops once a side would get smaller than this.
+        """
+        self.levels = [image]
+        while min(self.levels[-1].size) // 2 >= min_side:
+            self.levels.append(self.levels[-1].reduce(2))
+
+    @property
+    def size(self):
+        """
+        @brief Size of the full-size image.
+        """
+        return self.levels[0].size
+
+    def level_for(self, scale):
+        """
+        @brief Picks the smallest level that can be scaled to the target without upsampling.
+
+        @param scale The ratio between the output and the full-size image.
+        @return The index of the level; its scale relative to level 0 is 1 / 2**index.
+        """
+        index = 0
+        while index + 1 < len(self.levels) and scale <= 1 / 2 ** (index + 1):
+            index += 1
+        return index
+
+
+class PreviewCanvas(tk.Canvas):
+    """
+    @brief Preview area with zoom (mouse wheel) and pan (drag) of the rendered image.
+
+    Interactive zoom and pan use a cheap bilinear filter, then the view is
+    redrawn with Lanczos once the mouse settles. Scaled views are cached per
+    zoom and pan state, and a redraw that only changes a small region of the
+    view copies that region into the existing PhotoImage instead of replacing it.
+    """
+
+    def __init__(self, master, **kwargs):
+        """
+        @brief Initializes an empty preview.
+
+        @param master The parent widget.
+        @param kwargs Keyword arguments for tk.Canvas.
+        """
+        kwargs.setdefault("highlightthickness", 0)
+        kwargs.setdefault("bg", THEME_COLORS["button"])
+        super().__init__(master, **kwargs)
+        self.pyramid = None
+        self.zoom = MIN_ZOOM
+        self.center = (0.5, 0.5)  # point of the image at the center of the view, as fractions
+        self.photo = None
+        self.shown = None  # PIL image currently held by self.photo
+        self.image_item = None
+        self.scaled_cache = OrderedDict()
+        self.settle_id = None
+        self.drag_start = None
+
+        self.placeholder = self.create_text(
+            0, 0, text="Preview Area", fill=THEME_COLORS["fg"], anchor="center"
+        )
+
+        self.bind("<Configure>", self._on_configure)
+        self.bind("<MouseWheel>", self._on_wheel)
+        self.bind("<Button-4>", lambda e: self._zoom_at(e, ZOOM_STEP))
+        self.bind("<Button-5>", lambda e: self._zoom_at(e, 1 / ZOOM_STEP))
+        self.bind("<ButtonPress-1>", self._on_press)
+        self.bind("<B1-Motion>", self._on_drag)
+        self.bind("<Double-Button-1>", lambda e: self.reset_view())
+
+    def show(self, source):
+        """
+        @brief Displays a new image, keeping the zoom and pan if its size is unchanged.
+
+        @param source A file path, a bytes-like object or a BytesIO holding the image.
+        """
+        self.show_image(decode_image(source))
+
+    def show_image(self, image):
+        """
+        @brief Displays an already decoded image, such as a frame of a running program.
+
+        @param image An RGB PIL image.
+        """
+        if self.pyramid is None or self.pyramid.size != image.size:
+            self.zoom = MIN_ZOOM
+            self.center = (0.5, 0.5)
+        self.pyramid = ImagePyramid(image)
+        self.scaled_cache.clear()
+        self._redraw(interactive=False)
+
+    def reset_view(self):
+        """
+        @brief Fits the whole image in the preview again.
+        """
+        self.zoom = MIN_ZOOM
+        self.center = (0.5, 0.5)
+        self._redraw(interactive=False)
+
+    def _view_size(self):
+        """
+        @brief Current size of the canvas, with a fallback before it is mapped.
+        """
+        return max(self.winfo_width(), 1), max(self.winfo_height(), 1)
+
+    def _view_box(self):
+        """
+        @brief Computes the region of the full-size image visible in the canvas.
+
+        @return (box, output_size, scale): the source box (left, top, right,
+        bottom), the size of the scaled view, and the output/source ratio.
+        """
+        image_w, image_h = self.pyramid.size
+        view_w, view_h = self._view_size()
+        scale = min(view_w / image_w, view_h / image_h) * self.zoom
+
+        # visible part of the image, in source pixels, clamped inside the image
+        visible_w = min(image_w, view_w / scale)
+        visible_h = min(image_h, view_h / scale)
+        cx = min(max(self.center[0] * image_w, visible_w / 2), image_w - visible_w / 2)
+        cy = min(max(self.center[1] * image_h, visible_h / 2), image_h - visible_h / 2)
+        self.center = (cx / image_w, cy / image_h)
+
+        box = (int(cx - visible_w / 2), int(cy - visible_h / 2),
+               int(cx + visible_w / 2 + 0.5), int(cy + visible_h / 2 + 0.5))
+        output_size = (max(1, round((box[2] - box[0]) * scale)), max(1, round((box[3] - box[1]) * scale)))
+        return box, output_size, scale
+
+    def _scaled_view(self, interactive):
+        """
+        @brief Produces the scaled view for the current zoom and pan, from the cache if possible.
+
+        @param interactive True for the cheap filter used while zooming or panning.
+        @return The PIL image to display.
+        """
+        box, output_size, scale = self._view_box()
+        key = (box, output_size, interactive)
+        cached = self.scaled_cache.get(key)
+        if cached is not None:
+            self.scaled_cache.move_to_end(key)
+            return cached
+
+        index = self.pyramid.level_for(scale)
+        level = self.pyramid.levels[index]
+        factor = 2 ** index
+        level_box = (box[0] / factor, box[1] / factor, box[2] / factor, box[3] / factor)
+        if interactive:
+            resample = Image.Resampling.NEAREST if scale >= 1 else Image.Resampling.BILINEAR
+        else:
+            resample = Image.Resampling.NEAREST if self.zoom > MIN_ZOOM and scale >= 2 else Image.Resampling.LANCZOS
+        view = level.resize(output_size, resample, box=level_box)
+
+        self.scaled_cache[key] = view
+        while len(self.scaled_cache) > SCALED_CACHE_SIZE:
+            self.scaled_cache.popitem(last=False)
+        return view
+
+    def _redraw(self, interactive):
+        """
+        @brief Draws the current view, and schedules the high-quality pass after interaction.
+
+        @param interactive True while the user is zooming or panning.
+        """
+        if self.settle_id is not None:
+            self.after_cancel(self.settle_id)
+            self.settle_id = None
+        if self.pyramid is None:
+            return
+
+        self._blit(self._scaled_view(interactive))
+        if interactive:
+            self.settle_id = self.after(SETTLE_MS, lambda: self._redraw(interactive=False))
+
+    def _blit(self, view):
+        """
+        @brief Puts a scaled view on the canvas, updating only the changed region when it is small.
+
+        @param view The PIL image to display.
+        """
+        view_w, view_h = self._view_size()
+        self.itemconfigure(self.placeholder, state="hidden")
+
+        if self.photo is not None and self.shown is not None and self.shown.size == view.size:
+            changed = ImageChops.difference(self.shown, view).getbbox()
+            if changed is None:
+                return
+            area = (changed[2] - changed[0]) * (changed[3] - changed[1])
+            if area <= PARTIAL_UPDATE_RATIO * view.size[0] * view.size[1]:
+                patch = ImageTk.PhotoImage(view.crop(changed))
+                self.tk.call(str(self.photo), "copy", str(patch), "-to", changed[0], changed[1])
+                self.shown = view
+                return
+
+        self.photo = ImageTk.PhotoImage(view)
+        self.shown = view
+        if self.image_item is None:
+            self.image_item = self.create_image(view_w // 2, view_h // 2, image=self.photo, anchor="center")
+        else:
+            self.itemconfigure(self.image_item, image=self.photo)
+            self.coords(self.image_item, view_w // 2, view_h // 2)
+
+    def _on_configure(self, event):
+        """
+        @brief Keeps the placeholder centered and refits the image when the canvas is resized.
+        """
+        self.coords(self.placeholder, event.width // 2, event.height // 2)
+        if self.pyramid is not None:
+            self.scaled_cache.clear()
+            self._redraw(interactive=True)
+
+    def _on_wheel(self, event):
+        """
+        @brief Zooms in or out with the mouse wheel (Windows and macOS).
+        """
+        self._zoom_at(event, ZOOM_STEP if event.delta > 0 else 1 / ZOOM_STEP)
+
+    def _zoom_at(self, event, factor):
+        """
+        @brief Zooms by a factor, keeping the image point under the mouse in place.
+
+        @param event The mouse event.
+        @param factor The zoom multiplier.
+        """
+        if self.pyramid is None:
+            return
+        new_zoom = min(max(self.zoom * factor, MIN_ZOOM), MAX_ZOOM)
+        if new_zoom == self.zoom:
+            return
+
+        box, output_size, scale = self._view_box()
+        view_w, view_h = self._view_size()
+        image_w, image_h = self.pyramid.size
+        # image point under the mouse before zooming
+        left = (view_w - output_size[0]) / 2
+        top = (view_h - output_size[1]) / 2
+        px = box[0] + (event.x - left) / scale
+        py = box[1] + (event.y - top) / scale
+
+        ratio = self.zoom / new_zoom
+        cx = self.center[0] * image_w
+        cy = self.center[1] * image_h
+        self.center = ((px + (cx - px) * ratio) / image_w, (py + (cy - py) * ratio) / image_h)
+        self.zoom = new_zoom
+        self._redraw(interactive=True)
+
+    def _on_press(self, event):
+        """
+        @brief Starts a pan.
+        """
+        self.drag_start = (event.x, event.y)
+
+    def _on_drag(self, event):
+        """
+        @brief Pans the zoomed image with the mouse.
+        """
+        if self.pyramid is None or self.drag_start is None or self.zoom == MIN_ZOOM:
+            return
+        _, _, scale = self._view_box()
+        image_w, image_h = self.pyramid.size
+        dx = (event.x - self.drag_start[0]) / scale
+        dy = (event.y - self.drag_start[1]) / scale
+        self.drag_start = (event.x, event.y)
+        self.center = (self.center[0] - dx / image_w, self.center[1] - dy / image_h)
+        self._redraw(interactive=True)
@@ -0,0 +1,313 @@
+from compiler.lexer.lexer import Lexer
+from compiler.lexer.tokens import TokenType
+from ide.config.settings import SYNTAX_COLORS, HIGHLIGHT_MARGIN_LINES
+
+# token types coloured by each syntax tag
+TOKEN_TAGS = {}
+for token_type in (TokenType.INT, TokenType.FLOAT, TokenType.BOOL, TokenType.VAR,
+                   TokenType.IF, TokenType.ELIF, TokenType.ELSE, TokenType.FOR,
+                   TokenType.WHILE, TokenType.CURSOR):
+    TOKEN_TAGS[token_type] = "syntax_keyword"
+for token_type in (TokenType.CREATE_CURSOR, TokenType.COLOR, TokenType.THICKNESS,
+                   TokenType.MOVE, TokenType.ROTATE, TokenType.POSITION,
+                   TokenType.VISIBLE, TokenType.DRAW_LINE, TokenType.DRAW_RECTANGLE,
+                   TokenType.DRAW_CIRCLE, TokenType.DRAW_TRIANGLE,
+                   TokenType.DRAW_ELLIPSE, TokenType.RGB):
+    TOKEN_TAGS[token_type] = "syntax_builtin"
+token_types = list(TokenType)
+for token_type in token_types[token_types.index(TokenType.BLACK):token_types.index(TokenType.YELLOW) + 1]:
+    TOKEN_TAGS[token_type] = "syntax_color"
+TOKEN_TAGS[TokenType.NUMBER] = "syntax_number"
+TOKEN_TAGS[TokenType.BOOL_VALUE] = "syntax_number"
+
+SYNTAX_TAGS = ("syntax_keyword", "syntax_builtin", "syntax_color",
+               "syntax_number", "syntax_comment")
+
+
+def ends_in_comment(text, in_comment):
+    """
+    @brief Tells whether a line ends inside a block comment, without lexing it.
+
+    @param text The text of the line.
+    @param in_comment Whether the line starts inside a block comment.
+    @return True if a block comment is still open at the end of the line.
+    """
+    if "/*" not in text and "*/" not in text:
+        return in_comment
+
+    pos = 0
+    while True:
+        if in_comment:
+            end = text.find("*/", pos)
+            if end < 0:
+                return True
+            pos = end + 2
+            in_comment = False
+        else:
+            start = text.find("/*", pos)
+            if start < 0:
+                return False
+            line_comment = text.find("//", pos)
+            if 0 <= line_comment < start:
+                return False
+            pos = start + 2
+            in_comment = True
+
+
+def lex_spans(text, offset=0):
+    """
+    @brief Colours a piece of code with the compiler's lexer.
+
+    Characters the lexer rejects are skipped, so half-typed code still gets
+    coloured around them.
+    @param text The code, without comments or newlines.
+    @param offset The column of the first character of text in its line.
+    @return A list of (tag, start column, end column) tuples.
+    """
+    spans = []
+    while True:
+        lexer = Lexer(text)
+        try:
+            tokens = lexer.tokenize()
+            break
+        except ValueError:
+            bad = min(max(lexer.position - 1, 0), len(text) - 1)
+            spans.extend(lex_spans(text[:bad], offset))
+            text = text[bad + 1:]
+            offset += bad + 1
+
+    for token in tokens:
+        tag = TOKEN_TAGS.get(token.type)
+        if tag is None:
+            continue
+        start = token.column - 1
+        if token.type == TokenType.NUMBER:
+            end = start
+            while end < len(text) and (text[end].isdigit() or text[end] == '.'):
+                end += 1
+        else:
+            end = start + len(token.value)
+        spans.append((tag, offset + start, offset + end))
+    return spans
+
+
+def line_spans(text, in_comment):
+    """
+    @brief Colours one line of source code.
+
+    @param text The text of the line.
+    @param in_comment Whether the line starts inside a block comment.
+    @return A tuple (spans, in_comment): the (tag, start column, end column)
+            tuples of the line and whether it ends inside a block comment.
+    """
+    spans = []
+    pos = 0
+    while pos < len(text):
+        if in_comment:
+            end = text.find("*/", pos)
+            if end < 0:
+                spans.append(("syntax_comment", pos, len(text)))
+                return spans, True
+            spans.append(("syntax_comment", pos, end + 2))
+            pos = end + 2
+            in_comment = False
+            continue
+
+        line_comment = text.find("//", pos)
+        block_comment = text.find("/*", pos)
+        starts = [index for index in (line_comment, block_comment) if index >= 0]
+        code_end = min(starts) if starts else len(text)
+        if code_end > pos:
+            spans.extend(lex_spans(text[pos:code_end], pos))
+
+        if code_end == len(text):
+            break
+        if code_end == line_comment:
+            spans.append(("syntax_comment", code_end, len(text)))
+            break
+
+        end = text.find("*/", code_end + 2)
+        if end < 0:
+            spans.append(("syntax_comment", code_end, len(text)))
+            return spans, True
+        spans.append(("syntax_comment", code_end, end + 2))
+        pos = end + 2
+    return spans, in_comment
+
+
+class SyntaxHighlighter:
+    """
+    @brief Colours the source code around the viewport of a text widget.
+
+    The widget command is wrapped so that every insert, delete and scroll is
+    seen. An edit only invalidates the lines it touched; lines below it keep
+    their tags, which move with the text, unless the block comment state they
+    start in has changed. Each pass re-tags at most the visible lines plus
+    HIGHLIGHT_MARGIN_LINES on each side, so its cost does not depend on the
+    size of the file.
+    """
+
+    def __init__(self, text_widget):
+        """
+        @brief Initializes the highlighter and hooks it into the widget.
+
+        @param text_widget The text widget to colour.
+        """
+        self.text_widget = text_widget
+        # starts[i] is True when line i + 1 starts inside a block comment;
+        # it is only known for the first len(starts) lines
+        self.starts = [False]
+        # tagged[i] is the start state line i + 1 was tagged with, None if untagged
+        self.tagged = []
+        self.update_id = None
+
+        for tag in SYNTAX_TAGS:
+            text_widget.tag_configure(tag, foreground=SYNTAX_COLORS[tag[len("syntax_"):]])
+            text_widget.tag_lower(tag)
+
+        self.original = text_widget._w + "_orig"
+        text_widget.tk.call("rename", text_widget._w, self.original)
+        text_widget.tk.createcommand(text_widget._w, self._dispatch)
+        text_widget.bind('<Configure>', lambda e: self.schedule_update(), add="+")
+        text_widget.bind('<Destroy>', self._on_destroy, add="+")
+
+    def _dispatch(self, *args):
+        """
+        @brief Runs a widget command, keeping track of the lines it edits.
+
+        @param args The widget command and its arguments.
+        @return The result of the command.
+        """
+        operation = args[0] if args else None
+        if operation not in ("insert", "delete", "replace"):
+            result = self.text_widget.tk.call((self.original,) + args)
+            if operation in ("yview", "see"):
+                self.schedule_update()
+            return result
+
+        try:
+            first = self._line(args[1])
+            if operation == "insert":
+                last_before = first
+            elif len(args) > 2:
+                last_before = self._line(args[2])
+            else:
+                last_before = self._line(f"{args[1]}+1c")  # the character may be a newline
+        except Exception:
+            return self.text_widget.tk.call((self.original,) + args)
+
+        result = self.text_widget.tk.call((self.original,) + args)
+
+        if operation == "insert":
+            last_after = first + sum(str(chars).count("\n") for chars in args[2::2])
+        elif operation == "replace":
+            last_after = first + str(args[3]).count("\n")
+        else:
+            last_after = first
+            if len(args) > 3:
+                last_before = len(self.tagged)  # several ranges: forget everything below
+        self.invalidate(first, last_before, last_after)
+        return result
+
+    def _line(self, index):
+        """
+        @brief Resolves an index to its line number.
+
+        @param index A text widget index.
+        @return The line number.
+        """
+        return int(str(self.text_widget.tk.call(self.original, "index", index)).split(".")[0])
+
+    def invalidate(self, first, last_before, last_after):
+        """
+        @brief Records that lines first..last_before were replaced by lines first..last_after.
+
+        @param first The first edited line.
+        @param last_before The last edited line before the edit.
+        @param last_after The last edited line after the edit.
+        """
+        del self.starts[first:]
+        if first <= len(self.tagged):
+            self.tagged[first - 1:last_before] = [None] * (last_after - first + 1)
+        self.schedule_update()
+
+    def schedule_update(self):
+        """
+        @brief Schedules a highlighting pass once the widget is idle.
+        """
+        if self.update_id is None:
+            self.update_id = self.text_widget.after_idle(self.update)
+
+    def update(self):
+        """
+        @brief Re-tags the lines around the viewport that are stale.
+        """
+        self.update_id = None
+        widget = self.text_widget
+        line_count = int(widget.index("end-1c").split(".")[0])
+        top = int(widget.index("@0,0").split(".")[0])
+        bottom = int(widget.index(f"@0,{widget.winfo_height()}").split(".")[0])
+        first = max(1, top - HIGHLIGHT_MARGIN_LINES)
+        last = min(line_count, bottom + HIGHLIGHT_MARGIN_LINES)
+
+        self._compute_starts(first)
+        if len(self.tagged) < last:
+            self.tagged.extend([None] * (last - len(self.tagged)))
+
+        lines = widget.get(f"{first}.0", f"{last}.end").split("\n")
+        for line, text in enumerate(lines, first):
+            start = self.starts[line - 1]
+            if self.tagged[line - 1] is start:
+                end = ends_in_comment(text, start)
+            else:
+                spans, end = line_spans(text, start)
+                self._tag_line(line, spans)
+                self.tagged[line - 1] = start
+            if len(self.starts) == line:
+                self.starts.append(end)
+
+    def _compute_starts(self, line):
+        """
+        @brief Makes sure the block comment state is known up to the given line.
+
+        Only comment delimiters are looked for; lines above the viewport are
+        never lexed.
+        @param line The line whose start state is needed.
+        """
+        known = len(self.starts)
+        if known >= line:
+            return
+        text = self.text_widget.get(f"{known}.0", f"{line - 1}.end")
+        state = self.starts[-1]
+        for line_text in text.split("\n"):
+            state = ends_in_comment(line_text, state)
+            self.starts.append(state)
+
+    def _tag_line(self, line, spans):
+        """
+        @brief Replaces the syntax tags of one line.
+
+        @param line The line number.
+        @param spans The (tag, start column, end column) tuples of the line.
+        """
+        widget = self.text_widget
+        for tag in SYNTAX_TAGS:
+            widget.tag_remove(tag, f"{line}.0", f"{line}.end")
+
+        ranges = {}
+        for tag, start, end in spans:
+            ranges.setdefault(tag, []).extend((f"{line}.{start}", f"{line}.{end}"))
+        for tag, indices in ranges.items():
+            widget.tag_add(tag, *indices)
+
+    def _on_destroy(self, event):
+        """
+        @brief Removes the wrapper command when the widget is destroyed.
+
+        @param event The destroy event.
+        """
+        if event.widget is self.text_widget:
+            try:
+                self.text_widget.tk.deletecommand(self.text_widget._w)
+            except Exception:
+                pass
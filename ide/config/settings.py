@@ -8,6 +8,16 @@ THEME_COLORS = {
     "border": "#dddddd",
     "accent": "#007acc",
 }
+
+# syntax highlighting colours, by token category
+SYNTAX_COLORS = {
+    "keyword": "#0000cc",
+    "builtin": "#795e26",
+    "color": "#a31515",
+    "number": "#098658",
+    "comment": "#6a9955",
+}
+
 FONT_FAMILY = "Consolas"
 FONT_SIZE = 12
 
@@ -19,3 +29,31 @@ SHORTCUTS = {
     "select_all": "<Control-a>",
     "run_code": "<Control-e>",
 }
+
+# number of programs that may compile and run at the same time, across all tabs
+RUN_WORKERS = 2
+
+# re-render the preview automatically after each edit that passes analysis
+LIVE_PREVIEW = False
+
+# number of rendered images kept in memory for the live preview
+PREVIEW_CACHE_SIZE = 16
+
+# terminal output: lines kept in the scrollback, delay (ms) between two
+# refreshes, and lines per page of the lex/parse listings
+TERMINAL_MAX_LINES = 5000
+TERMINAL_FLUSH_MS = 50
+TERMINAL_PAGE_SIZE = 200
+
+# opening files: characters inserted per idle callback, and size (bytes)
+# above which a file opens read-only
+LOAD_CHUNK_CHARS = 256 * 1024
+READ_ONLY_FILE_BYTES = 5 * 1024 * 1024
+
+# lines highlighted above and below the visible part of the editor
+HIGHLIGHT_MARGIN_LINES = 50
+
+# line profile heatmap: gutter width (px) while it is shown, and the colours
+# of the coldest and hottest lines, by self time
+LINE_HEAT_WIDTH = 130
+LINE_HEAT_COLORS = ("#fff5e6", "#e8503a")
@@ -36,5 +36,11 @@ def main():
     # Start the main event loop
     root.mainloop()
 
+    # Stop running programs and remove the build directories of the open tabs
+    for tab in notebook.tabs():
+        terminal = getattr(notebook.nametowidget(tab), "terminal", None)
+        if terminal:
+            terminal.close()
+
 if __name__ == "__main__":
     main()
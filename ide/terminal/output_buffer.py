@@ -0,0 +1,85 @@
+import queue
+import tkinter as tk
+from ide.config.settings import TERMINAL_MAX_LINES, TERMINAL_FLUSH_MS
+
+
+class OutputBuffer:
+    """
+    @brief Batches text written from any thread into a Tk Text widget with a bounded scrollback.
+
+    Writers only push to a thread-safe queue. A timer on the Tk thread drains
+    the queue, inserts everything in a single call and scrolls once. The widget
+    acts as a ring buffer: once it holds more than max_lines lines, the oldest
+    ones are deleted.
+    """
+
+    def __init__(self, widget, max_lines=TERMINAL_MAX_LINES, flush_ms=TERMINAL_FLUSH_MS):
+        """
+        @brief Initializes the buffer and starts the flush timer.
+
+        @param widget The Text widget receiving the output.
+        @param max_lines The maximum number of lines kept in the widget.
+        @param flush_ms The delay between two flushes, in milliseconds.
+        """
+        self.widget = widget
+        self.max_lines = max_lines
+        self.flush_ms = flush_ms
+        self.pending = queue.Queue()
+        self.flush_id = self.widget.after(self.flush_ms, self._flush_loop)
+
+    def write(self, text):
+        """
+        @brief Queues text for display. Safe to call from any thread.
+
+        @param text The text to append.
+        """
+        if text:
+            self.pending.put(text)
+
+    def clear(self):
+        """
+        @brief Drops the queued text and empties the widget.
+        """
+        self._drain()
+        self.widget.delete("1.0", "end")
+
+    def flush(self):
+        """
+        @brief Inserts the queued text into the widget now (Tk thread only).
+        """
+        text = self._drain()
+        if not text:
+            return
+
+        # a burst longer than the scrollback only needs its tail
+        if text.count("\n") > self.max_lines:
+            text = "\n".join(text.split("\n")[-self.max_lines - 1:])
+
+        self.widget.insert("end", text)
+        line_count = int(self.widget.index("end-1c").split(".")[0])
+        if line_count > self.max_lines:
+            self.widget.delete("1.0", f"{line_count - self.max_lines + 1}.0")
+        self.widget.see("end")
+
+    def _drain(self):
+        """
+        @brief Empties the queue.
+
+        @return The queued text, joined.
+        """
+        chunks = []
+        while True:
+            try:
+                chunks.append(self.pending.get_nowait())
+            except queue.Empty:
+                return "".join(chunks)
+
+    def _flush_loop(self):
+        """
+        @brief Flushes the queue and reschedules itself until the widget is destroyed.
+        """
+        try:
+            self.flush()
+            self.flush_id = self.widget.after(self.flush_ms, self._flush_loop)
+        except tk.TclError:
+            self.flush_id = None
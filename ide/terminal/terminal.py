@@ -1,11 +1,17 @@
 import sys
 import os
+import json
+import shutil
+import tempfile
 import subprocess
 import threading
 import tkinter as tk
 from compiler.lexer.lexer import Lexer
 from compiler.parser.parser import Parser
 from compiler.parser.syntax_tree import *
+from ide.utils.run_pipeline import RunPipeline, PROFILE_FILE
+from ide.terminal.output_buffer import OutputBuffer
+from ide.config.settings import TERMINAL_PAGE_SIZE
 from cmd import Cmd
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
@@ -28,6 +34,7 @@ class InteractiveTerminal(tk.Text):
         self.command = command
         self.process = None
         self.thread = None
+        self.output = OutputBuffer(self)
 
         # Start the subprocess
         self.start_subprocess()
@@ -62,11 +69,10 @@ class InteractiveTerminal(tk.Text):
 
     def read_output(self):
         """
-        @brief Read output from the subprocess and display it in the terminal.
+        @brief Read output from the subprocess and queue it for display in the terminal.
         """
         for line in self.process.stdout:
-            self.insert(tk.END, line)
-            self.see(tk.END)
+            self.output.write(line)
 
     def send_input(self, event=None):
         """
@@ -77,8 +83,7 @@ class InteractiveTerminal(tk.Text):
         input_line = self.get("insert linestart", "insert lineend")
         self.process.stdin.write(input_line + "\n")
         self.process.stdin.flush()
-        self.insert(tk.END, "\n")  # Move to the next line
-        self.see(tk.END)
+        self.output.write("\n")  # Move to the next line
         return "break"  # Prevent default Enter key behavior
 
 
@@ -89,18 +94,29 @@ class DrawTerminal(Cmd):
     intro = "Welcome to the Draw++ terminal! Type 'help' for the list of commands."
     prompt = "draw++> "
 
-    def __init__(self, terminal_widget=None):
+    def __init__(self, terminal_widget=None, on_run_finished=None, on_frame=None):
         """
         @brief Initializes the interactive terminal.
 
         @param terminal_widget Optional. A widget to redirect terminal output.
+        @param on_run_finished Optional. Called with (success, image_path) when a run ends.
+        @param on_frame Optional. Called with the frames a running program publishes.
         """
         super().__init__()
         self.terminal_widget = terminal_widget  # Widget for output redirection
+        self.output = OutputBuffer(terminal_widget) if terminal_widget else None
+        self.pages = []  # lines of a long listing not shown yet (see do_more)
+        self.on_run_finished = on_run_finished
         self.source_code = None
         self.tokens = None
         self.ast = None
         self.history = []
+        self.last_image_path = None
+        self.temp_files = []
+        self.build_dir = None  # private build directory, created on the first run
+        self.profiling = False  # whether the current run is line-profiled
+        self.line_profile = None  # per-statement figures of the last line-profiled run
+        self.pipeline = RunPipeline(terminal_widget, self.write_output, self._on_run_finished, on_frame)
         self.check_imports()
 
     def print_to_terminal(self, message):
@@ -109,13 +125,23 @@ class DrawTerminal(Cmd):
 
         @param message The message to display.
         """
-        if self.terminal_widget:
+        if self.output:
             # Add a newline before and after each message
-            self.terminal_widget.insert("end", "\n" + message + "\n")
-            self.terminal_widget.see("end")
+            self.output.write("\n" + message + "\n")
         else:
             print("\n" + message + "\n")
 
+    def write_output(self, text):
+        """
+        @brief Appends raw program output to the terminal widget or shell.
+
+        @param text The text to append, as received from the process.
+        """
+        if self.output:
+            self.output.write(text)
+        else:
+            print(text, end="", flush=True)
+
     def check_imports(self):
         """
         @brief Checks if the required classes are properly imported.
@@ -254,8 +280,7 @@ class DrawTerminal(Cmd):
             lexer = Lexer(line)
             self.tokens = lexer.tokenize()
             self.print_to_terminal("=== Generated Tokens ===")
-            for token in self.tokens:
-                self.print_to_terminal(str(token))
+            self.paginate([str(token) for token in self.tokens])
         except Exception as e:
             self.print_to_terminal(f"Lexical error: {e}")
 
@@ -275,10 +300,32 @@ class DrawTerminal(Cmd):
             parser = Parser(self.tokens)
             self.ast = parser.parse()
             self.print_to_terminal("=== Generated AST ===")
-            self.print_to_terminal(str(self.ast))
+            self.paginate([str(statement) for statement in self.ast.statements])
         except Exception as e:
             self.print_to_terminal(f"Syntax error: {e}")
 
+    def paginate(self, lines):
+        """
+        @brief Displays the first page of a listing and keeps the rest for 'more'.
+
+        @param lines The lines of the listing.
+        """
+        self.pages = lines
+        self.do_more("")
+
+    def do_more(self, _):
+        """
+        @brief Shows the next page of the last token or AST listing.
+        """
+        if not self.pages:
+            self.print_to_terminal("Nothing more to show.")
+            return
+
+        page, self.pages = self.pages[:TERMINAL_PAGE_SIZE], self.pages[TERMINAL_PAGE_SIZE:]
+        self.print_to_terminal("\n".join(page))
+        if self.pages:
+            self.print_to_terminal(f"-- {len(self.pages)} more lines, type 'more' to continue --")
+
     def do_run(self, line):
         """
         @brief Executes the provided Draw++ code.
@@ -300,49 +347,108 @@ class DrawTerminal(Cmd):
         except Exception as e:
             self.print_to_terminal(f"Execution error: {e}")
 
-    def run_code(self, source_code=None, source_file=None):
+    def run_code(self, source_code=None, source_file=None, line_profile=False):
         """
-        @brief Compiles and executes Draw++ code.
+        @brief Compiles and executes Draw++ code in the background.
 
+        Output is streamed into the terminal as it arrives, and the run can be
+        stopped with the 'cancel' command.
         @param source_code Optional. The Draw++ code to execute.
         @param source_file Optional. The file path of the Draw++ code to execute.
+        @param line_profile Optional. Whether each statement is counted and timed;
+        the figures are then kept in line_profile once the run succeeds.
+        @return True if the run was started.
         """
         if not source_code and not source_file:
             self.print_to_terminal("Error: Provide a source of code.")
-            return
+            return False
 
-        temp_file = "temp.dpp"
+        if self.pipeline.is_running():
+            self.print_to_terminal("Error: A program is already running. Use 'cancel' to stop it.")
+            return False
+
+        build_dir = self.get_build_dir()
+        # a failed run must not leave the previous image behind
+        self.cleanup_temp_files([os.path.join(build_dir, name) for name in ("output.bmp", PROFILE_FILE)])
+        self.temp_files = [os.path.join(build_dir, name) for name in ("temp.c", "temp_program", PROFILE_FILE)]
         if source_code:
-            with open(temp_file, "w") as f:
+            source_file = os.path.join(build_dir, "temp.dpp")
+            with open(source_file, "w") as f:
                 f.write(source_code)
-            source_file = temp_file
+            self.temp_files.append(source_file)
+        elif not os.path.exists(source_file):
+            self.print_to_terminal(f"Error: File '{source_file}' not found.")
+            return False
 
-        try:
-            c_file = "temp.c"
-            executable = "temp_program"
-            compile_cmd = f"python -m compiler.compiler {source_file} -o {c_file}"
-            gcc_cmd = f"gcc -I../lib/DPP/include -I../lib/SDL2/include -L../lib -o {executable} {c_file} -ldrawpp -lSDL2 -lm"
-            run_cmd = f"./{executable}"
-
-            self.print_to_terminal(f"Compiling: {compile_cmd}")
-            result = subprocess.run(compile_cmd.split(), capture_output=True, text=True)
-            if result.returncode != 0:
-                self.print_to_terminal(f"Draw++ compilation error: {result.stderr}")
-                return
+        self.profiling = line_profile
+        self.line_profile = None
+        return self.pipeline.start(source_file, build_dir, ["--line-profile"] if line_profile else None)
 
-            self.print_to_terminal(f"Compiling: {gcc_cmd}")
-            result = subprocess.run(gcc_cmd.split(), capture_output=True, text=True)
-            if result.returncode != 0:
-                self.print_to_terminal(f"C compilation error: {result.stderr}")
-                return
+    def get_build_dir(self):
+        """
+        @brief Returns the private build directory of this terminal, creating it if needed.
 
-            self.print_to_terminal("Running executable...")
-            result = subprocess.run(run_cmd.split(), capture_output=True, text=True)
-            self.print_to_terminal(result.stdout)
-            if result.returncode != 0:
-                self.print_to_terminal(f"Execution error: {result.stderr}")
-        finally:
-            self.cleanup_temp_files([temp_file, c_file, executable])
+        Each tab owns its own directory, so concurrent runs never overwrite
+        each other's sources, executables or images.
+        @return The absolute path of the directory.
+        """
+        if self.build_dir is None or not os.path.isdir(self.build_dir):
+            self.build_dir = tempfile.mkdtemp(prefix="drawpp-")
+        return self.build_dir
+
+    def close(self):
+        """
+        @brief Stops any run and removes the build directory.
+        """
+        build_dir, self.build_dir = self.build_dir, None
+        self.last_image_path = None
+        if build_dir is None:
+            return
+
+        if self.pipeline.cancel() and self.pipeline.future is not None:
+            # the stage may still be exiting: remove the directory once it is done
+            self.pipeline.future.add_done_callback(lambda _: shutil.rmtree(build_dir, ignore_errors=True))
+        else:
+            shutil.rmtree(build_dir, ignore_errors=True)
+
+    def _on_run_finished(self, success, image_path):
+        """
+        @brief Removes the build artifacts and forwards the result of a run.
+
+        @param success Whether every stage succeeded.
+        @param image_path The path of the image written by the program.
+        """
+        if success and self.profiling:
+            self.line_profile = self._read_line_profile()
+        self.cleanup_temp_files(self.temp_files)
+        self.temp_files = []
+        if success:
+            self.last_image_path = image_path
+        if self.on_run_finished:
+            self.on_run_finished(success, image_path)
+
+    def _read_line_profile(self):
+        """
+        @brief Reads the per-statement figures written by a line-profiled program.
+
+        @return A list of {"line", "count", "total_ms", "self_ms"} dictionaries,
+        or None if the report is missing or invalid.
+        """
+        try:
+            with open(os.path.join(self.get_build_dir(), PROFILE_FILE)) as f:
+                return json.load(f).get("lines")
+        except (OSError, ValueError, AttributeError):
+            self.print_to_terminal("Warning: No line profile was written by the program.")
+            return None
+
+    def do_cancel(self, _):
+        """
+        @brief Stops the running program, killing its whole process group.
+        """
+        if self.pipeline.cancel():
+            self.print_to_terminal("Cancelling...")
+        else:
+            self.print_to_terminal("No program is running.")
 
     def cleanup_temp_files(self, files):
         """
@@ -386,8 +492,8 @@ class DrawTerminal(Cmd):
         """
         @brief Clears the terminal screen.
         """
-        if self.terminal_widget:
-            self.terminal_widget.delete("1.0", "end")
+        if self.output:
+            self.output.clear()
         else:
             os.system("clear")
 
@@ -0,0 +1,145 @@
+import multiprocessing
+from compiler.parser.syntax_tree import ast_fingerprint
+from ide.utils.error_analyzer import ErrorAnalyzer
+
+
+def _analysis_loop(connection):
+    """
+    @brief Entry point of the worker process: analyzes snapshots until the pipe closes.
+
+    @param connection The child end of the pipe. Requests are (version, code)
+    tuples; replies are (version, success, error_msg, line_num, suggestions,
+    fingerprint), where fingerprint is the AST hash of error-free code.
+    """
+    analyzer = ErrorAnalyzer()
+    while True:
+        try:
+            request = connection.recv()
+        except (EOFError, OSError):
+            break
+        if request is None:
+            break
+
+        version, code = request
+        success, error_msg, suggestions = analyzer.analyze_code(code)
+        line_num = None
+        fingerprint = None
+        if not success:
+            line_num = analyzer._extract_line_number(error_msg, code)
+        elif analyzer.last_ast is not None:
+            fingerprint = ast_fingerprint(analyzer.last_ast)
+        connection.send((version, success, error_msg, line_num, suggestions, fingerprint))
+
+
+class AnalysisWorker:
+    """
+    @brief Runs the compiler pipeline on editor snapshots in a separate process.
+
+    Each snapshot is tagged with the editor's edit version. Only one snapshot is
+    analyzed at a time; submitting a new one while another is in flight kills
+    the worker process and restarts it, so stale work never delays fresh work.
+    """
+
+    def __init__(self):
+        """
+        @brief Initializes the worker. The process is started on the first submit.
+        """
+        self.context = multiprocessing.get_context("spawn")
+        self.process = None
+        self.connection = None
+        self.busy_version = None
+
+    def _start(self):
+        """
+        @brief Starts the worker process and its pipe.
+        """
+        parent_end, child_end = self.context.Pipe()
+        self.process = self.context.Process(target=_analysis_loop, args=(child_end,), daemon=True)
+        self.process.start()
+        child_end.close()
+        self.connection = parent_end
+
+    def is_busy(self):
+        """
+        @brief Checks whether a snapshot is being analyzed.
+
+        @return True if a result is still expected.
+        """
+        return self.busy_version is not None
+
+    def submit(self, version, code):
+        """
+        @brief Sends a snapshot to the worker, cancelling any analysis in flight.
+
+        @param version The edit version of the snapshot.
+        @param code The source code to analyze.
+        """
+        if self.is_busy():
+            self.cancel()
+        if self.process is None or not self.process.is_alive():
+            self._stop(graceful=False)
+            self._start()
+        try:
+            self.connection.send((version, code))
+        except OSError:
+            self._stop(graceful=False)
+            return
+        self.busy_version = version
+
+    def cancel(self):
+        """
+        @brief Aborts the analysis in flight by terminating the worker process.
+        """
+        if not self.is_busy():
+            return
+        self.busy_version = None
+        self._stop(graceful=False)
+
+    def poll(self):
+        """
+        @brief Fetches a finished result without blocking.
+
+        @return (version, success, error_msg, line_num, suggestions, fingerprint),
+        or None if no result is ready.
+        """
+        if not self.is_busy():
+            return None
+        try:
+            if not self.connection.poll():
+                return None
+            result = self.connection.recv()
+        except (EOFError, OSError):
+            # The worker died: forget it, the next submit restarts it
+            self.busy_version = None
+            self._stop(graceful=False)
+            return None
+        self.busy_version = None
+        return result
+
+    def close(self):
+        """
+        @brief Stops the worker process.
+        """
+        self.busy_version = None
+        self._stop(graceful=True)
+
+    def _stop(self, graceful):
+        """
+        @brief Shuts the worker process down.
+
+        @param graceful If True, ask the worker to exit; otherwise terminate it.
+        """
+        if self.process is None:
+            return
+        if graceful and self.process.is_alive():
+            try:
+                self.connection.send(None)
+            except (OSError, ValueError):
+                pass
+            self.process.join(timeout=0.5)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=0.5)
+        self.connection.close()
+        self.process = None
+        self.connection = None
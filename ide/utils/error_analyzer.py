@@ -11,6 +11,7 @@ class ErrorAnalyzer:
 
     def __init__(self):
         self.semantic_analyzer = SemanticAnalyzer()
+        self.last_ast = None  # AST of the last code analyzed without errors
 
     def analyze_code(self, code):
         """
@@ -19,6 +20,7 @@ class ErrorAnalyzer:
         @param code The source code to analyze.
         @return tuple (bool, str, dict) Success flag, error message, and suggestions.
         """
+        self.last_ast = None
         try:
             # Si le code est vide
             if not code.strip():
@@ -67,6 +69,7 @@ class ErrorAnalyzer:
                 line_num = self._extract_line_number(error, code)
                 return False, error, {line_num: self._get_semantic_suggestions(error)}
 
+            self.last_ast = ast
             return True, None, {}
 
         except Exception as e:
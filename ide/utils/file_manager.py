@@ -1,5 +1,6 @@
 import os
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, ttk
+from ide.config.settings import LOAD_CHUNK_CHARS, READ_ONLY_FILE_BYTES
 
 # A dictionary to keep track of file paths associated with each tab
 file_paths = {}
@@ -9,24 +10,121 @@ def open_file(notebook, add_tab_callback):
     """
     @brief Opens an existing file and loads its content into a new tab.
 
+    The content is streamed into the editor in chunks from idle callbacks, so
+    the IDE stays responsive while a large file loads. Files larger than
+    READ_ONLY_FILE_BYTES open read-only, after a warning.
     @param notebook The ttk.Notebook widget where the tabs are managed.
     @param add_tab_callback A callback function to add a new tab to the notebook.
     """
     file_path = filedialog.askopenfilename(filetypes=[("All Files", "*.*")])
     if file_path:
+        file = None
         try:
-            with open(file_path, "r") as file:
-                content = file.read()
+            size = os.path.getsize(file_path)
+            read_only = size > READ_ONLY_FILE_BYTES
+            if read_only:
+                messagebox.showwarning(
+                    "Large File",
+                    f"{os.path.basename(file_path)} is {size / (1024 * 1024):.1f} MB.\n"
+                    "It will be opened read-only."
+                )
+            file = open(file_path, "r")
 
-            # Add a new tab with the file content
+            # Add a new tab and stream the file content into it
             file_name = os.path.basename(file_path)
             editor, frame = add_tab_callback(notebook, title=file_name)
-            editor.insert("1.0", content)  # Load content into the editor
             file_paths[frame] = file_path  # Associate the tab with the file path
+            ChunkedLoader(notebook, frame, editor, file, size, read_only).start()
         except Exception as e:
+            if file is not None:
+                file.close()
             messagebox.showerror("Error", f"Unable to open file:\n{e}")
 
 
+class ChunkedLoader:
+    """
+    @brief Inserts a file into an editor one chunk per idle callback.
+
+    Analysis is suppressed while the editor is loading and runs once at the
+    end. The editor refuses input until the load completes, and a progress
+    bar is shown above it meanwhile.
+    """
+
+    def __init__(self, notebook, frame, editor, file, size, read_only):
+        """
+        @brief Initializes the loader.
+
+        @param notebook The ttk.Notebook widget holding the tab.
+        @param frame The frame of the tab.
+        @param editor The editor receiving the content.
+        @param file The open file to read from; closed when the load ends.
+        @param size The size of the file in bytes.
+        @param read_only Whether the editor is disabled once loaded.
+        """
+        self.notebook = notebook
+        self.frame = frame
+        self.editor = editor
+        self.file = file
+        self.size = max(size, 1)
+        self.read_only = read_only
+        self.progress = None
+
+    def start(self):
+        """
+        @brief Starts loading.
+        """
+        self.editor.loading = True
+        self.editor.configure(state="disabled")
+        if self.size > LOAD_CHUNK_CHARS:
+            self.progress = ttk.Progressbar(self.frame, mode="determinate", maximum=100)
+            self.progress.pack(side="top", fill="x", before=self.frame.paned_window)
+        self.editor.after_idle(self._load_chunk)
+
+    def _load_chunk(self):
+        """
+        @brief Inserts the next chunk and schedules the following one.
+        """
+        try:
+            chunk = self.file.read(LOAD_CHUNK_CHARS)
+            if chunk:
+                # only the loader may write: the user cannot type between two chunks
+                self.editor.configure(state="normal")
+                self.editor.insert("end-1c", chunk)
+                self.editor.configure(state="disabled")
+                if self.progress is not None:
+                    self.progress["value"] = min(100, 100 * self.file.tell() / self.size)
+                self.editor.after_idle(self._load_chunk)
+                return
+        except Exception as e:
+            self.file.close()
+            if self.editor.winfo_exists():
+                self.editor.loading = False
+                self.editor.configure(state="normal")
+                messagebox.showerror("Error", f"Unable to open file:\n{e}")
+            return
+
+        self._finish()
+
+    def _finish(self):
+        """
+        @brief Closes the file, restores the editor and runs the first analysis.
+        """
+        self.file.close()
+        if self.progress is not None:
+            self.progress.destroy()
+
+        # the load itself must not be undoable
+        self.editor.edit_reset()
+        self.editor.edit_modified(False)
+        self.editor.loading = False
+        if self.read_only:
+            title = self.notebook.tab(self.frame, "text")
+            self.notebook.tab(self.frame, text=f"{title} (read-only)")
+        else:
+            self.editor.configure(state="normal")
+        self.editor._on_text_change()
+
+
 def save_file(notebook):
     """
     @brief Saves the content of the currently active tab to a file.
@@ -41,6 +139,10 @@ def save_file(notebook):
     if not editor:
         return
 
+    if getattr(editor, "loading", False):
+        messagebox.showwarning("Save", "The file is still loading.")
+        return
+
     if file_path is None:
         file_path = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")])
         if not file_path:
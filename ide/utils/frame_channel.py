@@ -0,0 +1,70 @@
+import struct
+from multiprocessing import shared_memory
+from PIL import Image
+from compiler.frame_channel import HEADER, MAGIC, VERSION, SEQUENCE_OFFSET
+
+# size of the pixel area, large enough for an 800x600 RGBA frame with room to spare
+DEFAULT_CAPACITY = 8 * 1024 * 1024
+
+
+class FrameChannel:
+    """
+    @brief Shared-memory segment through which a running Draw++ program publishes frames.
+
+    The IDE creates the segment and passes its name to the program in the
+    DRAWPP_FRAME_CHANNEL environment variable. The program copies its renderer
+    into the segment after each flush of its draw commands, bracketing the
+    write with a sequence counter that is odd while the frame is incomplete.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        """
+        @brief Creates the segment and writes its header.
+
+        @param capacity Size in bytes of the pixel area.
+        """
+        self.shm = shared_memory.SharedMemory(create=True, size=HEADER.size + capacity)
+        HEADER.pack_into(self.shm.buf, 0, MAGIC, VERSION, capacity, 0, 0, 0, 0, 0)
+        self.last_frame = 0
+
+    @property
+    def name(self):
+        """
+        @brief Name of the segment, to pass to the program.
+        """
+        return self.shm.name
+
+    def read_frame(self):
+        """
+        @brief Reads the latest frame if a new one was published since the last call.
+
+        The pixels are read straight from the segment; a frame that was being
+        written meanwhile is dropped and picked up by a later call.
+        @return An RGB PIL image, or None if there is no new complete frame.
+        """
+        _, _, _, width, height, stride, sequence, frame_counter = HEADER.unpack_from(self.shm.buf, 0)
+        if sequence % 2 or frame_counter == self.last_frame or width == 0 or height == 0:
+            return None
+
+        pixels = self.shm.buf[HEADER.size:HEADER.size + stride * height]
+        try:
+            view = Image.frombuffer("RGBA", (width, height), pixels, "raw", "RGBA", stride, 1)
+            image = view.convert("RGB")
+            del view
+        finally:
+            pixels.release()
+
+        if struct.unpack_from("<Q", self.shm.buf, SEQUENCE_OFFSET)[0] != sequence:
+            return None  # torn frame
+        self.last_frame = frame_counter
+        return image
+
+    def close(self):
+        """
+        @brief Releases and removes the segment.
+        """
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
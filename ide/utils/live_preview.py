@@ -0,0 +1,167 @@
+import os
+from collections import OrderedDict
+from ide.config.settings import LIVE_PREVIEW, PREVIEW_CACHE_SIZE
+from ide.utils.run_pipeline import get_run_executor, render_image
+
+# delay (ms) between two checks for a finished render
+RENDER_POLL_MS = 50
+
+# whether tabs re-render their preview after each successful analysis
+live_preview_enabled = LIVE_PREVIEW
+
+
+def set_live_preview_enabled(enabled):
+    """
+    @brief Turns the live preview on or off for every tab.
+
+    @param enabled True to re-render automatically after edits.
+    """
+    global live_preview_enabled
+    live_preview_enabled = enabled
+
+
+class RenderCache:
+    """
+    @brief Least-recently-used cache of rendered images keyed by AST fingerprint.
+
+    Programs with the same AST draw the same image, so the cache is shared by
+    every tab. It is only used from the Tk thread.
+    """
+
+    def __init__(self, max_entries):
+        """
+        @brief Initializes an empty cache.
+
+        @param max_entries The number of images kept before the oldest is evicted.
+        """
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, fingerprint):
+        """
+        @brief Looks an image up and marks it as recently used.
+
+        @param fingerprint The AST fingerprint of the program.
+        @return The image bytes, or None if the program was not rendered recently.
+        """
+        image = self.entries.get(fingerprint)
+        if image is not None:
+            self.entries.move_to_end(fingerprint)
+        return image
+
+    def put(self, fingerprint, image):
+        """
+        @brief Stores an image, evicting the least recently used ones if needed.
+
+        @param fingerprint The AST fingerprint of the program.
+        @param image The image bytes.
+        """
+        self.entries[fingerprint] = image
+        self.entries.move_to_end(fingerprint)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+render_cache = RenderCache(PREVIEW_CACHE_SIZE)
+
+
+class LivePreview:
+    """
+    @brief Re-renders a tab's preview in the background when its program changes.
+
+    Requests come from the editor after each successful analysis. A request is
+    skipped when the AST is unchanged since the image on display, served from
+    the render cache when possible, and otherwise rendered offscreen on the
+    shared run pool. While a render is in flight only the latest request is
+    kept; it starts once the current render finishes.
+    """
+
+    def __init__(self, widget, get_build_dir, on_image):
+        """
+        @brief Initializes the live preview of a tab.
+
+        @param widget A Tk widget used to schedule polling.
+        @param get_build_dir Returns the tab's build directory.
+        @param on_image Called with the image bytes to display.
+        """
+        self.widget = widget
+        self.get_build_dir = get_build_dir
+        self.on_image = on_image
+        self.shown_fingerprint = None
+        self.wanted_fingerprint = None
+        self.future = None
+        self.future_fingerprint = None
+        self.pending = None
+        self.poll_id = None
+
+    def request(self, fingerprint, code):
+        """
+        @brief Asks for the preview of a program that passed analysis.
+
+        @param fingerprint The AST fingerprint of the program.
+        @param code The source code of the program.
+        """
+        if not live_preview_enabled or fingerprint is None:
+            return
+
+        self.wanted_fingerprint = fingerprint
+        if fingerprint == self.shown_fingerprint:
+            return  # whitespace or comment edit: the image is the same
+
+        image = render_cache.get(fingerprint)
+        if image is not None:
+            self._show(fingerprint, image)
+            return
+
+        if self.future is not None and not self.future.done():
+            self.pending = (fingerprint, code)
+            return
+        self._submit(fingerprint, code)
+
+    def _submit(self, fingerprint, code):
+        """
+        @brief Starts an offscreen render on the shared pool.
+
+        @param fingerprint The AST fingerprint of the program.
+        @param code The source code of the program.
+        """
+        build_dir = os.path.join(self.get_build_dir(), "live")
+        self.future = get_run_executor().submit(render_image, code, build_dir)
+        self.future_fingerprint = fingerprint
+        if self.poll_id is None:
+            self.poll_id = self.widget.after(RENDER_POLL_MS, self._poll)
+
+    def _poll(self):
+        """
+        @brief Collects a finished render on the Tk thread, then starts the pending one.
+        """
+        self.poll_id = None
+        if not self.future.done():
+            self.poll_id = self.widget.after(RENDER_POLL_MS, self._poll)
+            return
+
+        fingerprint = self.future_fingerprint
+        try:
+            image = self.future.result()
+        except Exception:
+            image = None
+        self.future = None
+
+        if image is not None:
+            render_cache.put(fingerprint, image)
+            if fingerprint == self.wanted_fingerprint:
+                self._show(fingerprint, image)
+
+        if self.pending is not None:
+            pending, self.pending = self.pending, None
+            self.request(*pending)
+
+    def _show(self, fingerprint, image):
+        """
+        @brief Displays an image and remembers which program it belongs to.
+
+        @param fingerprint The AST fingerprint of the program.
+        @param image The image bytes.
+        """
+        self.shown_fingerprint = fingerprint
+        self.on_image(image)
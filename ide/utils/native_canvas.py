@@ -0,0 +1,270 @@
+import os
+import ctypes
+import threading
+
+# libdrawpp as a shared library, built by `make shared` in lib/
+LIBRARY_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'lib', 'build', 'libdrawpp.so'))
+
+
+class Color(ctypes.Structure):
+    """
+    @brief Mirror of SDL_Color.
+    """
+    _fields_ = [("r", ctypes.c_uint8), ("g", ctypes.c_uint8), ("b", ctypes.c_uint8), ("a", ctypes.c_uint8)]
+
+
+class CursorStruct(ctypes.Structure):
+    """
+    @brief Mirror of Cursor (lib/DPP/include/cursor.h).
+    """
+    _fields_ = [("x", ctypes.c_double), ("y", ctypes.c_double), ("angle", ctypes.c_double),
+                ("dir_x", ctypes.c_double), ("dir_y", ctypes.c_double), ("thickness", ctypes.c_int),
+                ("color", Color), ("visible", ctypes.c_bool), ("active", ctypes.c_bool),
+                ("next_free", ctypes.c_void_p)]
+
+
+CURSOR_P = ctypes.POINTER(CursorStruct)
+INT_P = ctypes.POINTER(ctypes.c_int)
+
+# argument and result types of the functions used from libdrawpp
+SIGNATURES = {
+    "initialize_headless": ([], ctypes.c_bool),
+    "cleanup_SDL": ([], None),
+    "get_frame_pixels": ([INT_P, INT_P, INT_P], ctypes.POINTER(ctypes.c_uint8)),
+    "flush_draw_commands": ([], None),
+    "clear_area": ([ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int], None),
+    "create_cursor": ([ctypes.c_double, ctypes.c_double], CURSOR_P),
+    "destroy_cursor": ([CURSOR_P], None),
+    "move_cursor": ([CURSOR_P, ctypes.c_double], None),
+    "rotate_cursor": ([CURSOR_P, ctypes.c_double], None),
+    "set_cursor_color": ([CURSOR_P, Color], None),
+    "set_cursor_visibility": ([CURSOR_P, ctypes.c_bool], None),
+    "set_cursor_thickness": ([CURSOR_P, ctypes.c_int], None),
+    "cursor_draw_line": ([CURSOR_P, ctypes.c_double], None),
+    "cursor_draw_rectangle": ([CURSOR_P, ctypes.c_double, ctypes.c_double, ctypes.c_bool], None),
+    "cursor_draw_circle": ([CURSOR_P, ctypes.c_double, ctypes.c_bool], None),
+    "cursor_draw_triangle": ([CURSOR_P, ctypes.c_double, ctypes.c_double, ctypes.c_bool], None),
+    "cursor_draw_ellipse": ([CURSOR_P, ctypes.c_double, ctypes.c_double, ctypes.c_bool], None),
+}
+
+_libraries = {}  # path -> loaded library
+_lock = threading.Lock()
+
+
+def load_library(path=None):
+    """
+    @brief Loads libdrawpp.so and declares the types of its functions, once per path.
+
+    @param path Optional. The shared library, LIBRARY_PATH by default.
+    @return The ctypes library.
+    @throws OSError if the library, or SDL2, cannot be loaded.
+    """
+    path = os.path.abspath(path or LIBRARY_PATH)
+    with _lock:
+        library = _libraries.get(path)
+        if library is None:
+            if not os.path.exists(path):
+                raise OSError(f"{path} not found; build it with `make shared` in lib/")
+            library = ctypes.CDLL(path)
+            for name, (argtypes, restype) in SIGNATURES.items():
+                function = getattr(library, name)
+                function.argtypes = argtypes
+                function.restype = restype
+            _libraries[path] = library
+        return library
+
+
+def _released(view):
+    """
+    @brief Tells whether a memoryview was released.
+    """
+    try:
+        view.nbytes
+    except ValueError:
+        return True
+    return False
+
+
+class NativeCursor:
+    """
+    @brief A libdrawpp cursor, driven directly through the shared library.
+
+    The methods call the C function of the same Draw++ method, e.g.
+    draw_circle calls cursor_draw_circle. The drawings are recorded and
+    only rasterized by NativeCanvas.flush().
+    """
+
+    def __init__(self, canvas, pointer):
+        """
+        @param canvas The NativeCanvas owning the cursor.
+        @param pointer The Cursor* returned by create_cursor.
+        """
+        self.canvas = canvas
+        self.pointer = pointer
+        self.lib = canvas.lib
+
+    @property
+    def x(self):
+        return self.pointer.contents.x
+
+    @property
+    def y(self):
+        return self.pointer.contents.y
+
+    @property
+    def angle(self):
+        return self.pointer.contents.angle
+
+    def move(self, distance):
+        self.lib.move_cursor(self.pointer, distance)
+
+    def rotate(self, angle):
+        self.lib.rotate_cursor(self.pointer, angle)
+
+    def color(self, color):
+        """
+        @brief Sets the color of the cursor.
+
+        @param color A Color, or the name of a libdrawpp color (e.g. "coral").
+        """
+        if isinstance(color, str):
+            color = self.canvas.color(color)
+        self.lib.set_cursor_color(self.pointer, color)
+
+    def thickness(self, thickness):
+        self.lib.set_cursor_thickness(self.pointer, thickness)
+
+    def visible(self, visible=True):
+        self.lib.set_cursor_visibility(self.pointer, visible)
+
+    def draw_line(self, length):
+        self.lib.cursor_draw_line(self.pointer, length)
+
+    def draw_rectangle(self, width, height, filled=False):
+        self.lib.cursor_draw_rectangle(self.pointer, width, height, filled)
+
+    def draw_circle(self, radius, filled=False):
+        self.lib.cursor_draw_circle(self.pointer, radius, filled)
+
+    def draw_triangle(self, base, height, filled=False):
+        self.lib.cursor_draw_triangle(self.pointer, base, height, filled)
+
+    def draw_ellipse(self, radius_x, radius_y, filled=False):
+        self.lib.cursor_draw_ellipse(self.pointer, radius_x, radius_y, filled)
+
+    def destroy(self):
+        """
+        @brief Releases the cursor; it must not be used afterwards.
+        """
+        self.lib.destroy_cursor(self.pointer)
+
+
+class NativeCanvas:
+    """
+    @brief Offscreen libdrawpp frame, drawn in process without gcc or a BMP file.
+
+    libdrawpp keeps its renderer and cursors in global variables, so only
+    one canvas can be open per process at a time, and it must be used from
+    one thread at a time.
+    """
+
+    _open = False  # whether a canvas is open in this process
+
+    def __init__(self, library_path=None):
+        """
+        @brief Loads libdrawpp and initializes its headless renderer.
+
+        @param library_path Optional. The shared library, LIBRARY_PATH by default.
+        @throws OSError if the library cannot be loaded.
+        @throws RuntimeError if a canvas is already open or the renderer cannot be created.
+        """
+        self.lib = load_library(library_path)
+        with _lock:
+            if NativeCanvas._open:
+                raise RuntimeError("A native canvas is already open in this process")
+            if not self.lib.initialize_headless():
+                self.lib.cleanup_SDL()
+                raise RuntimeError("libdrawpp could not create its headless renderer")
+            NativeCanvas._open = True
+        self.closed = False
+
+        width, height, stride = ctypes.c_int(), ctypes.c_int(), ctypes.c_int()
+        pixels = self.lib.get_frame_pixels(ctypes.byref(width), ctypes.byref(height), ctypes.byref(stride))
+        self.width, self.height, self.stride = width.value, height.value, stride.value
+        self.buffer = (ctypes.c_uint8 * (self.stride * self.height)).from_address(
+            ctypes.addressof(pixels.contents))
+        self.view = None  # memoryview handed out by pixels(), released by close()
+
+    def color(self, name):
+        """
+        @brief Looks up a named libdrawpp color.
+
+        @param name The C name of the color, e.g. "coral" (see codegen_config.json).
+        @return A Color.
+        @throws ValueError if the library has no such color.
+        """
+        try:
+            return Color.in_dll(self.lib, name)
+        except ValueError:
+            raise ValueError(f"Unknown color '{name}'") from None
+
+    def create_cursor(self, x, y):
+        """
+        @brief Creates a cursor.
+
+        @param x The initial x coordinate.
+        @param y The initial y coordinate.
+        @return A NativeCursor.
+        @throws MemoryError if the cursor pool cannot grow.
+        """
+        pointer = self.lib.create_cursor(x, y)
+        if not pointer:
+            raise MemoryError("libdrawpp could not allocate a cursor")
+        return NativeCursor(self, pointer)
+
+    def clear_area(self, x, y, width, height):
+        self.lib.clear_area(x, y, width, height)
+
+    def flush(self):
+        """
+        @brief Rasterizes the drawings recorded since the last flush.
+        """
+        self.lib.flush_draw_commands()
+
+    def pixels(self):
+        """
+        @brief Rasterizes the pending drawings and returns the frame, without copying it.
+
+        Every call returns the same memoryview, which close() releases: slices
+        or arrays made from it must not be used after close().
+        @return A memoryview of height rows of stride bytes, RGBA.
+        """
+        self.lib.get_frame_pixels(ctypes.byref(ctypes.c_int()), ctypes.byref(ctypes.c_int()),
+                                  ctypes.byref(ctypes.c_int()))
+        if self.view is None or _released(self.view):
+            self.view = memoryview(self.buffer).cast("B")
+        return self.view
+
+    def close(self):
+        """
+        @brief Releases the frame, the renderer and the cursors.
+
+        @throws BufferError if an object still exports the memoryview of
+                pixels(), e.g. an array made from it; the canvas then stays open.
+        """
+        if self.closed:
+            return
+        if self.view is not None:
+            self.view.release()
+            self.view = None
+        self.closed = True
+        self.buffer = None
+        self.lib.cleanup_SDL()
+        with _lock:
+            NativeCanvas._open = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
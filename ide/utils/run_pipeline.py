@@ -0,0 +1,482 @@
+import os
+import sys
+import queue
+import shutil
+import signal
+import subprocess
+import threading
+import time
+import functools
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from compiler.api import gcc_command
+from compiler.client import report_lines, request_or_local
+from compiler.frame_channel import CHANNEL_ENV
+from ide.config.settings import RUN_WORKERS
+from ide.utils.frame_channel import FrameChannel
+
+# root of the repository, where the compiler runs
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# delay (ms) between two flushes of the pipeline events into the UI
+RUN_POLL_MS = 50
+
+# delay (s) granted to a cancelled process group before it is killed
+CANCEL_GRACE_S = 1.0
+
+# maximum duration (s) of each stage of an offscreen render
+RENDER_TIMEOUT_S = 10.0
+
+# maximum time (s) to wait for the compile server before compiling in process;
+# short, since cancel() cannot interrupt the wait
+COMPILE_RESPONSE_TIMEOUT_S = 2.0
+
+# report written in the build directory by libdrawpp's profiler (see profiler.h)
+PROFILE_FILE = "drawpp_profile.json"
+PROFILE_OUTPUT_ENV = "DRAWPP_PROFILE_OUTPUT"
+
+# pool shared by every tab, so that concurrent runs stay bounded
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_run_executor():
+    """
+    @brief Returns the worker pool shared by all pipelines, creating it on first use.
+
+    @return A ThreadPoolExecutor with RUN_WORKERS workers.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=RUN_WORKERS, thread_name_prefix="drawpp-run")
+        return _executor
+
+
+class RunPipeline:
+    """
+    @brief Compiles and runs Draw++ code without blocking the Tk main loop.
+
+    The three stages (Draw++ to C, C to executable, execution) run one after the
+    other on a worker of the shared pool; runs from other tabs proceed in
+    parallel up to RUN_WORKERS, the others wait for a free worker. The
+    Draw++ compilation normally runs in this process or on the compile
+    server, and a cancelled run stops once it returns, within
+    COMPILE_RESPONSE_TIMEOUT_S. The other stages are started in their own
+    process group so that cancel() can stop them together with any child
+    they spawned. Output lines, stage progress and the final result are
+    queued as events and delivered on the Tk thread by polling with after().
+    """
+
+    def __init__(self, widget, on_output, on_finished=None, on_frame=None):
+        """
+        @brief Initializes the pipeline.
+
+        @param widget A Tk widget used to schedule polling, or None to run
+        synchronously and deliver events immediately (shell mode).
+        @param on_output Called with each piece of text to display.
+        @param on_finished Optional. Called with (success, image_path) once a run ends.
+        @param on_frame Optional. Called with each frame (a PIL image) the
+        program publishes while it runs; requires a widget.
+        """
+        self.widget = widget
+        self.on_output = on_output
+        self.on_finished = on_finished
+        self.on_frame = on_frame
+        self.channel = None
+        self.events = queue.Queue()
+        self.future = None
+        self.process = None
+        self.cancelled = threading.Event()
+        self.lock = threading.Lock()
+        self.poll_id = None
+
+    def is_running(self):
+        """
+        @brief Checks whether a run is in progress.
+
+        @return True if the run is queued or executing.
+        """
+        return self.future is not None and not self.future.done()
+
+    def start(self, source_file, build_dir, compile_args=None):
+        """
+        @brief Starts compiling and running a Draw++ source file.
+
+        @param source_file The path of the .dpp file to run.
+        @param build_dir The directory receiving the C file, the executable and
+        the output image.
+        @param compile_args Optional. Extra options of the Draw++ compiler.
+        @return False if a run is already in progress, True otherwise.
+        """
+        if self.is_running():
+            return False
+
+        self.cancelled.clear()
+        if self.widget is None:
+            stages = self._build_stages(os.path.abspath(source_file), os.path.abspath(build_dir),
+                                        compile_args=compile_args)
+            self._run_stages(stages, build_dir)
+            return True
+
+        extra_env = {}
+        if self.on_frame is not None:
+            self._close_channel()
+            try:
+                self.channel = FrameChannel()
+                extra_env[CHANNEL_ENV] = self.channel.name
+            except OSError:
+                self.channel = None  # no shared memory: the image is still shown at the end
+        stages = self._build_stages(os.path.abspath(source_file), os.path.abspath(build_dir), extra_env,
+                                    compile_args)
+
+        self.future = get_run_executor().submit(self._run_stages, stages, build_dir)
+        if self.poll_id is None:
+            self.poll_id = self.widget.after(RUN_POLL_MS, self._poll)
+        return True
+
+    def cancel(self):
+        """
+        @brief Stops the current run by killing the process group of the running stage.
+
+        @return True if a run was in progress.
+        """
+        if not self.is_running():
+            return False
+
+        if self.future.cancel():
+            # still waiting for a worker: nothing was started
+            self._emit(("output", "\n[CANCELLED] Run removed from the queue\n"))
+            self._emit(("finished", False, None))
+            return True
+
+        self.cancelled.set()
+        with self.lock:
+            process = self.process
+        if process is not None:
+            self._kill_group(process)
+        return True
+
+    def _build_stages(self, source_file, build_dir, extra_env=None, compile_args=None):
+        """
+        @brief Builds the command line of each stage.
+
+        The Draw++ compilation goes through the compile server, or runs in
+        this already-loaded process when none is running, rather than
+        starting a new interpreter.
+        @param source_file The absolute path of the .dpp file.
+        @param build_dir The absolute path of the build directory.
+        @param extra_env Optional. Variables added to the environment of the program.
+        @param compile_args Optional. Extra options of the Draw++ compiler.
+        @return A list of (label, command, cwd, env) tuples; command is a
+                function for a stage run in process.
+        """
+        stages = build_stages(source_file, build_dir, extra_env=extra_env, compile_args=compile_args)
+        if set(compile_args or ()) <= {"--line-profile"}:
+            c_file = os.path.join(build_dir, "temp.c")
+            line_profile = "--line-profile" in (compile_args or ())
+            label, _, cwd, _ = stages[0]
+            stages[0] = (label, functools.partial(compile_stage, source_file, c_file, line_profile,
+                                                  cancelled=self.cancelled), cwd, None)
+        return stages
+
+    def _close_channel(self):
+        """
+        @brief Removes the frame channel of the previous run.
+        """
+        if self.channel is not None:
+            self.channel.close()
+            self.channel = None
+
+    def _run_stages(self, stages, build_dir):
+        """
+        @brief Runs every stage in order, stopping at the first failure (pool worker).
+
+        @param stages The stages returned by _build_stages.
+        @param build_dir The directory where the executable writes its image.
+        """
+        success = False
+        started = time.perf_counter()
+
+        for number, (label, command, cwd, env) in enumerate(stages, start=1):
+            self._emit(("output", f"\n[{number}/{len(stages)}] {label}...\n"))
+            stage_start = time.perf_counter()
+            returncode = self._run_stage(command, cwd, env)
+            elapsed = time.perf_counter() - stage_start
+
+            if self.cancelled.is_set():
+                self._emit(("output", f"\n[CANCELLED] {label} stopped after {elapsed:.2f} s\n"))
+                break
+            if returncode != 0:
+                self._emit(("output", f"\n[ERROR] {label} failed with exit code {returncode} ({elapsed:.2f} s)\n"))
+                break
+            self._emit(("output", f"[{number}/{len(stages)}] {label} done in {elapsed:.2f} s\n"))
+        else:
+            success = True
+            self._emit(("output", f"\nRun finished in {time.perf_counter() - started:.2f} s\n"))
+
+        self._emit(("finished", success, os.path.join(build_dir, "output.bmp")))
+
+    def _run_stage(self, command, cwd, env):
+        """
+        @brief Runs one stage and streams its output; a command runs in its own process group.
+
+        @param command The command line to execute, or a function run in this
+               process, taking a function that outputs text and returning an exit code.
+        @param cwd The working directory of the process.
+        @param env The environment of the process.
+        @return The exit code of the process, or -1 if it could not be started.
+        """
+        if self.cancelled.is_set():
+            return -1
+        if callable(command):
+            return command(lambda text: self._emit(("output", text)))
+
+        try:
+            process = subprocess.Popen(
+                command,
+                cwd=cwd,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                errors="replace",
+                bufsize=1,
+                start_new_session=True
+            )
+        except OSError as e:
+            self._emit(("output", f"[ERROR] Could not start {command[0]}: {e}\n"))
+            return -1
+
+        with self.lock:
+            self.process = process
+        # cancel() may have run between the check above and the registration
+        if self.cancelled.is_set():
+            self._kill_group(process)
+
+        stderr_reader = threading.Thread(target=self._pump, args=(process.stderr,), daemon=True)
+        stderr_reader.start()
+        self._pump(process.stdout)
+        stderr_reader.join()
+        returncode = process.wait()
+
+        with self.lock:
+            self.process = None
+        return returncode
+
+    def _pump(self, stream):
+        """
+        @brief Forwards the lines of a process stream as output events.
+
+        @param stream The stdout or stderr pipe of the process.
+        """
+        for line in stream:
+            self._emit(("output", line))
+        stream.close()
+
+    def _kill_group(self, process):
+        """
+        @brief Terminates the process group of a stage, then kills it if it lingers.
+
+        @param process The Popen object of the stage.
+        """
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+
+        def force_kill():
+            if process.poll() is None:
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+
+        timer = threading.Timer(CANCEL_GRACE_S, force_kill)
+        timer.daemon = True
+        timer.start()
+
+    def _emit(self, event):
+        """
+        @brief Queues an event for the Tk thread, or handles it at once in shell mode.
+
+        @param event An ("output", text) or ("finished", success, image_path) tuple.
+        """
+        if self.widget is None:
+            self._dispatch(event)
+        else:
+            self.events.put(event)
+
+    def _dispatch(self, event):
+        """
+        @brief Delivers an event to the callbacks.
+
+        @param event The event to deliver.
+        """
+        if event[0] == "output":
+            self.on_output(event[1])
+        elif event[0] == "finished" and self.on_finished:
+            self.on_finished(event[1], event[2])
+
+    def _poll(self):
+        """
+        @brief Delivers the queued events on the Tk thread and reschedules itself while a run is active.
+        """
+        self.poll_id = None
+        if self.channel is not None:
+            frame = self.channel.read_frame()
+            if frame is not None:
+                self.on_frame(frame)
+
+        chunks = []
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == "output":
+                chunks.append(event[1])
+                continue
+            if chunks:
+                self.on_output("".join(chunks))
+                chunks = []
+            self._dispatch(event)
+        if chunks:
+            self.on_output("".join(chunks))
+
+        if self.is_running() or not self.events.empty():
+            try:
+                self.poll_id = self.widget.after(RUN_POLL_MS, self._poll)
+                return
+            except tk.TclError:
+                pass  # the widget was destroyed with its tab
+        self._close_channel()
+
+
+def compile_stage(source_file, c_file, line_profile, output, cancelled=None):
+    """
+    @brief Compiles a .dpp file to C through the compile server, or in this process if none answers.
+
+    @param source_file The absolute path of the .dpp file.
+    @param c_file The C file to write.
+    @param line_profile Whether the program counts and times each statement.
+    @param output A function receiving the text to show.
+    @param cancelled Optional. A threading.Event set when the run is cancelled;
+           the C file is then not written.
+    @return 0 on success, 1 otherwise, as the exit code of a stage.
+    """
+    try:
+        with open(source_file, "r") as f:
+            source = f.read()
+    except OSError as e:
+        output(f"❌ Error: Cannot read {source_file}: {e.strerror}\n")
+        return 1
+
+    response, served = request_or_local({"op": "compile", "source": source, "line_profile": line_profile},
+                                        timeout=COMPILE_RESPONSE_TIMEOUT_S)
+    for line in report_lines(response, served):
+        output(line + "\n")
+    if not response.get("ok"):
+        return 1
+    if cancelled is not None and cancelled.is_set():
+        return 1
+    try:
+        os.makedirs(os.path.dirname(c_file), exist_ok=True)
+        with open(c_file, "w") as f:
+            f.write(response["code"])
+    except OSError as e:
+        output(f"❌ Error: Cannot write {c_file}: {e.strerror}\n")
+        return 1
+    output(f"✓ C code generated successfully: {c_file}\n")
+    return 0
+
+
+def build_stages(source_file, build_dir, headless=False, extra_env=None, compile_args=None):
+    """
+    @brief Builds the command line of each stage of a run.
+
+    @param source_file The absolute path of the .dpp file.
+    @param build_dir The absolute path of the build directory.
+    @param headless If True, the program renders offscreen with SDL's dummy
+    video driver and software renderer instead of opening a window.
+    @param extra_env Optional. Variables added to the environment of the program.
+    @param compile_args Optional. Extra options of the Draw++ compiler, such as --line-profile.
+    @return A list of (label, command, cwd, env) tuples.
+    """
+    c_file = os.path.join(build_dir, "temp.c")
+    executable = os.path.join(build_dir, "temp_program")
+
+    compile_env = dict(os.environ, PYTHONUNBUFFERED="1")
+    compile_cmd = [sys.executable, "-m", "compiler.compiler", source_file, "-o", c_file]
+    if compile_args:
+        compile_cmd += list(compile_args)
+
+    gcc_cmd = gcc_command([c_file], executable)
+
+    run_env = dict(os.environ)
+    if headless:
+        # the software renderer is picked by name, whatever flags the program asks for
+        run_env.update(SDL_VIDEODRIVER="dummy", SDL_RENDER_DRIVER="software")
+    else:
+        run_env.setdefault("DISPLAY", ":0")
+    if extra_env:
+        run_env.update(extra_env)
+    if compile_args and "--line-profile" in compile_args:
+        # the IDE reads the report there, whatever the user's environment says
+        run_env[PROFILE_OUTPUT_ENV] = os.path.join(build_dir, PROFILE_FILE)
+    run_cmd = [executable]
+    # stdio is block-buffered on a pipe: ask for line buffering so output streams live
+    if shutil.which("stdbuf"):
+        run_cmd = ["stdbuf", "-oL", "-eL"] + run_cmd
+
+    return [
+        ("Draw++ compilation", compile_cmd, REPO_ROOT, compile_env),
+        ("C compilation", gcc_cmd, build_dir, os.environ),
+        ("Execution", run_cmd, build_dir, run_env),
+    ]
+
+
+def render_image(source_code, build_dir, timeout=RENDER_TIMEOUT_S):
+    """
+    @brief Compiles and runs Draw++ code offscreen, without any output, and returns its image file.
+
+    Unlike compiler.api.render_source, it goes through files in build_dir and
+    does not need memfd_create. Meant to be called on a pool worker. Each stage runs in its own process
+    group, which is killed if the stage exceeds the timeout.
+    @param source_code The Draw++ code to render.
+    @param build_dir The directory receiving the intermediate files.
+    @param timeout The maximum duration of each stage, in seconds.
+    @return The content of the rendered image, or None if any stage failed.
+    """
+    os.makedirs(build_dir, exist_ok=True)
+    source_file = os.path.join(build_dir, "temp.dpp")
+    image_path = os.path.join(build_dir, "output.bmp")
+    with open(source_file, "w") as f:
+        f.write(source_code)
+    if os.path.exists(image_path):
+        os.remove(image_path)
+
+    for _, command, cwd, env in build_stages(source_file, build_dir, headless=True):
+        process = subprocess.Popen(
+            command, cwd=cwd, env=env,
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        try:
+            returncode = process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            process.wait()
+            return None
+        if returncode != 0:
+            return None
+
+    try:
+        with open(image_path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
@@ -6,14 +6,17 @@
 #include <math.h>
 
 // Cursor structure definition
-typedef struct {
-    double x;            // X position
-    double y;            // Y position
-    double angle;        // Angle of direction in degrees
-    int thickness;       // Line thickness
-    SDL_Color color;     // Color of the cursor
-    bool visible;        // Whether the cursor is visible
-    bool active;         // Whether the cursor is active
+typedef struct Cursor {
+    double x;                 // X position
+    double y;                 // Y position
+    double angle;             // Angle of direction in degrees
+    double dir_x;             // Unit heading vector, kept in sync with angle
+    double dir_y;
+    int thickness;            // Line thickness
+    SDL_Color color;          // Color of the cursor
+    bool visible;             // Whether the cursor is visible
+    bool active;              // Whether the cursor is active
+    struct Cursor* next_free; // Next released cursor in the pool's free list
 } Cursor;
 
 // Cursor management functions
@@ -22,10 +25,22 @@ typedef struct {
  *
  * @param x The initial x coordinate
  * @param y The initial y coordinate
- * @return Pointer to the created cursor, or NULL if no cursors available
+ * @return Pointer to the created cursor, or NULL if memory is exhausted
  */
 Cursor* create_cursor(double x, double y);
 
+/**
+ * @brief Releases a cursor back to the pool
+ *
+ * @param cursor The cursor to release; it must not be used afterwards
+ */
+void destroy_cursor(Cursor* cursor);
+
+/**
+ * @brief Frees every cursor of the pool
+ */
+void free_cursor_pool(void);
+
 /**
  * @brief Moves a cursor in its current direction
  *
@@ -0,0 +1,81 @@
+#ifndef DRAWPP_DISPLAY_LIST_H
+#define DRAWPP_DISPLAY_LIST_H
+
+#include <SDL2/SDL.h>
+#include <stdbool.h>
+
+// Kinds of primitives that can be recorded
+typedef enum {
+    CMD_LINE,
+    CMD_RECTANGLE,
+    CMD_CIRCLE,
+    CMD_TRIANGLE,
+    CMD_ELLIPSE
+} DrawCommandType;
+
+// Recorded draw command
+typedef struct {
+    DrawCommandType type; // Kind of primitive
+    int params[6];        // Shape parameters, in the order of the matching draw_* function
+    bool filled;          // Whether the shape is filled
+    SDL_Color color;      // Color of the shape
+    int thickness;        // Line thickness
+    int line_counter;     // Statement counter that recorded it, for the line profiler; -1 if none
+} DrawCommand;
+
+// Culling statistics
+typedef struct {
+    long recorded;          // Commands recorded since start-up
+    long drawn;             // Commands actually rasterized
+    long culled_offscreen;  // Commands dropped because they are outside the canvas
+    long culled_occluded;   // Commands dropped because a later opaque fill covers them
+} DrawStatistics;
+
+/**
+ * @brief Records a line (see draw_line)
+ */
+void record_line(int x1, int y1, int x2, int y2, SDL_Color color, int thickness);
+
+/**
+ * @brief Records a rectangle (see draw_rectangle)
+ */
+void record_rectangle(int x, int y, int width, int height, bool filled, SDL_Color color, int thickness);
+
+/**
+ * @brief Records a circle (see draw_circle)
+ */
+void record_circle(int centerX, int centerY, int radius, bool filled, SDL_Color color, int thickness);
+
+/**
+ * @brief Records a triangle (see draw_triangle)
+ */
+void record_triangle(int x1, int y1, int x2, int y2, int x3, int y3, bool filled, SDL_Color color, int thickness);
+
+/**
+ * @brief Records an ellipse (see draw_ellipse)
+ */
+void record_ellipse(int centerX, int centerY, int radiusX, int radiusY, bool filled, SDL_Color color, int thickness);
+
+/**
+ * @brief Culls and rasterizes every recorded command, then empties the list
+ *
+ * Commands whose bounding box lies outside the canvas, or that are fully
+ * covered by a later opaque filled rectangle, are dropped. The result is
+ * published on the frame channel when one is attached.
+ */
+void flush_draw_commands(void);
+
+/**
+ * @brief Returns the culling statistics gathered so far
+ *
+ * @return A copy of the current statistics
+ */
+DrawStatistics get_draw_statistics(void);
+
+/**
+ * @brief Prints the culling statistics when profiling, then releases the
+ * command list and resets the statistics
+ */
+void report_draw_statistics(void);
+
+#endif /* DRAWPP_DISPLAY_LIST_H */
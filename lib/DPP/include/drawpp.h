@@ -10,23 +10,50 @@
 #include "cursor.h"
 #include "shapes.h"
 #include "colors.h"
+#include "display_list.h"
+#include "stamp_cache.h"
+#include "frame_channel.h"
+#include "profiler.h"
 
 // Constants
 #define WINDOW_WIDTH 800
 #define WINDOW_HEIGHT 600
 #define PI 3.14159265358979323846
-#define MAX_CURSORS 10
+#define CURSOR_POOL_CHUNK 256
 
 // SDL Window and Renderer
 extern SDL_Window* window;
 extern SDL_Renderer* renderer;
 
-// Global cursor array
-extern Cursor cursors[MAX_CURSORS];
+// Number of cursors currently alive in the cursor pool
 extern int active_cursors;
 
 // SDL initialization and cleanup
 bool initialize_SDL(void);
 void cleanup_SDL(void);
 
+/**
+ * @brief Initializes drawing without a window, into an offscreen RGBA frame
+ *
+ * Uses a software renderer on a WINDOW_WIDTH x WINDOW_HEIGHT surface, so no
+ * video driver is needed. For hosts loading libdrawpp as a shared library;
+ * released by cleanup_SDL.
+ *
+ * @return true on success
+ */
+bool initialize_headless(void);
+
+/**
+ * @brief Gives access to the pixels of the offscreen frame
+ *
+ * Rasterizes the recorded draw commands and completes the pending draw
+ * operations first. The pixels are RGBA bytes, valid until cleanup_SDL.
+ *
+ * @param width Receives the width in pixels
+ * @param height Receives the height in pixels
+ * @param pitch Receives the number of bytes per row
+ * @return The pixels, or NULL if initialize_headless was not called
+ */
+Uint8* get_frame_pixels(int* width, int* height, int* pitch);
+
 #endif /* DRAWPP_H */
\ No newline at end of file
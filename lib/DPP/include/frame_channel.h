@@ -0,0 +1,57 @@
+#ifndef DRAWPP_FRAME_CHANNEL_H
+#define DRAWPP_FRAME_CHANNEL_H
+
+#include <stdbool.h>
+#include <stdint.h>
+
+// Environment variables read by the frame channel
+#define FRAME_CHANNEL_ENV "DRAWPP_FRAME_CHANNEL"
+#define FRAME_INTERVAL_ENV "DRAWPP_FRAME_INTERVAL_MS"
+
+#define FRAME_CHANNEL_MAGIC "DPPF"
+#define FRAME_CHANNEL_VERSION 1
+#define FRAME_INTERVAL_DEFAULT_MS 50
+
+// Layout of the start of the shared memory segment; the pixels follow it.
+// The segment is created by the reader, which fills magic, version and capacity.
+typedef struct {
+    char magic[4];          // FRAME_CHANNEL_MAGIC
+    uint32_t version;       // FRAME_CHANNEL_VERSION
+    uint32_t capacity;      // Size in bytes of the pixel area
+    uint32_t width;         // Frame width in pixels
+    uint32_t height;        // Frame height in pixels
+    uint32_t stride;        // Bytes per row
+    uint32_t reserved[2];
+    uint64_t sequence;      // Odd while a frame is being written, even otherwise
+    uint64_t frame_counter; // Number of frames published so far
+    uint8_t padding[16];    // Pads the header to 64 bytes
+} FrameChannelHeader;
+
+/**
+ * @brief Attaches to the shared memory segment named by DRAWPP_FRAME_CHANNEL, if set
+ *
+ * @return true if frames will be published
+ */
+bool open_frame_channel(void);
+
+/**
+ * @brief Copies the current content of the renderer into the channel as RGBA pixels
+ */
+void publish_frame(void);
+
+/**
+ * @brief Checks whether a channel is attached and the frame interval has elapsed since the last frame
+ */
+bool frame_channel_due(void);
+
+/**
+ * @brief Checks whether a frame channel is attached
+ */
+bool frame_channel_active(void);
+
+/**
+ * @brief Detaches from the shared memory segment
+ */
+void close_frame_channel(void);
+
+#endif /* DRAWPP_FRAME_CHANNEL_H */
@@ -0,0 +1,125 @@
+#ifndef DRAWPP_PROFILER_H
+#define DRAWPP_PROFILER_H
+
+#include <stdbool.h>
+#include <stdint.h>
+#include "display_list.h"
+
+// Environment variables read by the profiler
+#define PROFILE_ENV "DRAWPP_PROFILE"
+#define PROFILE_OUTPUT_ENV "DRAWPP_PROFILE_OUTPUT"
+#define PROFILE_DEFAULT_OUTPUT "drawpp_profile.json"
+
+// Public functions measured by the profiler
+typedef enum {
+    PROFILE_DRAW_LINE,
+    PROFILE_DRAW_RECTANGLE,
+    PROFILE_DRAW_CIRCLE,
+    PROFILE_DRAW_TRIANGLE,
+    PROFILE_DRAW_ELLIPSE,
+    PROFILE_MOVE,
+    PROFILE_ROTATE,
+    PROFILE_SET_COLOR,
+    PROFILE_FUNCTION_COUNT
+} ProfiledFunction;
+
+// Figures gathered for one function
+typedef struct {
+    uint64_t calls;      // Calls to the public function
+    uint64_t call_ns;    // Time spent in the public function
+    uint64_t rendered;   // Commands of this kind rasterized at flush time
+    uint64_t render_ns;  // Time spent rasterizing them
+    double pixels;       // Estimated pixels touched by the rasterized commands
+} ProfileEntry;
+
+// Figures gathered for one statement of a line-profiled program
+typedef struct {
+    int line;           // Source line of the statement
+    uint64_t count;     // Times the statement ran
+    uint64_t total_ns;  // Time spent in the statement, nested statements included
+    uint64_t self_ns;   // Time spent in the statement itself
+} LineProfileEntry;
+
+// Deepest statement nesting timed by the line profiler
+#define LINE_PROFILE_MAX_DEPTH 256
+
+// Set once by open_profiler; every measurement is behind this flag
+extern bool profiling_enabled;
+
+// Runs call, timing it as function when profiling is enabled: a single branch otherwise
+#define PROFILED(function, call)                                   \
+    do {                                                           \
+        if (__builtin_expect(profiling_enabled, 0)) {              \
+            uint64_t profile_start_ = profile_now_ns();            \
+            call;                                                  \
+            profile_record((function), profile_start_);            \
+        } else {                                                   \
+            call;                                                  \
+        }                                                          \
+    } while (0)
+
+/**
+ * @brief Enables the profiler if DRAWPP_PROFILE is set to a non-zero value
+ *
+ * @return true if profiling is enabled
+ */
+bool open_profiler(void);
+
+/**
+ * @brief Returns a monotonic timestamp in nanoseconds
+ */
+uint64_t profile_now_ns(void);
+
+/**
+ * @brief Counts one call of a public function that started at start_ns
+ */
+void profile_record(ProfiledFunction function, uint64_t start_ns);
+
+/**
+ * @brief Counts the rasterization of a command that started at start_ns
+ *
+ * In a line-profiled program, the time is charged to the statement that
+ * recorded the command, and to the total of the statements enclosing it,
+ * rather than to the statements running the flush.
+ */
+void profile_record_render(const DrawCommand* cmd, uint64_t start_ns);
+
+/**
+ * @brief Returns a copy of the figures of one function
+ */
+ProfileEntry get_profile_entry(ProfiledFunction function);
+
+/**
+ * @brief Enables the profiler and the per-statement counters of a line-profiled program
+ *
+ * Called by programs compiled with --line-profile, right after initialize_SDL.
+ *
+ * @param lines Source line of each statement counter
+ * @param parents Counter of the statement enclosing each counter, -1 at the top level
+ * @param count Number of counters
+ */
+void line_profile_init(const int* lines, const int* parents, int count);
+
+/**
+ * @brief Starts timing one run of the statement behind counter
+ */
+void line_profile_enter(int counter);
+
+/**
+ * @brief Stops timing the statement behind counter, the innermost one entered
+ */
+void line_profile_exit(int counter);
+
+/**
+ * @brief Returns the counter of the innermost statement being run, or -1 outside statements
+ */
+int line_profile_current(void);
+
+/**
+ * @brief Writes the JSON report to DRAWPP_PROFILE_OUTPUT (default drawpp_profile.json)
+ *
+ * Does nothing when profiling is disabled.
+ */
+void write_profile_report(void);
+
+#endif /* DRAWPP_PROFILER_H */
@@ -0,0 +1,55 @@
+#ifndef DRAWPP_STAMP_CACHE_H
+#define DRAWPP_STAMP_CACHE_H
+
+#include <SDL2/SDL.h>
+#include <stdbool.h>
+#include "display_list.h"
+
+// Memory budget of the cached textures, in bytes
+#define STAMP_CACHE_BYTES (16 * 1024 * 1024)
+// Maximum number of shapes tracked by the cache
+#define STAMP_MAX_ENTRIES 1024
+// Shapes larger than this (in pixels, on either axis) are never cached
+#define STAMP_MAX_SIDE 512
+
+// Stamp cache statistics
+typedef struct {
+    long hits;       // Shapes copied from a cached texture
+    long misses;     // Shapes rasterized directly
+    long created;    // Textures rasterized into the cache
+    long evictions;  // Textures released to stay within the budget
+    long bytes;      // Texture memory currently held
+} StampCacheStatistics;
+
+/**
+ * @brief Draws a circle, ellipse or triangle command through the stamp cache
+ *
+ * The first time a shape (type, dimensions, thickness, fill, color) is seen
+ * it is rasterized directly; the second time it is rasterized once into a
+ * texture which is then copied for every later occurrence.
+ *
+ * @param cmd The command to draw
+ * @return true if the command was drawn, false if the caller must rasterize it
+ */
+bool draw_stamped(const DrawCommand* cmd);
+
+/**
+ * @brief Enables or disables the stamp cache
+ *
+ * @param enabled Whether stamps should be used
+ */
+void set_stamp_cache_enabled(bool enabled);
+
+/**
+ * @brief Returns the stamp cache statistics
+ *
+ * @return A copy of the current statistics
+ */
+StampCacheStatistics get_stamp_cache_statistics(void);
+
+/**
+ * @brief Releases every cached texture (must run before the renderer is destroyed)
+ */
+void clear_stamp_cache(void);
+
+#endif /* DRAWPP_STAMP_CACHE_H */
@@ -2,45 +2,136 @@
 #include "../include/drawpp.h"
 #include "../include/shapes.h"
 #include "../include/colors.h"
+#include "../include/display_list.h"
+#include "../include/profiler.h"
 #include <math.h>
 #include <stdio.h>
+#include <stdlib.h>
 
 // Global variables
 SDL_Window* window = NULL; ///< The SDL window used for rendering.
 SDL_Renderer* renderer = NULL; ///< The SDL renderer used for drawing.
-Cursor cursors[MAX_CURSORS]; ///< Array of cursors available in the application.
 int active_cursors = 0; ///< Number of currently active cursors.
 
+// Cursor pool: cursors live in fixed-size chunks so their addresses never move
+static Cursor** cursor_chunks = NULL; ///< Allocated chunks of CURSOR_POOL_CHUNK cursors.
+static int chunk_count = 0;           ///< Number of allocated chunks.
+static int chunk_capacity = 0;        ///< Size of the chunk pointer array.
+static int last_chunk_used = CURSOR_POOL_CHUNK; ///< Slots handed out from the last chunk.
+static Cursor* free_cursors = NULL;   ///< Released cursors available for reuse.
+
+/**
+ * @brief Takes an unused cursor slot from the pool, growing it if needed.
+ *
+ * @return A pointer to the slot, or NULL if memory is exhausted.
+ */
+static Cursor* allocate_cursor(void) {
+    if (free_cursors) {
+        Cursor* cursor = free_cursors;
+        free_cursors = cursor->next_free;
+        return cursor;
+    }
+
+    if (last_chunk_used == CURSOR_POOL_CHUNK) {
+        if (chunk_count == chunk_capacity) {
+            int new_capacity = chunk_capacity ? chunk_capacity * 2 : 16;
+            Cursor** grown = realloc(cursor_chunks, new_capacity * sizeof(Cursor*));
+            if (!grown) return NULL;
+            cursor_chunks = grown;
+            chunk_capacity = new_capacity;
+        }
+        Cursor* chunk = malloc(CURSOR_POOL_CHUNK * sizeof(Cursor));
+        if (!chunk) return NULL;
+        cursor_chunks[chunk_count++] = chunk;
+        last_chunk_used = 0;
+    }
+
+    return &cursor_chunks[chunk_count - 1][last_chunk_used++];
+}
+
+/**
+ * @brief Recomputes the unit heading vector from the cursor's angle.
+ *
+ * The components are the cos and sin the drawing functions used to compute
+ * on every call, bit for bit, so positions truncate to the same pixels.
+ *
+ * @param cursor A pointer to the cursor to update.
+ */
+static void update_heading(Cursor* cursor) {
+    double radians = cursor->angle * PI / 180.0;
+    cursor->dir_x = cos(radians);
+    cursor->dir_y = sin(radians);
+}
+
 /**
  * @brief Creates a new cursor at the specified position.
  *
  * @param x The initial x-coordinate of the cursor.
  * @param y The initial y-coordinate of the cursor.
- * @return A pointer to the newly created cursor, or NULL if the maximum number of cursors is reached.
+ * @return A pointer to the newly created cursor, or NULL if memory is exhausted.
  */
 Cursor* create_cursor(double x, double y) {
-    if (active_cursors >= MAX_CURSORS) {
-        printf("Error: Maximum number of cursors reached\n");
+    Cursor* cursor = allocate_cursor();
+    if (!cursor) {
+        printf("Error: Unable to allocate a new cursor\n");
         return NULL;
     }
 
-    int index = 0;
-    while (index < MAX_CURSORS && cursors[index].active) {
-        index++;
-    }
-
-    cursors[index] = (Cursor){
+    *cursor = (Cursor){
         .x = x,
         .y = y,
         .angle = 0.0,
+        .dir_x = 1.0,
+        .dir_y = 0.0,
         .thickness = 1,
         .color = blue, ///< Default color
         .visible = true,
-        .active = true
+        .active = true,
+        .next_free = NULL
     };
 
     active_cursors++;
-    return &cursors[index];
+    return cursor;
+}
+
+/**
+ * @brief Releases a cursor so its slot can be reused by create_cursor.
+ *
+ * @param cursor A pointer to the cursor to release.
+ */
+void destroy_cursor(Cursor* cursor) {
+    if (!cursor || !cursor->active) return;
+
+    cursor->active = false;
+    cursor->next_free = free_cursors;
+    free_cursors = cursor;
+    active_cursors--;
+}
+
+/**
+ * @brief Frees every chunk of the cursor pool, invalidating all cursors.
+ */
+void free_cursor_pool(void) {
+    for (int i = 0; i < chunk_count; i++) {
+        free(cursor_chunks[i]);
+    }
+    free(cursor_chunks);
+    cursor_chunks = NULL;
+    chunk_count = 0;
+    chunk_capacity = 0;
+    last_chunk_used = CURSOR_POOL_CHUNK;
+    free_cursors = NULL;
+    active_cursors = 0;
+}
+
+/**
+ * @brief Body of move_cursor.
+ */
+static void move_cursor_impl(Cursor* cursor, double distance) {
+    if (!cursor || !cursor->active) return;
+
+    cursor->x += distance * cursor->dir_x;
+    cursor->y += distance * cursor->dir_y;
 }
 
 /**
@@ -50,20 +141,13 @@ Cursor* create_cursor(double x, double y) {
  * @param distance The distance to move the cursor.
  */
 void move_cursor(Cursor* cursor, double distance) {
-    if (!cursor || !cursor->active) return;
-
-    double radians = cursor->angle * PI / 180.0;
-    cursor->x += distance * cos(radians);
-    cursor->y += distance * sin(radians);
+    PROFILED(PROFILE_MOVE, move_cursor_impl(cursor, distance));
 }
 
 /**
- * @brief Rotates the cursor by a specified angle.
- *
- * @param cursor A pointer to the cursor to rotate.
- * @param angle The angle to rotate the cursor, in degrees.
+ * @brief Body of rotate_cursor.
  */
-void rotate_cursor(Cursor* cursor, double angle) {
+static void rotate_cursor_impl(Cursor* cursor, double angle) {
     if (!cursor || !cursor->active) return;
 
     cursor->angle += angle;
@@ -74,6 +158,26 @@ void rotate_cursor(Cursor* cursor, double angle) {
     while (cursor->angle < 0.0) {
         cursor->angle += 360.0;
     }
+
+    update_heading(cursor);
+}
+
+/**
+ * @brief Rotates the cursor by a specified angle.
+ *
+ * @param cursor A pointer to the cursor to rotate.
+ * @param angle The angle to rotate the cursor, in degrees.
+ */
+void rotate_cursor(Cursor* cursor, double angle) {
+    PROFILED(PROFILE_ROTATE, rotate_cursor_impl(cursor, angle));
+}
+
+/**
+ * @brief Body of set_cursor_color.
+ */
+static void set_cursor_color_impl(Cursor* cursor, SDL_Color color) {
+    if (!cursor || !cursor->active) return;
+    cursor->color = color;
 }
 
 /**
@@ -83,8 +187,7 @@ void rotate_cursor(Cursor* cursor, double angle) {
  * @param color The new color to set for the cursor.
  */
 void set_cursor_color(Cursor* cursor, SDL_Color color) {
-    if (!cursor || !cursor->active) return;
-    cursor->color = color;
+    PROFILED(PROFILE_SET_COLOR, set_cursor_color_impl(cursor, color));
 }
 
 /**
@@ -103,7 +206,7 @@ void set_cursor_visibility(Cursor* cursor, bool visible) {
         int cursorY = (int)cursor->y;
 
         SDL_Color cursorColor = {0, 0, 0, 255}; // black
-        draw_rectangle(cursorX - 5, cursorY - 5, 10, 10, true, cursorColor, 1);
+        record_rectangle(cursorX - 5, cursorY - 5, 10, 10, true, cursorColor, 1);
     } else {
         clear_area((int)cursor->x - 5, (int)cursor->y - 5, 10, 10);
     }
@@ -148,12 +251,19 @@ void clear_area(int x, int y, int width, int height) {
         return;
     }
 
-    Uint8 r, g, b, a;
-    SDL_GetRenderDrawColor(renderer, &r, &g, &b, &a);
-    SDL_SetRenderDrawColor(renderer, 255, 255, 255, 255);
-    SDL_Rect clearRect = {x, y, width, height};
-    SDL_RenderFillRect(renderer, &clearRect);
-    SDL_SetRenderDrawColor(renderer, r, g, b, a);
+    record_rectangle(x, y, width, height, true, white, 1);
+}
+
+/**
+ * @brief Body of cursor_draw_line.
+ */
+static void cursor_draw_line_impl(Cursor* cursor, double length) {
+    if (!cursor || !cursor->active) return;
+
+    int endX = (int)(cursor->x + length * cursor->dir_x);
+    int endY = (int)(cursor->y + length * cursor->dir_y);
+
+    record_line((int)cursor->x, (int)cursor->y, endX, endY, cursor->color, cursor->thickness);
 }
 
 /**
@@ -163,13 +273,15 @@ void clear_area(int x, int y, int width, int height) {
  * @param length The length of the line to draw.
  */
 void cursor_draw_line(Cursor* cursor, double length) {
-    if (!cursor || !cursor->active) return;
-
-    double radians = cursor->angle * PI / 180.0;
-    int endX = (int)(cursor->x + length * cos(radians));
-    int endY = (int)(cursor->y + length * sin(radians));
+    PROFILED(PROFILE_DRAW_LINE, cursor_draw_line_impl(cursor, length));
+}
 
-    draw_line((int)cursor->x, (int)cursor->y, endX, endY, cursor->color, cursor->thickness);
+/**
+ * @brief Body of cursor_draw_rectangle.
+ */
+static void cursor_draw_rectangle_impl(Cursor* cursor, double width, double height, bool filled) {
+    if (!cursor || !cursor->active) return;
+    record_rectangle((int)cursor->x, (int)cursor->y, (int)width, (int)height, filled, cursor->color, cursor->thickness);
 }
 
 /**
@@ -181,9 +293,16 @@ void cursor_draw_line(Cursor* cursor, double length) {
  * @param filled A boolean indicating whether the rectangle should be filled.
  */
 void cursor_draw_rectangle(Cursor* cursor, double width, double height, bool filled) {
+    PROFILED(PROFILE_DRAW_RECTANGLE, cursor_draw_rectangle_impl(cursor, width, height, filled));
+}
+/**
+ * @brief Body of cursor_draw_circle.
+ */
+static void cursor_draw_circle_impl(Cursor* cursor, double radius, bool filled) {
     if (!cursor || !cursor->active) return;
-    draw_rectangle((int)cursor->x, (int)cursor->y, (int)width, (int)height, filled, cursor->color, cursor->thickness);
+    record_circle((int)cursor->x, (int)cursor->y, (int)radius, filled, cursor->color, cursor->thickness);
 }
+
 /**
  * @brief Draws a circle centered at the cursor's position.
  *
@@ -192,35 +311,48 @@ void cursor_draw_rectangle(Cursor* cursor, double width, double height, bool fil
  * @param filled A boolean indicating whether the circle should be filled.
  */
 void cursor_draw_circle(Cursor* cursor, double radius, bool filled) {
-    if (!cursor || !cursor->active) return;
-    draw_circle((int)cursor->x, (int)cursor->y, (int)radius, filled, cursor->color, cursor->thickness);
+    PROFILED(PROFILE_DRAW_CIRCLE, cursor_draw_circle_impl(cursor, radius, filled));
 }
 
 
 /**
- * @brief Draws a triangle based on the cursor's position and direction.
- *
- * @param cursor A pointer to the cursor to use for drawing.
- * @param base The base length of the triangle.
- * @param height The height of the triangle.
- * @param filled A boolean indicating whether the triangle should be filled.
+ * @brief Body of cursor_draw_triangle.
  */
-void cursor_draw_triangle(Cursor* cursor, double base, double height, bool filled) {
+static void cursor_draw_triangle_impl(Cursor* cursor, double base, double height, bool filled) {
     if (!cursor || !cursor->active) return;
 
-    double radians = cursor->angle * PI / 180.0;
-
     int x1 = (int)cursor->x;
     int y1 = (int)cursor->y;
 
-    int x2 = (int)(x1 + base * cos(radians));
-    int y2 = (int)(y1 + base * sin(radians));
+    int x2 = (int)(x1 + base * cursor->dir_x);
+    int y2 = (int)(y1 + base * cursor->dir_y);
 
-    double perpRadians = radians + PI / 2.0;
+    // (-dir_y, dir_x) would round differently, moving the apex by a pixel
+    double perpRadians = cursor->angle * PI / 180.0 + PI / 2.0;
     int x3 = (int)(x1 + height * cos(perpRadians));
     int y3 = (int)(y1 + height * sin(perpRadians));
 
-    draw_triangle(x1, y1, x2, y2, x3, y3, filled, cursor->color, cursor->thickness);
+    record_triangle(x1, y1, x2, y2, x3, y3, filled, cursor->color, cursor->thickness);
+}
+
+/**
+ * @brief Draws a triangle based on the cursor's position and direction.
+ *
+ * @param cursor A pointer to the cursor to use for drawing.
+ * @param base The base length of the triangle.
+ * @param height The height of the triangle.
+ * @param filled A boolean indicating whether the triangle should be filled.
+ */
+void cursor_draw_triangle(Cursor* cursor, double base, double height, bool filled) {
+    PROFILED(PROFILE_DRAW_TRIANGLE, cursor_draw_triangle_impl(cursor, base, height, filled));
+}
+
+/**
+ * @brief Body of cursor_draw_ellipse.
+ */
+static void cursor_draw_ellipse_impl(Cursor* cursor, double radiusX, double radiusY, bool filled) {
+    if (!cursor || !cursor->active) return;
+    record_ellipse((int)cursor->x, (int)cursor->y, (int)radiusX, (int)radiusY, filled, cursor->color, cursor->thickness);
 }
 
 /**
@@ -232,6 +364,5 @@ void cursor_draw_triangle(Cursor* cursor, double base, double height, bool fille
  * @param filled A boolean indicating whether the ellipse should be filled.
  */
 void cursor_draw_ellipse(Cursor* cursor, double radiusX, double radiusY, bool filled) {
-    if (!cursor || !cursor->active) return;
-    draw_ellipse((int)cursor->x, (int)cursor->y, (int)radiusX, (int)radiusY, filled, cursor->color, cursor->thickness);
+    PROFILED(PROFILE_DRAW_ELLIPSE, cursor_draw_ellipse_impl(cursor, radiusX, radiusY, filled));
 }
\ No newline at end of file
@@ -0,0 +1,300 @@
+#include "../include/display_list.h"
+#include "../include/drawpp.h"
+#include "../include/shapes.h"
+#include "../include/stamp_cache.h"
+#include "../include/frame_channel.h"
+#include "../include/profiler.h"
+#include <stdlib.h>
+#include <string.h>
+#include <stdio.h>
+
+// Size in pixels of a coverage grid cell
+#define COVER_CELL 16
+#define COVER_COLS ((WINDOW_WIDTH + COVER_CELL - 1) / COVER_CELL)
+#define COVER_ROWS ((WINDOW_HEIGHT + COVER_CELL - 1) / COVER_CELL)
+
+// Number of commands after which the list is flushed, bounding its memory
+#define MAX_PENDING_COMMANDS 65536
+
+static DrawCommand* commands = NULL; ///< Commands recorded since the last flush.
+static int command_count = 0;        ///< Number of recorded commands.
+static int command_capacity = 0;     ///< Allocated size of the command list.
+static DrawStatistics stats = {0};   ///< Culling statistics.
+
+/**
+ * @brief Appends a command to the list, growing it if needed.
+ *
+ * The list is flushed once it holds MAX_PENDING_COMMANDS commands, or when
+ * it cannot grow, so a long scene neither exhausts memory nor loses drawings.
+ *
+ * @param cmd The command to append.
+ */
+static void push_command(DrawCommand cmd) {
+    if (command_count == MAX_PENDING_COMMANDS) flush_draw_commands();
+    if (command_count == command_capacity) {
+        int new_capacity = command_capacity ? command_capacity * 2 : 256;
+        DrawCommand* grown = realloc(commands, new_capacity * sizeof(DrawCommand));
+        if (grown) {
+            commands = grown;
+            command_capacity = new_capacity;
+        } else {
+            flush_draw_commands();
+            if (command_count == command_capacity) {
+                printf("Error: Out of memory while recording draw commands\n");
+                return;
+            }
+        }
+    }
+    cmd.line_counter = __builtin_expect(profiling_enabled, 0) ? line_profile_current() : -1;
+    commands[command_count++] = cmd;
+    stats.recorded++;
+
+    // Long scenes are shown progressively when the IDE listens on a frame channel
+    if ((command_count & 255) == 0 && frame_channel_due()) flush_draw_commands();
+}
+
+void record_line(int x1, int y1, int x2, int y2, SDL_Color color, int thickness) {
+    push_command((DrawCommand){
+        .type = CMD_LINE, .params = {x1, y1, x2, y2}, .color = color, .thickness = thickness
+    });
+}
+
+void record_rectangle(int x, int y, int width, int height, bool filled, SDL_Color color, int thickness) {
+    push_command((DrawCommand){
+        .type = CMD_RECTANGLE, .params = {x, y, width, height}, .filled = filled, .color = color, .thickness = thickness
+    });
+}
+
+void record_circle(int centerX, int centerY, int radius, bool filled, SDL_Color color, int thickness) {
+    push_command((DrawCommand){
+        .type = CMD_CIRCLE, .params = {centerX, centerY, radius}, .filled = filled, .color = color, .thickness = thickness
+    });
+}
+
+void record_triangle(int x1, int y1, int x2, int y2, int x3, int y3, bool filled, SDL_Color color, int thickness) {
+    push_command((DrawCommand){
+        .type = CMD_TRIANGLE, .params = {x1, y1, x2, y2, x3, y3}, .filled = filled, .color = color, .thickness = thickness
+    });
+}
+
+void record_ellipse(int centerX, int centerY, int radiusX, int radiusY, bool filled, SDL_Color color, int thickness) {
+    push_command((DrawCommand){
+        .type = CMD_ELLIPSE, .params = {centerX, centerY, radiusX, radiusY}, .filled = filled, .color = color, .thickness = thickness
+    });
+}
+
+/**
+ * @brief Computes a conservative bounding box of the pixels a command touches.
+ *
+ * @param cmd The command to measure.
+ * @param x0 Receives the left edge (inclusive).
+ * @param y0 Receives the top edge (inclusive).
+ * @param x1 Receives the right edge (inclusive).
+ * @param y1 Receives the bottom edge (inclusive).
+ */
+static void command_bounds(const DrawCommand* cmd, int* x0, int* y0, int* x1, int* y1) {
+    const int* p = cmd->params;
+    int t = cmd->thickness > 0 ? cmd->thickness : 1;
+
+    switch (cmd->type) {
+    case CMD_LINE:
+        *x0 = p[0] < p[2] ? p[0] : p[2];
+        *x1 = p[0] < p[2] ? p[2] : p[0];
+        *y0 = (p[1] < p[3] ? p[1] : p[3]) - t / 2;
+        *y1 = (p[1] < p[3] ? p[3] : p[1]) + t / 2;
+        break;
+    case CMD_RECTANGLE: {
+        int grow = cmd->filled ? 0 : t;
+        *x0 = (p[2] < 0 ? p[0] + p[2] : p[0]) - grow;
+        *x1 = (p[2] < 0 ? p[0] : p[0] + p[2]) + grow;
+        *y0 = (p[3] < 0 ? p[1] + p[3] : p[1]) - grow;
+        *y1 = (p[3] < 0 ? p[1] : p[1] + p[3]) + grow;
+        break;
+    }
+    case CMD_CIRCLE: {
+        int r = abs(p[2]) + (cmd->filled ? 0 : t);
+        *x0 = p[0] - r;
+        *x1 = p[0] + r;
+        *y0 = p[1] - r;
+        *y1 = p[1] + r;
+        break;
+    }
+    case CMD_TRIANGLE: {
+        int grow = cmd->filled ? 0 : t / 2;
+        *x0 = p[0] < p[2] ? p[0] : p[2];
+        *x0 = *x0 < p[4] ? *x0 : p[4];
+        *x1 = p[0] > p[2] ? p[0] : p[2];
+        *x1 = *x1 > p[4] ? *x1 : p[4];
+        *y0 = p[1] < p[3] ? p[1] : p[3];
+        *y0 = (*y0 < p[5] ? *y0 : p[5]) - grow;
+        *y1 = p[1] > p[3] ? p[1] : p[3];
+        *y1 = (*y1 > p[5] ? *y1 : p[5]) + grow;
+        break;
+    }
+    case CMD_ELLIPSE: {
+        int grow = cmd->filled ? 0 : t;
+        *x0 = p[0] - abs(p[2]) - grow;
+        *x1 = p[0] + abs(p[2]) + grow;
+        *y0 = p[1] - abs(p[3]) - grow;
+        *y1 = p[1] + abs(p[3]) + grow;
+        break;
+    }
+    }
+
+    // One extra pixel absorbs the rounding of the rasterizers
+    *x0 -= 1;
+    *y0 -= 1;
+    *x1 += 1;
+    *y1 += 1;
+}
+
+/**
+ * @brief Checks whether every grid cell touched by a box is already covered.
+ */
+static bool is_covered(bool covered[COVER_ROWS][COVER_COLS], int x0, int y0, int x1, int y1) {
+    for (int row = y0 / COVER_CELL; row <= y1 / COVER_CELL; row++) {
+        for (int col = x0 / COVER_CELL; col <= x1 / COVER_CELL; col++) {
+            if (!covered[row][col]) return false;
+        }
+    }
+    return true;
+}
+
+/**
+ * @brief Marks the grid cells lying entirely inside an opaque filled rectangle.
+ */
+static void mark_covered(bool covered[COVER_ROWS][COVER_COLS], const DrawCommand* cmd) {
+    int rx0 = cmd->params[0];
+    int ry0 = cmd->params[1];
+    int rx1 = rx0 + cmd->params[2]; // exclusive
+    int ry1 = ry0 + cmd->params[3]; // exclusive
+
+    if (rx0 < 0) rx0 = 0;
+    if (ry0 < 0) ry0 = 0;
+    if (rx1 > WINDOW_WIDTH) rx1 = WINDOW_WIDTH;
+    if (ry1 > WINDOW_HEIGHT) ry1 = WINDOW_HEIGHT;
+    if (rx0 >= rx1 || ry0 >= ry1) return;
+
+    for (int row = ry0 / COVER_CELL; row <= (ry1 - 1) / COVER_CELL; row++) {
+        int cell_y0 = row * COVER_CELL;
+        int cell_y1 = cell_y0 + COVER_CELL < WINDOW_HEIGHT ? cell_y0 + COVER_CELL : WINDOW_HEIGHT;
+        if (cell_y0 < ry0 || cell_y1 > ry1) continue;
+
+        for (int col = rx0 / COVER_CELL; col <= (rx1 - 1) / COVER_CELL; col++) {
+            int cell_x0 = col * COVER_CELL;
+            int cell_x1 = cell_x0 + COVER_CELL < WINDOW_WIDTH ? cell_x0 + COVER_CELL : WINDOW_WIDTH;
+            if (cell_x0 < rx0 || cell_x1 > rx1) continue;
+            covered[row][col] = true;
+        }
+    }
+}
+
+/**
+ * @brief Rasterizes a single command, through the stamp cache when possible.
+ */
+static void replay_command(const DrawCommand* cmd) {
+    const int* p = cmd->params;
+
+    if (cmd->type != CMD_LINE && cmd->type != CMD_RECTANGLE && draw_stamped(cmd)) return;
+
+    switch (cmd->type) {
+    case CMD_LINE:
+        draw_line(p[0], p[1], p[2], p[3], cmd->color, cmd->thickness);
+        break;
+    case CMD_RECTANGLE:
+        draw_rectangle(p[0], p[1], p[2], p[3], cmd->filled, cmd->color, cmd->thickness);
+        break;
+    case CMD_CIRCLE:
+        draw_circle(p[0], p[1], p[2], cmd->filled, cmd->color, cmd->thickness);
+        break;
+    case CMD_TRIANGLE:
+        draw_triangle(p[0], p[1], p[2], p[3], p[4], p[5], cmd->filled, cmd->color, cmd->thickness);
+        break;
+    case CMD_ELLIPSE:
+        draw_ellipse(p[0], p[1], p[2], p[3], cmd->filled, cmd->color, cmd->thickness);
+        break;
+    }
+}
+
+/**
+ * @brief Culls and rasterizes every recorded command, then empties the list.
+ *
+ * The list is walked back to front: each opaque filled rectangle marks the
+ * grid cells it fully covers, and any earlier command whose bounding box only
+ * touches covered cells can never be seen and is dropped.
+ */
+void flush_draw_commands(void) {
+    if (command_count == 0) return;
+
+    static bool covered[COVER_ROWS][COVER_COLS];
+    memset(covered, 0, sizeof(covered));
+
+    bool* visible = malloc(command_count * sizeof(bool));
+    if (!visible) {
+        printf("Error: Out of memory while culling draw commands\n");
+        return;
+    }
+
+    for (int i = command_count - 1; i >= 0; i--) {
+        const DrawCommand* cmd = &commands[i];
+        int x0, y0, x1, y1;
+        command_bounds(cmd, &x0, &y0, &x1, &y1);
+
+        if (x1 < 0 || y1 < 0 || x0 >= WINDOW_WIDTH || y0 >= WINDOW_HEIGHT) {
+            visible[i] = false;
+            stats.culled_offscreen++;
+            continue;
+        }
+
+        if (x0 < 0) x0 = 0;
+        if (y0 < 0) y0 = 0;
+        if (x1 >= WINDOW_WIDTH) x1 = WINDOW_WIDTH - 1;
+        if (y1 >= WINDOW_HEIGHT) y1 = WINDOW_HEIGHT - 1;
+
+        if (is_covered(covered, x0, y0, x1, y1)) {
+            visible[i] = false;
+            stats.culled_occluded++;
+            continue;
+        }
+
+        visible[i] = true;
+        if (cmd->type == CMD_RECTANGLE && cmd->filled && cmd->color.a == 255) {
+            mark_covered(covered, cmd);
+        }
+    }
+
+    for (int i = 0; i < command_count; i++) {
+        if (visible[i]) {
+            if (__builtin_expect(profiling_enabled, 0)) {
+                uint64_t start = profile_now_ns();
+                replay_command(&commands[i]);
+                profile_record_render(&commands[i], start);
+            } else {
+                replay_command(&commands[i]);
+            }
+            stats.drawn++;
+        }
+        if ((i & 63) == 63 && frame_channel_due()) publish_frame();
+    }
+
+    free(visible);
+    command_count = 0;
+    publish_frame();
+}
+
+DrawStatistics get_draw_statistics(void) {
+    return stats;
+}
+
+void report_draw_statistics(void) {
+    if (profiling_enabled) {
+        printf("Draw commands: %ld recorded, %ld drawn, %ld culled off-canvas, %ld culled occluded\n",
+               stats.recorded, stats.drawn, stats.culled_offscreen, stats.culled_occluded);
+    }
+
+    free(commands);
+    commands = NULL;
+    command_count = 0;
+    command_capacity = 0;
+    stats = (DrawStatistics){0};
+}
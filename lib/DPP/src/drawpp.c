@@ -1,5 +1,7 @@
 #include "drawpp.h"
 
+static SDL_Surface* frame_surface = NULL; ///< Offscreen frame of initialize_headless, NULL otherwise.
+
 bool initialize_SDL(void) {
     if (SDL_Init(SDL_INIT_VIDEO) != 0) {
         SDL_Log("Unable to initialize SDL: %s", SDL_GetError());
@@ -21,10 +23,53 @@ bool initialize_SDL(void) {
     SDL_SetRenderDrawColor(renderer, 255, 255, 255, 255);
     SDL_RenderClear(renderer);
     SDL_RenderPresent(renderer);
+    open_frame_channel();
+    open_profiler();
     return true;
 }
 
+bool initialize_headless(void) {
+    if (SDL_Init(0) != 0) {
+        SDL_Log("Unable to initialize SDL: %s", SDL_GetError());
+        return false;
+    }
+
+    frame_surface = SDL_CreateRGBSurfaceWithFormat(0, WINDOW_WIDTH, WINDOW_HEIGHT, 32, SDL_PIXELFORMAT_RGBA32);
+    if (!frame_surface) {
+        SDL_Log("Could not create frame surface: %s", SDL_GetError());
+        return false;
+    }
+
+    renderer = SDL_CreateSoftwareRenderer(frame_surface);
+    if (!renderer) {
+        SDL_Log("Could not create renderer: %s", SDL_GetError());
+        SDL_FreeSurface(frame_surface);
+        frame_surface = NULL;
+        return false;
+    }
+
+    SDL_SetRenderDrawColor(renderer, 255, 255, 255, 255);
+    SDL_RenderClear(renderer);
+    open_profiler();
+    return true;
+}
+
+Uint8* get_frame_pixels(int* width, int* height, int* pitch) {
+    if (!frame_surface) return NULL;
+    flush_draw_commands();
+    SDL_RenderFlush(renderer);
+    *width = frame_surface->w;
+    *height = frame_surface->h;
+    *pitch = frame_surface->pitch;
+    return frame_surface->pixels;
+}
+
 void cleanup_SDL(void) {
+    report_draw_statistics();
+    write_profile_report();
+    clear_stamp_cache();
+    free_cursor_pool();
+    close_frame_channel();
     if (renderer) {
         SDL_DestroyRenderer(renderer);
         renderer = NULL;
@@ -33,5 +78,9 @@ void cleanup_SDL(void) {
         SDL_DestroyWindow(window);
         window = NULL;
     }
+    if (frame_surface) {
+        SDL_FreeSurface(frame_surface);
+        frame_surface = NULL;
+    }
     SDL_Quit();
 }
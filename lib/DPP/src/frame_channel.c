@@ -0,0 +1,96 @@
+#include "../include/frame_channel.h"
+#include "../include/drawpp.h"
+#include <fcntl.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+static FrameChannelHeader* channel = NULL; ///< Mapped segment, NULL when no channel is attached.
+static size_t channel_size = 0;             ///< Size of the mapping.
+static Uint32 frame_interval_ms = FRAME_INTERVAL_DEFAULT_MS;
+static Uint32 last_publish_ms = 0;
+
+bool open_frame_channel(void) {
+    const char* name = getenv(FRAME_CHANNEL_ENV);
+    if (!name || !*name) return false;
+
+    // POSIX shared memory names start with a slash
+    char path[256];
+    snprintf(path, sizeof(path), "%s%s", name[0] == '/' ? "" : "/", name);
+
+    int fd = shm_open(path, O_RDWR, 0);
+    if (fd < 0) {
+        printf("Warning: Frame channel '%s' not found\n", path);
+        return false;
+    }
+
+    struct stat info;
+    if (fstat(fd, &info) != 0 || (size_t)info.st_size < sizeof(FrameChannelHeader)) {
+        printf("Warning: Frame channel '%s' is too small\n", path);
+        close(fd);
+        return false;
+    }
+
+    void* mapped = mmap(NULL, info.st_size, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+    close(fd);
+    if (mapped == MAP_FAILED) {
+        printf("Warning: Could not map frame channel '%s'\n", path);
+        return false;
+    }
+
+    FrameChannelHeader* header = mapped;
+    size_t needed = (size_t)WINDOW_WIDTH * WINDOW_HEIGHT * 4;
+    if (memcmp(header->magic, FRAME_CHANNEL_MAGIC, 4) != 0 || header->version != FRAME_CHANNEL_VERSION ||
+        header->capacity < needed || sizeof(FrameChannelHeader) + header->capacity > (size_t)info.st_size) {
+        printf("Warning: Frame channel '%s' has an unexpected layout\n", path);
+        munmap(mapped, info.st_size);
+        return false;
+    }
+
+    const char* interval = getenv(FRAME_INTERVAL_ENV);
+    if (interval && atoi(interval) > 0) frame_interval_ms = (Uint32)atoi(interval);
+
+    channel = header;
+    channel_size = info.st_size;
+    last_publish_ms = SDL_GetTicks();
+    return true;
+}
+
+void publish_frame(void) {
+    if (!channel || !renderer) return;
+
+    int width, height;
+    if (SDL_GetRendererOutputSize(renderer, &width, &height) != 0) return;
+    if (width > WINDOW_WIDTH) width = WINDOW_WIDTH;
+    if (height > WINDOW_HEIGHT) height = WINDOW_HEIGHT;
+
+    // Seqlock: readers discard frames read while the sequence was odd or changed
+    __atomic_add_fetch(&channel->sequence, 1, __ATOMIC_ACQ_REL);
+
+    channel->width = width;
+    channel->height = height;
+    channel->stride = width * 4;
+    SDL_Rect area = {0, 0, width, height};
+    SDL_RenderReadPixels(renderer, &area, SDL_PIXELFORMAT_RGBA32, (Uint8*)(channel + 1), width * 4);
+    channel->frame_counter++;
+
+    __atomic_add_fetch(&channel->sequence, 1, __ATOMIC_ACQ_REL);
+    last_publish_ms = SDL_GetTicks();
+}
+
+bool frame_channel_due(void) {
+    return channel && SDL_GetTicks() - last_publish_ms >= frame_interval_ms;
+}
+
+bool frame_channel_active(void) {
+    return channel != NULL;
+}
+
+void close_frame_channel(void) {
+    if (!channel) return;
+    munmap(channel, channel_size);
+    channel = NULL;
+    channel_size = 0;
+}
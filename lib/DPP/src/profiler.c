@@ -0,0 +1,233 @@
+#include "../include/profiler.h"
+#include "../include/drawpp.h"
+#include <stdlib.h>
+#include <string.h>
+
+bool profiling_enabled = false;
+
+static ProfileEntry entries[PROFILE_FUNCTION_COUNT];
+static uint64_t profile_start_ns = 0; ///< Time the profiler was enabled.
+
+static LineProfileEntry* line_entries = NULL; ///< One per statement counter, NULL unless line-profiled.
+static const int* line_parents = NULL;        ///< Enclosing counter of each counter, -1 at the top level.
+static int line_entry_count = 0;
+
+// A statement being timed, with the time spent in the statements it contains
+typedef struct {
+    int counter;
+    uint64_t start_ns;
+    uint64_t child_ns;
+} LineFrame;
+
+static LineFrame line_stack[LINE_PROFILE_MAX_DEPTH];
+static int line_depth = 0; ///< Statements entered and not exited, may exceed LINE_PROFILE_MAX_DEPTH.
+
+// Names used in the report, in ProfiledFunction order
+static const char* function_names[PROFILE_FUNCTION_COUNT] = {
+    "cursor_draw_line",
+    "cursor_draw_rectangle",
+    "cursor_draw_circle",
+    "cursor_draw_triangle",
+    "cursor_draw_ellipse",
+    "move_cursor",
+    "rotate_cursor",
+    "set_cursor_color"
+};
+
+bool open_profiler(void) {
+    const char* value = getenv(PROFILE_ENV);
+    profiling_enabled = value && *value && strcmp(value, "0") != 0;
+    if (profiling_enabled) {
+        memset(entries, 0, sizeof(entries));
+        profile_start_ns = profile_now_ns();
+    }
+    return profiling_enabled;
+}
+
+uint64_t profile_now_ns(void) {
+    static double ns_per_tick = 0.0;
+    if (ns_per_tick == 0.0) ns_per_tick = 1e9 / (double)SDL_GetPerformanceFrequency();
+    return (uint64_t)((double)SDL_GetPerformanceCounter() * ns_per_tick);
+}
+
+void profile_record(ProfiledFunction function, uint64_t start_ns) {
+    entries[function].calls++;
+    entries[function].call_ns += profile_now_ns() - start_ns;
+}
+
+/**
+ * @brief Estimates the number of pixels a command touches when rasterized.
+ *
+ * Outlines count their length times the thickness; filled shapes their area.
+ *
+ * @param cmd The command to measure.
+ * @return The estimated pixel count.
+ */
+static double estimate_pixels(const DrawCommand* cmd) {
+    const int* p = cmd->params;
+    double t = cmd->thickness > 0 ? cmd->thickness : 1;
+
+    switch (cmd->type) {
+    case CMD_LINE: {
+        double dx = fabs((double)(p[2] - p[0]));
+        double dy = fabs((double)(p[3] - p[1]));
+        return ((dx > dy ? dx : dy) + 1.0) * ((int)t / 2 * 2 + 1);
+    }
+    case CMD_RECTANGLE: {
+        double w = abs(p[2]), h = abs(p[3]);
+        return cmd->filled ? w * h : 2.0 * (w + h) * t;
+    }
+    case CMD_CIRCLE:
+        return cmd->filled ? PI * p[2] * p[2] : 2.0 * PI * p[2] * t;
+    case CMD_TRIANGLE: {
+        if (cmd->filled) {
+            double cross = (double)(p[2] - p[0]) * (p[5] - p[1]) - (double)(p[4] - p[0]) * (p[3] - p[1]);
+            return fabs(cross) / 2.0;
+        }
+        double perimeter = hypot(p[2] - p[0], p[3] - p[1]) + hypot(p[4] - p[2], p[5] - p[3]) +
+                           hypot(p[0] - p[4], p[1] - p[5]);
+        return perimeter * ((int)t / 2 * 2 + 1);
+    }
+    case CMD_ELLIPSE: {
+        double a = abs(p[2]), b = abs(p[3]);
+        if (cmd->filled) return PI * a * b;
+        // Ramanujan's approximation of the perimeter
+        double perimeter = PI * (3.0 * (a + b) - sqrt((3.0 * a + b) * (a + 3.0 * b)));
+        return perimeter * t;
+    }
+    }
+    return 0.0;
+}
+
+void profile_record_render(const DrawCommand* cmd, uint64_t start_ns) {
+    static const ProfiledFunction functions[] = {
+        [CMD_LINE] = PROFILE_DRAW_LINE,
+        [CMD_RECTANGLE] = PROFILE_DRAW_RECTANGLE,
+        [CMD_CIRCLE] = PROFILE_DRAW_CIRCLE,
+        [CMD_TRIANGLE] = PROFILE_DRAW_TRIANGLE,
+        [CMD_ELLIPSE] = PROFILE_DRAW_ELLIPSE
+    };
+    uint64_t elapsed = profile_now_ns() - start_ns;
+    ProfileEntry* entry = &entries[functions[cmd->type]];
+    entry->rendered++;
+    entry->render_ns += elapsed;
+    entry->pixels += estimate_pixels(cmd);
+
+    if (cmd->line_counter < 0 || cmd->line_counter >= line_entry_count) return;
+    line_entries[cmd->line_counter].self_ns += elapsed;
+    // The statements enclosing the recording one contain its rasterization too
+    for (int counter = cmd->line_counter; counter >= 0 && counter < line_entry_count;
+         counter = line_parents[counter]) {
+        line_entries[counter].total_ns += elapsed;
+    }
+    // A flush in the middle of statements is not their own time: pause them meanwhile
+    int open = line_depth < LINE_PROFILE_MAX_DEPTH ? line_depth : LINE_PROFILE_MAX_DEPTH;
+    for (int i = 0; i < open; i++) line_stack[i].start_ns += elapsed;
+}
+
+void line_profile_init(const int* lines, const int* parents, int count) {
+    if (!profiling_enabled) {
+        memset(entries, 0, sizeof(entries));
+        profile_start_ns = profile_now_ns();
+        profiling_enabled = true;
+    }
+
+    free(line_entries);
+    line_entries = calloc(count > 0 ? count : 1, sizeof(LineProfileEntry));
+    if (!line_entries) {
+        printf("Warning: Could not allocate the line profiler\n");
+        line_entry_count = 0;
+        return;
+    }
+    line_parents = parents;
+    line_entry_count = count;
+    line_depth = 0;
+    for (int i = 0; i < count; i++) line_entries[i].line = lines[i];
+}
+
+void line_profile_enter(int counter) {
+    if (line_depth < LINE_PROFILE_MAX_DEPTH) {
+        line_stack[line_depth].counter = counter;
+        line_stack[line_depth].child_ns = 0;
+        line_stack[line_depth].start_ns = profile_now_ns();
+    }
+    line_depth++;
+}
+
+void line_profile_exit(int counter) {
+    uint64_t now = profile_now_ns();
+    line_depth--;
+    if (line_depth < 0) {
+        line_depth = 0;
+        return;
+    }
+    if (counter < 0 || counter >= line_entry_count) return;
+
+    LineProfileEntry* entry = &line_entries[counter];
+    entry->count++;
+    if (line_depth >= LINE_PROFILE_MAX_DEPTH) return;
+
+    const LineFrame* frame = &line_stack[line_depth];
+    uint64_t elapsed = now - frame->start_ns;
+    entry->total_ns += elapsed;
+    entry->self_ns += elapsed > frame->child_ns ? elapsed - frame->child_ns : 0;
+    if (line_depth > 0) {
+        line_stack[line_depth - 1].child_ns += elapsed;
+    }
+}
+
+int line_profile_current(void) {
+    if (line_depth == 0 || !line_entries) return -1;
+    int innermost = line_depth < LINE_PROFILE_MAX_DEPTH ? line_depth : LINE_PROFILE_MAX_DEPTH;
+    return line_stack[innermost - 1].counter;
+}
+
+ProfileEntry get_profile_entry(ProfiledFunction function) {
+    return entries[function];
+}
+
+void write_profile_report(void) {
+    if (!profiling_enabled) return;
+
+    const char* path = getenv(PROFILE_OUTPUT_ENV);
+    if (!path || !*path) path = PROFILE_DEFAULT_OUTPUT;
+
+    FILE* file = fopen(path, "w");
+    if (!file) {
+        printf("Warning: Could not write the profile to '%s'\n", path);
+        return;
+    }
+
+    fprintf(file, "{\n  \"elapsed_ms\": %.3f,\n  \"functions\": {\n",
+            (profile_now_ns() - profile_start_ns) / 1e6);
+    for (int i = 0; i < PROFILE_FUNCTION_COUNT; i++) {
+        const ProfileEntry* entry = &entries[i];
+        fprintf(file, "    \"%s\": {\"calls\": %llu, \"call_ms\": %.3f",
+                function_names[i], (unsigned long long)entry->calls, entry->call_ns / 1e6);
+        if (i <= PROFILE_DRAW_ELLIPSE) {
+            fprintf(file, ", \"rendered\": %llu, \"render_ms\": %.3f, \"pixels\": %.0f",
+                    (unsigned long long)entry->rendered, entry->render_ns / 1e6, entry->pixels);
+        }
+        fprintf(file, "}%s\n", i + 1 < PROFILE_FUNCTION_COUNT ? "," : "");
+    }
+    fprintf(file, "  }");
+
+    // one entry per statement of a line-profiled program
+    if (line_entries) {
+        fprintf(file, ",\n  \"lines\": [\n");
+        for (int i = 0; i < line_entry_count; i++) {
+            const LineProfileEntry* entry = &line_entries[i];
+            fprintf(file, "    {\"line\": %d, \"count\": %llu, \"total_ms\": %.3f, \"self_ms\": %.3f}%s\n",
+                    entry->line, (unsigned long long)entry->count, entry->total_ns / 1e6,
+                    entry->self_ns / 1e6, i + 1 < line_entry_count ? "," : "");
+        }
+        fprintf(file, "  ]");
+        free(line_entries);
+        line_entries = NULL;
+        line_parents = NULL;
+        line_entry_count = 0;
+    }
+    fprintf(file, "\n}\n");
+    fclose(file);
+    printf("Profile written to %s\n", path);
+}
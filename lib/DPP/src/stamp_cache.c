@@ -0,0 +1,295 @@
+#include "../include/stamp_cache.h"
+#include "../include/drawpp.h"
+#include "../include/shapes.h"
+#include <stdlib.h>
+#include <string.h>
+
+#define STAMP_BUCKETS 2048
+
+// Identity of a rasterized shape, independent of its position
+typedef struct {
+    DrawCommandType type;
+    int dims[4];   // Radius, radii or vertex offsets from the first vertex
+    int thickness;
+    bool filled;
+    SDL_Color color;
+} StampKey;
+
+typedef struct StampEntry {
+    StampKey key;
+    SDL_Texture* texture;          // NULL until the shape has been seen twice
+    int width;                     // Size of the stamp
+    int height;
+    int anchor_x;                  // Position of the shape anchor inside the stamp
+    int anchor_y;
+    struct StampEntry* prev;       // LRU list, most recently used first
+    struct StampEntry* next;
+    struct StampEntry* hash_next;  // Bucket chain
+    bool used;
+} StampEntry;
+
+static StampEntry entries[STAMP_MAX_ENTRIES];
+static StampEntry* buckets[STAMP_BUCKETS];
+static StampEntry* lru_head = NULL;
+static StampEntry* lru_tail = NULL;
+static int entry_count = 0;
+static bool cache_enabled = true;
+static StampCacheStatistics stats = {0};
+
+/**
+ * @brief Builds the cache key and stamp geometry of a command.
+ *
+ * @return false if the shape cannot be stamped.
+ */
+static bool make_key(const DrawCommand* cmd, StampKey* key, int* width, int* height, int* anchor_x, int* anchor_y) {
+    const int* p = cmd->params;
+    int t = cmd->thickness > 0 ? cmd->thickness : 1;
+
+    memset(key, 0, sizeof(*key));
+    key->type = cmd->type;
+    key->thickness = cmd->thickness;
+    key->filled = cmd->filled;
+    key->color = cmd->color;
+
+    switch (cmd->type) {
+    case CMD_CIRCLE: {
+        int half = abs(p[2]) + (cmd->filled ? 0 : t) + 1;
+        key->dims[0] = p[2];
+        *width = *height = 2 * half + 1;
+        *anchor_x = *anchor_y = half;
+        break;
+    }
+    case CMD_ELLIPSE: {
+        int half_x = abs(p[2]) + (cmd->filled ? 0 : t) + 1;
+        int half_y = abs(p[3]) + (cmd->filled ? 0 : t) + 1;
+        key->dims[0] = p[2];
+        key->dims[1] = p[3];
+        *width = 2 * half_x + 1;
+        *height = 2 * half_y + 1;
+        *anchor_x = half_x;
+        *anchor_y = half_y;
+        break;
+    }
+    case CMD_TRIANGLE: {
+        int dx2 = p[2] - p[0], dy2 = p[3] - p[1];
+        int dx3 = p[4] - p[0], dy3 = p[5] - p[1];
+        int grow = (cmd->filled ? 0 : t / 2) + 1;
+        int min_x = SDL_min(0, SDL_min(dx2, dx3)) - 1;
+        int max_x = SDL_max(0, SDL_max(dx2, dx3)) + 1;
+        int min_y = SDL_min(0, SDL_min(dy2, dy3)) - grow;
+        int max_y = SDL_max(0, SDL_max(dy2, dy3)) + grow;
+        key->dims[0] = dx2;
+        key->dims[1] = dy2;
+        key->dims[2] = dx3;
+        key->dims[3] = dy3;
+        *width = max_x - min_x + 1;
+        *height = max_y - min_y + 1;
+        *anchor_x = -min_x;
+        *anchor_y = -min_y;
+        break;
+    }
+    default:
+        return false;
+    }
+
+    return *width <= STAMP_MAX_SIDE && *height <= STAMP_MAX_SIDE;
+}
+
+static bool keys_equal(const StampKey* a, const StampKey* b) {
+    return a->type == b->type && a->thickness == b->thickness && a->filled == b->filled
+        && a->color.r == b->color.r && a->color.g == b->color.g
+        && a->color.b == b->color.b && a->color.a == b->color.a
+        && memcmp(a->dims, b->dims, sizeof(a->dims)) == 0;
+}
+
+static unsigned int hash_key(const StampKey* key) {
+    unsigned int h = 2166136261u;
+    int values[8] = {
+        (int)key->type, key->dims[0], key->dims[1], key->dims[2], key->dims[3], key->thickness, key->filled,
+        (key->color.r << 24) | (key->color.g << 16) | (key->color.b << 8) | key->color.a
+    };
+    for (int i = 0; i < 8; i++) {
+        h = (h ^ (unsigned int)values[i]) * 16777619u;
+    }
+    return h % STAMP_BUCKETS;
+}
+
+static void lru_unlink(StampEntry* entry) {
+    if (entry->prev) entry->prev->next = entry->next; else lru_head = entry->next;
+    if (entry->next) entry->next->prev = entry->prev; else lru_tail = entry->prev;
+    entry->prev = entry->next = NULL;
+}
+
+static void lru_push_front(StampEntry* entry) {
+    entry->next = lru_head;
+    entry->prev = NULL;
+    if (lru_head) lru_head->prev = entry;
+    lru_head = entry;
+    if (!lru_tail) lru_tail = entry;
+}
+
+static void release_texture(StampEntry* entry) {
+    if (entry->texture) {
+        SDL_DestroyTexture(entry->texture);
+        entry->texture = NULL;
+        stats.bytes -= (long)entry->width * entry->height * 4;
+    }
+}
+
+/**
+ * @brief Removes an entry from the hash table and the LRU list.
+ */
+static void remove_entry(StampEntry* entry) {
+    StampEntry** link = &buckets[hash_key(&entry->key)];
+    while (*link && *link != entry) link = &(*link)->hash_next;
+    if (*link) *link = entry->hash_next;
+
+    lru_unlink(entry);
+    release_texture(entry);
+    entry->used = false;
+    entry_count--;
+}
+
+/**
+ * @brief Evicts least recently used textures until the budget allows extra bytes.
+ */
+static void make_room(long extra, StampEntry* keep) {
+    StampEntry* entry = lru_tail;
+    while (entry && stats.bytes + extra > STAMP_CACHE_BYTES) {
+        StampEntry* previous = entry->prev;
+        if (entry != keep && entry->texture) {
+            remove_entry(entry);
+            stats.evictions++;
+        }
+        entry = previous;
+    }
+}
+
+static StampEntry* new_entry(void) {
+    if (entry_count == STAMP_MAX_ENTRIES) {
+        if (lru_tail->texture) stats.evictions++;
+        remove_entry(lru_tail);
+    }
+
+    for (int i = 0; i < STAMP_MAX_ENTRIES; i++) {
+        if (!entries[i].used) {
+            memset(&entries[i], 0, sizeof(StampEntry));
+            entries[i].used = true;
+            entry_count++;
+            return &entries[i];
+        }
+    }
+    return NULL;
+}
+
+/**
+ * @brief Rasterizes a shape once into a transparent target texture.
+ */
+static SDL_Texture* rasterize_stamp(const DrawCommand* cmd, const StampEntry* entry) {
+    SDL_Texture* texture = SDL_CreateTexture(renderer, SDL_PIXELFORMAT_RGBA8888,
+                                             SDL_TEXTUREACCESS_TARGET, entry->width, entry->height);
+    if (!texture) return NULL;
+    SDL_SetTextureBlendMode(texture, SDL_BLENDMODE_BLEND);
+
+    SDL_Texture* previous = SDL_GetRenderTarget(renderer);
+    if (SDL_SetRenderTarget(renderer, texture) != 0) {
+        SDL_DestroyTexture(texture);
+        return NULL;
+    }
+    SDL_SetRenderDrawColor(renderer, 0, 0, 0, 0);
+    SDL_RenderClear(renderer);
+
+    const int* p = cmd->params;
+    int ax = entry->anchor_x, ay = entry->anchor_y;
+    switch (cmd->type) {
+    case CMD_CIRCLE:
+        draw_circle(ax, ay, p[2], cmd->filled, cmd->color, cmd->thickness);
+        break;
+    case CMD_ELLIPSE:
+        draw_ellipse(ax, ay, p[2], p[3], cmd->filled, cmd->color, cmd->thickness);
+        break;
+    case CMD_TRIANGLE:
+        draw_triangle(ax, ay, ax + p[2] - p[0], ay + p[3] - p[1], ax + p[4] - p[0], ay + p[5] - p[1],
+                      cmd->filled, cmd->color, cmd->thickness);
+        break;
+    default:
+        break;
+    }
+
+    SDL_SetRenderTarget(renderer, previous);
+    return texture;
+}
+
+bool draw_stamped(const DrawCommand* cmd) {
+    if (!cache_enabled || !renderer || cmd->color.a != 255 || !SDL_RenderTargetSupported(renderer)) {
+        return false;
+    }
+
+    StampKey key;
+    int width, height, anchor_x, anchor_y;
+    if (!make_key(cmd, &key, &width, &height, &anchor_x, &anchor_y)) return false;
+
+    unsigned int bucket = hash_key(&key);
+    StampEntry* entry = buckets[bucket];
+    while (entry && !keys_equal(&entry->key, &key)) entry = entry->hash_next;
+
+    if (!entry) {
+        // First sighting: remember the shape but let the caller rasterize it
+        entry = new_entry();
+        if (!entry) return false;
+        entry->key = key;
+        entry->width = width;
+        entry->height = height;
+        entry->anchor_x = anchor_x;
+        entry->anchor_y = anchor_y;
+        entry->hash_next = buckets[bucket];
+        buckets[bucket] = entry;
+        lru_push_front(entry);
+        stats.misses++;
+        return false;
+    }
+
+    lru_unlink(entry);
+    lru_push_front(entry);
+
+    // SDL clips partly visible lines differently from whole ones, so only
+    // shapes lying entirely on the canvas are copied from a stamp
+    SDL_Rect destination = {cmd->params[0] - entry->anchor_x, cmd->params[1] - entry->anchor_y, entry->width, entry->height};
+    int output_width, output_height;
+    SDL_GetRendererOutputSize(renderer, &output_width, &output_height);
+    if (destination.x < 0 || destination.y < 0
+        || destination.x + destination.w > output_width || destination.y + destination.h > output_height) {
+        stats.misses++;
+        return false;
+    }
+
+    if (!entry->texture) {
+        long bytes = (long)width * height * 4;
+        make_room(bytes, entry);
+        entry->texture = rasterize_stamp(cmd, entry);
+        if (!entry->texture) {
+            stats.misses++;
+            return false;
+        }
+        stats.bytes += bytes;
+        stats.created++;
+    } else {
+        stats.hits++;
+    }
+
+    SDL_RenderCopy(renderer, entry->texture, NULL, &destination);
+    return true;
+}
+
+void set_stamp_cache_enabled(bool enabled) {
+    cache_enabled = enabled;
+}
+
+StampCacheStatistics get_stamp_cache_statistics(void) {
+    return stats;
+}
+
+void clear_stamp_cache(void) {
+    while (lru_head) remove_entry(lru_head);
+    memset(buckets, 0, sizeof(buckets));
+}
@@ -0,0 +1,40 @@
+#ifndef DRAWPP_BENCH_H
+#define DRAWPP_BENCH_H
+
+#include "drawpp.h"
+#include <stdio.h>
+
+/**
+ * @brief Creates an off-screen software renderer so benchmarks run without a display
+ *
+ * @return The surface the renderer draws into, or NULL on failure
+ */
+static inline SDL_Surface* bench_init_renderer(void) {
+    if (SDL_Init(0) != 0) {
+        printf("Unable to initialize SDL: %s\n", SDL_GetError());
+        return NULL;
+    }
+    SDL_Surface* surface = SDL_CreateRGBSurfaceWithFormat(0, WINDOW_WIDTH, WINDOW_HEIGHT, 32, SDL_PIXELFORMAT_RGBA8888);
+    if (!surface) {
+        printf("Failed to create surface: %s\n", SDL_GetError());
+        return NULL;
+    }
+    renderer = SDL_CreateSoftwareRenderer(surface);
+    if (!renderer) {
+        printf("Could not create renderer: %s\n", SDL_GetError());
+        SDL_FreeSurface(surface);
+        return NULL;
+    }
+    SDL_SetRenderDrawColor(renderer, 255, 255, 255, 255);
+    SDL_RenderClear(renderer);
+    return surface;
+}
+
+/**
+ * @brief Returns the current time in milliseconds
+ */
+static inline double bench_now_ms(void) {
+    return (double)SDL_GetPerformanceCounter() * 1000.0 / (double)SDL_GetPerformanceFrequency();
+}
+
+#endif /* DRAWPP_BENCH_H */
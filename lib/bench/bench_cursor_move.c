@@ -0,0 +1,131 @@
+/**
+ * @file bench_cursor_move.c
+ * @brief Microbenchmark of move-heavy turtle loops and rendering check.
+ *
+ * Times move_cursor against the previous per-call trigonometry, then renders
+ * a turtle scene both ways and fails if the images differ.
+ * Build and run from lib/: make bench/bench_cursor_move && ./bench/bench_cursor_move
+ */
+#include "bench.h"
+#include <string.h>
+#include <stdlib.h>
+
+#define MOVES 10000000
+
+// Previous implementation: heading recomputed from the angle on every call
+static void reference_move(Cursor* cursor, double distance) {
+    double radians = cursor->angle * PI / 180.0;
+    cursor->x += distance * cos(radians);
+    cursor->y += distance * sin(radians);
+}
+
+static void reference_draw_line(Cursor* cursor, double length) {
+    double radians = cursor->angle * PI / 180.0;
+    int endX = (int)(cursor->x + length * cos(radians));
+    int endY = (int)(cursor->y + length * sin(radians));
+    record_line((int)cursor->x, (int)cursor->y, endX, endY, cursor->color, cursor->thickness);
+}
+
+static void reference_draw_triangle(Cursor* cursor, double base, double height, bool filled) {
+    double radians = cursor->angle * PI / 180.0;
+    int x1 = (int)cursor->x;
+    int y1 = (int)cursor->y;
+    int x2 = (int)(x1 + base * cos(radians));
+    int y2 = (int)(y1 + base * sin(radians));
+    double perpRadians = radians + PI / 2.0;
+    int x3 = (int)(x1 + height * cos(perpRadians));
+    int y3 = (int)(y1 + height * sin(perpRadians));
+    record_triangle(x1, y1, x2, y2, x3, y3, filled, cursor->color, cursor->thickness);
+}
+
+/**
+ * @brief Draws a turtle scene, either with the library or the reference code.
+ */
+static void turtle_scene(bool reference) {
+    const double turns[] = {90.0, 72.0, 45.0, 30.0, 144.0, 17.5};
+    Cursor* c = create_cursor(400, 300);
+
+    for (int t = 0; t < 6; t++) {
+        for (int i = 0; i < 60; i++) {
+            if (reference) {
+                reference_draw_line(c, 40 + i);
+                reference_draw_triangle(c, 12, 8, i % 2 == 0);
+                reference_move(c, 40 + i);
+            } else {
+                cursor_draw_line(c, 40 + i);
+                cursor_draw_triangle(c, 12, 8, i % 2 == 0);
+                move_cursor(c, 40 + i);
+            }
+            rotate_cursor(c, turns[t]);
+        }
+    }
+
+    // Exact quarter turns from integer positions, as in example/triangle: cos(3 * PI / 2)
+    // is -1.8e-16, not 0, and (int) truncates 300 + 200 * cos(3 * PI / 2) to 299
+    for (int quarter = 0; quarter < 4; quarter++) {
+        Cursor* q = create_cursor(300, 200);
+        rotate_cursor(q, 90.0 * quarter);
+        if (reference) {
+            reference_draw_triangle(q, 200, 200, quarter % 2 == 0);
+            reference_draw_line(q, 250);
+        } else {
+            cursor_draw_triangle(q, 200, 200, quarter % 2 == 0);
+            cursor_draw_line(q, 250);
+        }
+        destroy_cursor(q);
+    }
+    destroy_cursor(c);
+    flush_draw_commands();
+}
+
+int main(void) {
+    SDL_Surface* surface = bench_init_renderer();
+    if (!surface) return 1;
+    set_stamp_cache_enabled(false);
+
+    // Timing: straight runs with an occasional turn, as turtle programs do
+    Cursor* c = create_cursor(0, 0);
+    double start = bench_now_ms();
+    for (int i = 0; i < MOVES; i++) {
+        if (i % 100 == 0) rotate_cursor(c, 7.0);
+        reference_move(c, 1.0);
+    }
+    double reference = bench_now_ms() - start;
+
+    start = bench_now_ms();
+    for (int i = 0; i < MOVES; i++) {
+        if (i % 100 == 0) rotate_cursor(c, 7.0);
+        move_cursor(c, 1.0);
+    }
+    double cached = bench_now_ms() - start;
+    destroy_cursor(c);
+
+    printf("trig per move    %8.2f ns/move\n", reference * 1e6 / MOVES);
+    printf("cached heading   %8.2f ns/move  (x%.2f)\n", cached * 1e6 / MOVES, reference / cached);
+
+    // Rendering check
+    size_t size = (size_t)surface->pitch * surface->h;
+    unsigned char* expected = malloc(size);
+
+    SDL_SetRenderDrawColor(renderer, 255, 255, 255, 255);
+    SDL_RenderClear(renderer);
+    turtle_scene(true);
+    memcpy(expected, surface->pixels, size);
+
+    SDL_SetRenderDrawColor(renderer, 255, 255, 255, 255);
+    SDL_RenderClear(renderer);
+    turtle_scene(false);
+
+    long differing = 0;
+    for (size_t i = 0; i < size; i += 4) {
+        if (memcmp(expected + i, (unsigned char*)surface->pixels + i, 4) != 0) differing++;
+    }
+    printf("rendering check  %ld differing pixels\n", differing);
+
+    free(expected);
+    free_cursor_pool();
+    SDL_DestroyRenderer(renderer);
+    SDL_FreeSurface(surface);
+    SDL_Quit();
+    return differing == 0 ? 0 : 1;
+}
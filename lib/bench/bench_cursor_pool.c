@@ -0,0 +1,58 @@
+/**
+ * @file bench_cursor_pool.c
+ * @brief Stress test of the cursor pool with 100k live cursors.
+ *
+ * Build and run from lib/: make bench/bench_cursor_pool && ./bench/bench_cursor_pool
+ */
+#include "bench.h"
+#include <stdlib.h>
+
+#define CURSOR_COUNT 100000
+#define ROUNDS 10
+
+int main(void) {
+    if (SDL_Init(0) != 0) return 1;
+
+    Cursor** live = malloc(CURSOR_COUNT * sizeof(Cursor*));
+    if (!live) return 1;
+
+    // Cold pool: every create grows the pool
+    double start = bench_now_ms();
+    for (int i = 0; i < CURSOR_COUNT; i++) {
+        live[i] = create_cursor(i % WINDOW_WIDTH, i % WINDOW_HEIGHT);
+        if (!live[i]) {
+            printf("create_cursor failed after %d cursors\n", i);
+            return 1;
+        }
+    }
+    double cold = bench_now_ms() - start;
+
+    // Warm pool: release everything then recreate from the free list
+    start = bench_now_ms();
+    for (int round = 0; round < ROUNDS; round++) {
+        for (int i = 0; i < CURSOR_COUNT; i++) destroy_cursor(live[i]);
+        for (int i = 0; i < CURSOR_COUNT; i++) live[i] = create_cursor(i, i);
+    }
+    double warm = bench_now_ms() - start;
+
+    // Churn: release and recreate one cursor at a time while the rest stay alive
+    start = bench_now_ms();
+    for (int round = 0; round < ROUNDS; round++) {
+        for (int i = 0; i < CURSOR_COUNT; i++) {
+            destroy_cursor(live[i]);
+            live[i] = create_cursor(i, i);
+        }
+    }
+    double churn = bench_now_ms() - start;
+
+    printf("live cursors: %d\n", active_cursors);
+    printf("cold create      %8.2f ns/op\n", cold * 1e6 / CURSOR_COUNT);
+    printf("destroy+create   %8.2f ns/op\n", warm * 1e6 / (2.0 * ROUNDS * CURSOR_COUNT));
+    printf("churn            %8.2f ns/op\n", churn * 1e6 / (2.0 * ROUNDS * CURSOR_COUNT));
+
+    int status = active_cursors == CURSOR_COUNT ? 0 : 1;
+    free_cursor_pool();
+    free(live);
+    SDL_Quit();
+    return status;
+}
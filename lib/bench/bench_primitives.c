@@ -0,0 +1,138 @@
+/**
+ * @file bench_primitives.c
+ * @brief Microbenchmark of the drawing primitives and cursor creation, as CSV.
+ *
+ * Times draw_line, draw_rectangle, draw_circle, draw_triangle and draw_ellipse
+ * across sizes, thicknesses and fill modes, and create_cursor, on an
+ * off-screen software renderer. For each case, prints the calls per second
+ * and the renderer calls issued per primitive. Renderer calls are counted by
+ * wrapping the SDL draw functions at link time (see BENCH_WRAP in the
+ * Makefile), so the library itself is unchanged.
+ * Build and run from lib/: make bench (writes bench/primitives.csv)
+ */
+#include "bench.h"
+
+// minimum duration of one measurement, in milliseconds
+#define MIN_DURATION_MS 50.0
+
+static const int sizes[] = {5, 50, 250};
+static const int thicknesses[] = {1, 3, 8};
+
+static unsigned long long render_calls = 0;
+
+// SDL draw functions, redirected here by -Wl,--wrap
+int __real_SDL_RenderDrawPoint(SDL_Renderer* r, int x, int y);
+int __real_SDL_RenderDrawLine(SDL_Renderer* r, int x1, int y1, int x2, int y2);
+int __real_SDL_RenderDrawRect(SDL_Renderer* r, const SDL_Rect* rect);
+int __real_SDL_RenderFillRect(SDL_Renderer* r, const SDL_Rect* rect);
+int __real_SDL_RenderCopy(SDL_Renderer* r, SDL_Texture* t, const SDL_Rect* src, const SDL_Rect* dst);
+
+int __wrap_SDL_RenderDrawPoint(SDL_Renderer* r, int x, int y) {
+    render_calls++;
+    return __real_SDL_RenderDrawPoint(r, x, y);
+}
+
+int __wrap_SDL_RenderDrawLine(SDL_Renderer* r, int x1, int y1, int x2, int y2) {
+    render_calls++;
+    return __real_SDL_RenderDrawLine(r, x1, y1, x2, y2);
+}
+
+int __wrap_SDL_RenderDrawRect(SDL_Renderer* r, const SDL_Rect* rect) {
+    render_calls++;
+    return __real_SDL_RenderDrawRect(r, rect);
+}
+
+int __wrap_SDL_RenderFillRect(SDL_Renderer* r, const SDL_Rect* rect) {
+    render_calls++;
+    return __real_SDL_RenderFillRect(r, rect);
+}
+
+int __wrap_SDL_RenderCopy(SDL_Renderer* r, SDL_Texture* t, const SDL_Rect* src, const SDL_Rect* dst) {
+    render_calls++;
+    return __real_SDL_RenderCopy(r, t, src, dst);
+}
+
+typedef enum { LINE, RECTANGLE, CIRCLE, TRIANGLE, ELLIPSE, CURSOR } Primitive;
+
+static const char* primitive_names[] = {
+    "draw_line", "draw_rectangle", "draw_circle", "draw_triangle", "draw_ellipse", "create_cursor"
+};
+
+/**
+ * @brief Calls a primitive once, centred on the surface.
+ */
+static void call_primitive(Primitive primitive, int size, int thickness, bool filled) {
+    SDL_Color color = {200, 30, 30, 255};
+    int cx = WINDOW_WIDTH / 2;
+    int cy = WINDOW_HEIGHT / 2;
+
+    switch (primitive) {
+        case LINE:
+            draw_line(cx - size, cy, cx + size, cy + size / 2, color, thickness);
+            break;
+        case RECTANGLE:
+            draw_rectangle(cx - size, cy - size / 2, 2 * size, size, filled, color, thickness);
+            break;
+        case CIRCLE:
+            draw_circle(cx, cy, size, filled, color, thickness);
+            break;
+        case TRIANGLE:
+            draw_triangle(cx - size, cy + size, cx + size, cy + size, cx, cy - size, filled, color, thickness);
+            break;
+        case ELLIPSE:
+            draw_ellipse(cx, cy, size, size / 2 + 1, filled, color, thickness);
+            break;
+        case CURSOR:
+            destroy_cursor(create_cursor(cx, cy));
+            break;
+    }
+}
+
+/**
+ * @brief Times one case and prints it as a CSV row.
+ */
+static void measure(Primitive primitive, int size, int thickness, bool filled) {
+    long calls = 1;
+    double elapsed = 0.0;
+    unsigned long long issued = 0;
+
+    // double the batch until it lasts long enough to be timed
+    for (;;) {
+        render_calls = 0;
+        double start = bench_now_ms();
+        for (long i = 0; i < calls; i++) {
+            call_primitive(primitive, size, thickness, filled);
+        }
+        elapsed = bench_now_ms() - start;
+        issued = render_calls;
+        if (elapsed >= MIN_DURATION_MS) break;
+        calls *= 2;
+    }
+
+    printf("%s,%d,%d,%d,%ld,%.6f,%.1f,%.2f\n",
+           primitive_names[primitive], size, thickness, filled ? 1 : 0, calls,
+           elapsed / 1000.0, calls * 1000.0 / elapsed, (double)issued / calls);
+}
+
+int main(void) {
+    SDL_Surface* surface = bench_init_renderer();
+    if (!surface) return 1;
+
+    printf("primitive,size,thickness,filled,calls,seconds,calls_per_sec,render_calls_per_call\n");
+    for (Primitive p = LINE; p <= ELLIPSE; p++) {
+        for (size_t s = 0; s < sizeof(sizes) / sizeof(sizes[0]); s++) {
+            for (size_t t = 0; t < sizeof(thicknesses) / sizeof(thicknesses[0]); t++) {
+                measure(p, sizes[s], thicknesses[t], false);
+            }
+            // a filled shape ignores the thickness
+            if (p != LINE) measure(p, sizes[s], 1, true);
+        }
+    }
+    measure(CURSOR, 0, 1, false);
+
+    free_cursor_pool();
+    SDL_DestroyRenderer(renderer);
+    SDL_FreeSurface(surface);
+    SDL_Quit();
+    return 0;
+}
@@ -0,0 +1,102 @@
+/**
+ * @file bench_stamps.c
+ * @brief Compares rendering with and without the shape-stamp cache.
+ *
+ * The two scenes mirror example/grid/grid.dpp and example/pattern/pattern.dpp.
+ * Build and run from lib/: make bench/bench_stamps && ./bench/bench_stamps
+ */
+#include "bench.h"
+#include <string.h>
+#include <stdlib.h>
+
+#define REPEAT 20
+
+static void grid_scene(void) {
+    Cursor* c = create_cursor(25, 25);
+    set_cursor_color(c, red);
+    c->thickness = 2;
+    for (int row = 0; row < 12; row++) {
+        for (int col = 0; col < 16; col++) {
+            cursor_draw_circle(c, 20, false);
+            cursor_draw_ellipse(c, 12, 6, true);
+            move_cursor(c, 50);
+        }
+        rotate_cursor(c, 180);
+        move_cursor(c, 800);
+        rotate_cursor(c, 270);
+        move_cursor(c, 50);
+        rotate_cursor(c, 270);
+    }
+    destroy_cursor(c);
+}
+
+static void pattern_scene(void) {
+    Cursor* p = create_cursor(400, 300);
+    set_cursor_color(p, purple);
+    int step = 4;
+    for (int turn = 0; turn < 10; turn++) {
+        for (int i = 0; i < 24; i++) {
+            cursor_draw_circle(p, 10, true);
+            cursor_draw_ellipse(p, 16, 6, false);
+            cursor_draw_triangle(p, 20, 12, true);
+            move_cursor(p, step);
+            rotate_cursor(p, 15);
+        }
+        step += 4;
+    }
+    destroy_cursor(p);
+}
+
+/**
+ * @brief Renders a scene REPEAT times and returns the mean time per frame.
+ */
+static double run_scene(void (*scene)(void), bool stamps) {
+    set_stamp_cache_enabled(stamps);
+    clear_stamp_cache();
+
+    double start = bench_now_ms();
+    for (int i = 0; i < REPEAT; i++) {
+        SDL_SetRenderDrawColor(renderer, 255, 255, 255, 255);
+        SDL_RenderClear(renderer);
+        scene();
+        flush_draw_commands();
+    }
+    return (bench_now_ms() - start) / REPEAT;
+}
+
+static void bench_scene(const char* name, void (*scene)(void), SDL_Surface* surface) {
+    size_t size = (size_t)surface->pitch * surface->h;
+    unsigned char* reference = malloc(size);
+
+    double direct = run_scene(scene, false);
+    memcpy(reference, surface->pixels, size);
+
+    StampCacheStatistics before = get_stamp_cache_statistics();
+    double stamped = run_scene(scene, true);
+    StampCacheStatistics after = get_stamp_cache_statistics();
+
+    long differing = 0;
+    for (size_t i = 0; i < size; i += 4) {
+        if (memcmp(reference + i, (unsigned char*)surface->pixels + i, 4) != 0) differing++;
+    }
+
+    printf("%-8s direct %8.3f ms/frame  stamped %8.3f ms/frame  speedup x%.2f  "
+           "hits %ld  textures %ld  differing pixels %ld\n",
+           name, direct, stamped, direct / stamped,
+           after.hits - before.hits, after.created - before.created, differing);
+    free(reference);
+}
+
+int main(void) {
+    SDL_Surface* surface = bench_init_renderer();
+    if (!surface) return 1;
+
+    bench_scene("grid", grid_scene, surface);
+    bench_scene("pattern", pattern_scene, surface);
+
+    clear_stamp_cache();
+    SDL_DestroyRenderer(renderer);
+    SDL_FreeSurface(surface);
+    SDL_Quit();
+    return 0;
+}
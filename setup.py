@@ -1,4 +1,5 @@
 from setuptools import setup, find_packages
 
 setup(name='cytech-project-drawpp-ing1-20242025',
-      version='1.0', packages=find_packages())
+      version='1.0', packages=find_packages(),
+      entry_points={'console_scripts': ['drawpp=compiler.cli:main']})